@@ -21,4 +21,4 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(AccountToken)
 class AccountTokenAdmin(admin.ModelAdmin):
-    list_display = ('account', 'key', 'created_at')
+    list_display = ('account', 'key_prefix', 'created_at')
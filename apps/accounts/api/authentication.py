@@ -1,11 +1,13 @@
 """
 Авторизация API по токену (AccountToken).
 Заголовок: Authorization: Token <key>
+Ключ сравнивается по SHA-256; результат проверки кэшируется в памяти процесса.
 """
 from rest_framework import authentication
 from rest_framework import exceptions
 
-from apps.accounts.models import AccountToken
+from apps.accounts.cache import get_cached_account, get_cached_token
+from apps.accounts.models import AccountToken, hash_token_key
 
 
 class AccountTokenAuthentication(authentication.BaseAuthentication):
@@ -18,11 +20,13 @@ class AccountTokenAuthentication(authentication.BaseAuthentication):
         key = auth_header[len(self.keyword):].strip()
         if not key:
             return None
-        try:
-            token = AccountToken.objects.select_related('account').get(key=key)
-        except AccountToken.DoesNotExist:
+        key_hash = hash_token_key(key)
+        entry = get_cached_token(key_hash)
+        if entry is None:
             raise exceptions.AuthenticationFailed('Неверный или просроченный токен.')
-        account = token.account
-        if not account.is_active:
+        token_id, account_id, is_active = entry
+        account = get_cached_account(account_id) if is_active else None
+        if account is None:
             raise exceptions.AuthenticationFailed('Аккаунт деактивирован.')
+        token = AccountToken(id=token_id, account_id=account_id, key_hash=key_hash)
         return (account, token)
@@ -1,17 +1,18 @@
 from rest_framework import serializers
-from django.contrib.auth.hashers import make_password
 from django.db.models import Q
 
 from apps.accounts.models import Role, Account, UserProfile, AccountToken
+from apps.accounts.passwords import make_password, verify_password
+from apps.core.api.fields import SparseFieldsSerializerMixin
 
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Role
         fields = '__all__'
 
 
-class AccountSerializer(serializers.ModelSerializer):
+class AccountSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(
         min_length=8, write_only=True, required=False, allow_blank=True
     )
@@ -38,25 +39,30 @@ class AccountSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = '__all__'
 
 
-class AccountTokenSerializer(serializers.ModelSerializer):
+class AccountTokenSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(write_only=True, required=False)
     password = serializers.CharField(write_only=True, required=False)
+    # Полный ключ возвращается только в ответе на создание токена
+    key = serializers.CharField(read_only=True)
 
     class Meta:
         model = AccountToken
-        fields = ('id', 'key', 'account', 'created_at', 'username', 'password')
-        extra_kwargs = {'key': {'read_only': True}}
+        fields = (
+            'id', 'key', 'key_prefix', 'account', 'created_at',
+            'username', 'password',
+        )
+        extra_kwargs = {
+            'key_prefix': {'read_only': True},
+            'account': {'required': False},
+        }
 
     def create(self, validated_data):
-        import secrets
-        from django.contrib.auth.hashers import check_password
-
         username = validated_data.pop('username', None)
         password = validated_data.pop('password', None)
         if username is not None and password is not None:
@@ -65,7 +71,7 @@ class AccountTokenSerializer(serializers.ModelSerializer):
                 | Q(username__iexact=username.strip()),
                 is_active=True,
             ).first()
-            if not account or not check_password(password, account.password_hash):
+            if not account or not verify_password(account, password):
                 raise serializers.ValidationError(
                     'Неверный логин или пароль.'
                 )
@@ -74,5 +80,4 @@ class AccountTokenSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Укажите account или пару username и password.'
             )
-        validated_data['key'] = secrets.token_hex(32)
-        return super().create(validated_data)
+        return AccountToken.objects.create_token(validated_data['account'])
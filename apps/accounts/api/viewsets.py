@@ -2,6 +2,8 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAuthenticatedOrReadOnly
 
 from apps.accounts.models import Role, Account, UserProfile, AccountToken
+from apps.core.api.conditional import ConditionalGetMixin
+from apps.core.api.fields import SparseFieldsViewSetMixin
 from .serializers import (
     RoleSerializer,
     AccountSerializer,
@@ -10,19 +12,19 @@ from .serializers import (
 )
 
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(ConditionalGetMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Account.objects.select_related('role').all()
     serializer_class = AccountSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(ConditionalGetMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = UserProfile.objects.select_related('account').all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
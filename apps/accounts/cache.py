@@ -0,0 +1,85 @@
+"""
+Кэши аккаунтов и токенов API в памяти процесса.
+Текущий аккаунт нужен почти на каждой странице, а токен проверяется на каждом
+вызове API, поэтому они берутся отсюда, а не отдельными запросами к БД.
+Сбрасываются сигналами (apps/accounts/signals.py), остальное ограничено коротким TTL.
+"""
+import copy
+
+from django.conf import settings
+
+from apps.core.cache_utils import TTLCache
+from .models import Account, AccountToken
+
+# Маркер «аккаунта нет или он деактивирован» — чтобы не ходить в БД повторно
+_INACTIVE = False
+
+_account_cache = TTLCache(
+    maxsize=getattr(settings, 'ACCOUNT_CACHE_SIZE', 2048),
+    ttl=getattr(settings, 'ACCOUNT_CACHE_TTL', 30),
+)
+
+# Хэш ключа -> (id токена, id аккаунта, аккаунт активен)
+_token_cache = TTLCache(
+    maxsize=getattr(settings, 'API_TOKEN_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'API_TOKEN_CACHE_TTL', 60),
+)
+
+
+def get_cached_account(account_id):
+    """Возвращает активный аккаунт (с ролью) по id или None."""
+    if not account_id:
+        return None
+    account = _account_cache.get(account_id)
+    if account is None:
+        account = (
+            Account.objects.filter(id=account_id, is_active=True)
+            .select_related('role')
+            .first()
+        ) or _INACTIVE
+        _account_cache.set(account_id, account)
+    if account is _INACTIVE:
+        return None
+    # Копия, чтобы изменения в представлении не попадали в общий кэш
+    return copy.copy(account)
+
+
+def invalidate_account(account_id):
+    """Сбрасывает кэш одного аккаунта."""
+    _account_cache.delete(account_id)
+
+
+def invalidate_role(role_id):
+    """Сбрасывает кэш всех аккаунтов с указанной ролью."""
+    _account_cache.delete_where(
+        lambda _, account: account is not _INACTIVE and account.role_id == role_id
+    )
+
+
+def get_cached_token(key_hash):
+    """Возвращает (id токена, id аккаунта, is_active) по хэшу ключа или None."""
+    entry = _token_cache.get(key_hash)
+    if entry is None:
+        entry = (
+            AccountToken.objects.filter(key_hash=key_hash)
+            .values_list('id', 'account_id', 'account__is_active')
+            .first()
+        )
+        if entry is None:
+            return None
+        _token_cache.set(key_hash, entry)
+    return entry
+
+
+def invalidate_token(key_hash):
+    _token_cache.delete(key_hash)
+
+
+def invalidate_account_tokens(account_id):
+    """Сбрасывает кэш всех токенов аккаунта (например, при деактивации)."""
+    _token_cache.delete_where(lambda _, entry: entry[1] == account_id)
+
+
+def clear_account_cache():
+    _account_cache.clear()
+    _token_cache.clear()
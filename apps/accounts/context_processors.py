@@ -1,20 +1,20 @@
+from .permissions import has_perm
 from .views import get_current_account
 
 
 def current_account(request):
     """Добавляет текущий аккаунт, is_admin, is_manager и списки для панели."""
     account = get_current_account(request)
-    is_admin = bool(account and account.role and account.role.name == 'admin')
-    is_manager = bool(account and account.role and account.role.name == 'manager')
+    is_admin = has_perm(account, 'control_panel.all_tables')
+    is_manager = has_perm(account, 'manager.workspace')
 
     # Для панели управления — какие таблицы показывать менеджеру
     from apps.control_panel.mixins import MANAGER_ALLOWED_KEYS
-    if is_manager and request.path.startswith('/control-panel/'):
+    if not is_admin and request.path.startswith('/control-panel/'):
         control_panel_model_keys = MANAGER_ALLOWED_KEYS
-        control_panel_show_audit = False
     else:
         control_panel_model_keys = None
-        control_panel_show_audit = is_admin
+    control_panel_show_audit = has_perm(account, 'audit.view')
 
     return {
         'current_account': account,
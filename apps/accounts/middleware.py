@@ -0,0 +1,51 @@
+"""Middleware приложения accounts."""
+from .cache import get_cached_account, invalidate_account
+from .snapshot import (
+    password_fingerprint, read_account_snapshot, is_snapshot_current,
+    store_account_snapshot,
+)
+
+
+class CurrentAccountMiddleware:
+    """
+    Определяет текущий аккаунт один раз за запрос и кладёт его в request.current_account.
+    Контекст-процессор, миксины доступа и представления берут аккаунт оттуда.
+
+    Если снимок аккаунта в сессии актуален, аккаунт берётся из кэша процесса.
+    Иначе он перечитывается из БД; при смене пароля или деактивации сессия завершается.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.current_account, request.account_snapshot = self._resolve(request)
+        return self.get_response(request)
+
+    def _resolve(self, request):
+        session = request.session
+        account_id = session.get('account_id')
+        if not account_id:
+            return None, None
+
+        snapshot = read_account_snapshot(session)
+        if is_snapshot_current(snapshot, account_id):
+            account = get_cached_account(account_id)
+            # Пароль сверяется и здесь: счётчик поколений мог не увеличиться
+            # (кэш недоступен, правка в обход сигналов)
+            if account is not None and snapshot.password_fingerprint == password_fingerprint(account.password_hash):
+                return account, snapshot
+
+        # Аккаунт или роль менялись (возможно, в другом процессе) — кэшу процесса не доверяем
+        invalidate_account(account_id)
+        account = get_cached_account(account_id)
+        password_changed = (
+            account is not None
+            and snapshot is not None
+            and snapshot.id == account_id
+            and snapshot.password_fingerprint != password_fingerprint(account.password_hash)
+        )
+        if account is None or password_changed:
+            session.flush()
+            return None, None
+        return account, store_account_snapshot(session, account)
@@ -0,0 +1,49 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_keys(apps, schema_editor):
+    """Переводит открытые ключи в SHA-256 + префикс."""
+    AccountToken = apps.get_model('accounts', 'AccountToken')
+    for token in AccountToken.objects.all():
+        key = token.key_prefix
+        token.key_hash = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        token.key_prefix = key[:8]
+        token.save(update_fields=['key_hash', 'key_prefix'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='accounttoken',
+            old_name='key',
+            new_name='key_prefix',
+        ),
+        migrations.AlterField(
+            model_name='accounttoken',
+            name='key_prefix',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddField(
+            model_name='accounttoken',
+            name='key_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_existing_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='accounttoken',
+            name='key_prefix',
+            field=models.CharField(max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='accounttoken',
+            name='key_hash',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+    ]
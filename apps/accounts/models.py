@@ -1,5 +1,16 @@
+import hashlib
+import secrets
+
 from django.db import models
 
+# Сколько первых символов ключа API хранится открыто (для отображения в списках)
+TOKEN_PREFIX_LENGTH = 8
+
+
+def hash_token_key(key):
+    """SHA-256 ключа API — в БД хранится только он."""
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
 
 class Role(models.Model):
     """Роли пользователей (1 к М с аккаунтами)."""
@@ -72,9 +83,26 @@ class UserProfile(models.Model):
         return f'{self.first_name} {self.last_name}'
 
 
+class AccountTokenManager(models.Manager):
+    def create_token(self, account, key=None):
+        """
+        Создаёт токен для аккаунта. Исходный ключ доступен только в token.key
+        у возвращённого объекта — в БД сохраняются хэш и префикс.
+        """
+        key = key or secrets.token_hex(32)
+        token = self.create(
+            account=account,
+            key_hash=hash_token_key(key),
+            key_prefix=key[:TOKEN_PREFIX_LENGTH],
+        )
+        token.key = key
+        return token
+
+
 class AccountToken(models.Model):
-    """Токен для авторизации через API (привязка к Account)."""
-    key = models.CharField(max_length=64, unique=True, db_index=True)
+    """Токен для авторизации через API (привязка к Account). Ключ хранится в виде SHA-256."""
+    key_prefix = models.CharField(max_length=TOKEN_PREFIX_LENGTH)
+    key_hash = models.CharField(max_length=64, unique=True)
     account = models.ForeignKey(
         Account,
         on_delete=models.CASCADE,
@@ -82,10 +110,12 @@ class AccountToken(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AccountTokenManager()
+
     class Meta:
         db_table = 'account_token'
         verbose_name = 'токен API'
         verbose_name_plural = 'токены API'
 
     def __str__(self):
-        return f'{self.account.username} — {self.key[:8]}...'
+        return f'{self.account.username} — {self.key_prefix}...'
@@ -0,0 +1,71 @@
+"""
+Хэширование и проверка паролей.
+
+PBKDF2 занимает сотни миллисекунд процессора. Чтобы асинхронные вход и
+регистрация не останавливали цикл событий daphne и не занимали общий поток
+синхронных представлений, amake_password и averify_password хэшируют в
+отдельном ограниченном пуле потоков (PASSWORD_HASHING_WORKERS). Синхронные
+make_password и verify_password хэшируют в вызывающем потоке: ожидание пула
+там лишь добавило бы переключение потоков. Алгоритм и число итераций задаются PASSWORD_HASHERS;
+при успешном входе хэш по устаревшему алгоритму пересчитывается и сохраняется.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', 2),
+                    thread_name_prefix='password-hashing',
+                )
+    return _executor
+
+
+def _verify(raw_password, encoded):
+    """Возвращает (пароль верен, новый хэш или None, если пересчёт не нужен)."""
+    if not hashers.check_password(raw_password, encoded):
+        return False, None
+    preferred = hashers.get_hasher('default')
+    hasher = hashers.identify_hasher(encoded)
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        return True, hashers.make_password(raw_password)
+    return True, None
+
+
+def make_password(raw_password):
+    """Хэш пароля по алгоритму по умолчанию."""
+    return hashers.make_password(raw_password)
+
+
+async def amake_password(raw_password):
+    return await asyncio.wrap_future(
+        _get_executor().submit(hashers.make_password, raw_password))
+
+
+def verify_password(account, raw_password):
+    """Проверяет пароль аккаунта и при необходимости сохраняет пересчитанный хэш."""
+    valid, new_hash = _verify(raw_password, account.password_hash)
+    if new_hash:
+        account.password_hash = new_hash
+        account.save(update_fields=['password_hash'])
+    return valid
+
+
+async def averify_password(account, raw_password):
+    valid, new_hash = await asyncio.wrap_future(
+        _get_executor().submit(_verify, raw_password, account.password_hash))
+    if new_hash:
+        account.password_hash = new_hash
+        await account.asave(update_fields=['password_hash'])
+    return valid
@@ -0,0 +1,136 @@
+"""
+Права доступа по ролям.
+
+Права роли собираются один раз из имени роли (базовый набор) и Role.permissions
+(JSON) в битовую маску и кэшируются в памяти процесса. Маска хранится вместе с
+именем и правами, из которых собрана: роль, изменённая в другом процессе,
+приходит из БД с новыми значениями и пересобирается (сигналы в
+apps/accounts/signals.py лишь сразу освобождают запись). Маска запоминается и
+на самом объекте Role, поэтому has_perm(account, 'contracts.sign') не делает
+запросов к БД, не разбирает и не сериализует строки.
+
+В Role.permissions допускаются коды прав ('contracts.sign') и группы
+из PERMISSION_GROUPS ('all', 'own_contracts', ...).
+"""
+import copy
+import threading
+
+# Все известные права (порядок задаёт номер бита)
+PERMISSIONS = (
+    # Сотрудники (администратор и менеджер)
+    'control_panel.access',      # панель управления
+    'chat.manage',               # чаты по любым заявкам
+    'lease_requests.review',     # подтверждение/отклонение заявок на лизинг
+    'maintenance.manage',        # смена статуса заявок на ТО
+    # Только администратор
+    'control_panel.all_tables',  # все таблицы панели (менеджеру — MANAGER_ALLOWED_KEYS)
+    'audit.view',                # журнал аудита
+    'backup.manage',             # бэкап и восстановление БД
+    'statistics.system',         # статистика системы
+    # Только менеджер
+    'manager.workspace',         # раздел менеджера: статистика, экспорт, чаты
+    # Клиент
+    'equipment.own',             # «Моя техника»
+    'contracts.sign',            # подписание договора (нужна компания)
+    'contracts.pay',             # оплата по договору
+    'maintenance.request',       # заявки на ТО
+    # Просмотр данных (из Role.permissions)
+    'contracts.view',
+    'companies.view',
+    'equipment.view',
+    'payments.view',
+)
+
+PERMISSION_BITS = {code: 1 << index for index, code in enumerate(PERMISSIONS)}
+
+STAFF_PERMISSIONS = frozenset([
+    'control_panel.access', 'chat.manage', 'lease_requests.review', 'maintenance.manage',
+])
+ADMIN_PERMISSIONS = STAFF_PERMISSIONS | frozenset([
+    'control_panel.all_tables', 'audit.view', 'backup.manage', 'statistics.system',
+])
+MANAGER_PERMISSIONS = STAFF_PERMISSIONS | frozenset(['manager.workspace'])
+CLIENT_PERMISSIONS = frozenset([
+    'equipment.own', 'contracts.sign', 'contracts.pay', 'maintenance.request',
+])
+
+# Группы, которые можно указать в Role.permissions
+PERMISSION_GROUPS = {
+    'all': ADMIN_PERMISSIONS,
+    'own_contracts': CLIENT_PERMISSIONS,
+    'contracts': frozenset(['contracts.view']),
+    'companies': frozenset(['companies.view']),
+    'equipment': frozenset(['equipment.view']),
+    'payments': frozenset(['payments.view']),
+}
+
+# Базовый набор по имени роли; остальные роли (и аккаунты без роли) — клиенты
+ROLE_DEFAULT_PERMISSIONS = {
+    'admin': ADMIN_PERMISSIONS,
+    'manager': MANAGER_PERMISSIONS,
+}
+
+
+def _to_mask(codes):
+    mask = 0
+    for code in codes:
+        mask |= PERMISSION_BITS[code]
+    return mask
+
+
+CLIENT_MASK = _to_mask(CLIENT_PERMISSIONS)
+
+_compiled = {}
+_lock = threading.Lock()
+
+# Атрибут объекта Role с запомненной маской: (name, permissions, mask)
+_MASK_ATTR = '_permission_mask'
+
+
+def compile_role(role):
+    """Собирает битовую маску прав роли."""
+    codes = set(ROLE_DEFAULT_PERMISSIONS.get(role.name, CLIENT_PERMISSIONS))
+    entries = role.permissions if isinstance(role.permissions, list) else []
+    for entry in entries:
+        if not isinstance(entry, str):
+            continue
+        if entry in PERMISSION_GROUPS:
+            codes |= PERMISSION_GROUPS[entry]
+        elif entry in PERMISSION_BITS:
+            codes.add(entry)
+    return _to_mask(codes)
+
+
+def get_role_mask(role):
+    """Маска прав роли из кэша процесса (None — аккаунт без роли, права клиента)."""
+    if role is None:
+        return CLIENT_MASK
+    if role.pk is None:
+        return compile_role(role)
+    # Сравнение с сохранённой копией (а не сериализация) ловит и правку списка на месте
+    cached = role.__dict__.get(_MASK_ATTR) or _compiled.get(role.pk)
+    if cached is not None and cached[0] == role.name and cached[1] == role.permissions:
+        mask = cached[2]
+    else:
+        mask = compile_role(role)
+        cached = (role.name, copy.deepcopy(role.permissions), mask)
+        with _lock:
+            _compiled[role.pk] = cached
+    role.__dict__[_MASK_ATTR] = cached
+    return mask
+
+
+def invalidate_role_permissions(role_id):
+    with _lock:
+        _compiled.pop(role_id, None)
+
+
+def has_perm(account, perm):
+    """Есть ли у аккаунта право perm (код из PERMISSIONS)."""
+    try:
+        bit = PERMISSION_BITS[perm]
+    except KeyError:
+        raise ValueError(f'Неизвестное право: {perm}') from None
+    if account is None:
+        return False
+    return bool(get_role_mask(account.role) & bit)
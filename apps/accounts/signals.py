@@ -0,0 +1,32 @@
+"""Сигналы приложения accounts: сброс кэшей при изменении аккаунтов и ролей."""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import (
+    invalidate_account, invalidate_role, invalidate_token, invalidate_account_tokens,
+)
+from .models import Account, Role, AccountToken
+from .permissions import invalidate_role_permissions
+from .snapshot import bump_account_generation, bump_role_generation
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def account_changed(sender, instance, **kwargs):
+    invalidate_account(instance.pk)
+    invalidate_account_tokens(instance.pk)
+    bump_account_generation(instance.pk)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def role_changed(sender, instance, **kwargs):
+    invalidate_role(instance.pk)
+    invalidate_role_permissions(instance.pk)
+    bump_role_generation(instance.pk)
+
+
+@receiver(post_save, sender=AccountToken)
+@receiver(post_delete, sender=AccountToken)
+def token_changed(sender, instance, **kwargs):
+    invalidate_token(instance.key_hash)
@@ -0,0 +1,103 @@
+"""
+Снимок аккаунта в сессии: id, роль, активность и отпечаток хэша пароля.
+
+Снимок хранится в сессии компактным списком с номером версии формата.
+Актуальность проверяется по счётчикам поколений аккаунта и роли в кэше
+Django: сигналы увеличивают их при любом изменении Account/Role, после чего
+все сессии этого аккаунта перечитывают его из БД. Если при этом изменился
+пароль или аккаунт деактивирован — сессия завершается.
+"""
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+
+SESSION_KEY = 'account_snapshot'
+SNAPSHOT_VERSION = 1
+
+AccountSnapshot = namedtuple('AccountSnapshot', [
+    'id', 'role_id', 'role', 'is_active', 'password_fingerprint',
+    'generation', 'role_generation',
+])
+
+
+def password_fingerprint(password_hash):
+    """Короткий отпечаток хэша пароля (сам хэш в сессию не попадает)."""
+    return salted_hmac(
+        'apps.accounts.snapshot', password_hash, algorithm='sha256'
+    ).hexdigest()[:16]
+
+
+def _account_generation_key(account_id):
+    return f'accounts:snapshot-gen:account:{account_id}'
+
+
+def _role_generation_key(role_id):
+    return f'accounts:snapshot-gen:role:{role_id}'
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_account_generation(account_id):
+    """Помечает снимки аккаунта устаревшими."""
+    _bump(_account_generation_key(account_id))
+
+
+def bump_role_generation(role_id):
+    """Помечает устаревшими снимки всех аккаунтов с этой ролью."""
+    _bump(_role_generation_key(role_id))
+
+
+def _current_generations(account_id, role_id):
+    account_key = _account_generation_key(account_id)
+    role_key = _role_generation_key(role_id)
+    values = cache.get_many([account_key, role_key])
+    missing = [key for key in (account_key, role_key) if key not in values]
+    if missing:
+        # Начальное значение от времени, а не 0: после вытеснения ключа из кэша
+        # поколение не совпадёт со снимками, записанными до вытеснения
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        values.update(cache.get_many(missing))
+    return values.get(account_key), values.get(role_key)
+
+
+def store_account_snapshot(session, account):
+    """Сохраняет в сессию актуальный снимок аккаунта и возвращает его."""
+    generation, role_generation = _current_generations(account.id, account.role_id)
+    snapshot = AccountSnapshot(
+        id=account.id,
+        role_id=account.role_id,
+        role=account.role.name if account.role else None,
+        is_active=account.is_active,
+        password_fingerprint=password_fingerprint(account.password_hash),
+        generation=generation,
+        role_generation=role_generation,
+    )
+    session[SESSION_KEY] = [SNAPSHOT_VERSION, *snapshot]
+    return snapshot
+
+
+def read_account_snapshot(session):
+    """Читает снимок из сессии (без проверки актуальности) или возвращает None."""
+    data = session.get(SESSION_KEY)
+    if not data or data[0] != SNAPSHOT_VERSION:
+        return None
+    try:
+        return AccountSnapshot(*data[1:])
+    except TypeError:
+        return None
+
+
+def is_snapshot_current(snapshot, account_id):
+    """Снимок принадлежит аккаунту сессии и с момента записи аккаунт/роль не менялись."""
+    if snapshot is None or snapshot.id != account_id or not snapshot.is_active:
+        return False
+    generations = _current_generations(snapshot.id, snapshot.role_id)
+    return generations == (snapshot.generation, snapshot.role_generation)
@@ -2,14 +2,15 @@ import os
 import subprocess
 import tempfile
 from datetime import datetime
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.http import HttpResponse, Http404
 from django.utils import timezone
 from django.utils.crypto import constant_time_compare
-from django.contrib.auth.hashers import make_password, check_password
 from django.contrib import messages
 
 from django.core.signing import TimestampSigner, SignatureExpired, BadSignature
@@ -17,6 +18,10 @@ from django.core.mail import send_mail, EmailMultiAlternatives
 from django.template.loader import render_to_string
 
 from .models import Account, UserProfile, Role
+from .passwords import make_password, amake_password, averify_password
+from .cache import get_cached_account
+from .permissions import has_perm
+from .snapshot import store_account_snapshot
 from .forms import (
     LoginForm, RegisterForm, ProfileEditForm,
     PasswordResetRequestForm, PasswordResetConfirmForm,
@@ -27,65 +32,79 @@ PASSWORD_RESET_TOKEN_MAX_AGE = 60 * 60
 
 
 def get_current_account(request):
-    """Возвращает аккаунт из сессии или None."""
-    account_id = request.session.get('account_id')
-    if not account_id:
-        return None
-    return Account.objects.filter(id=account_id, is_active=True).select_related('role').first()
+    """Возвращает аккаунт из сессии или None (уже определённый CurrentAccountMiddleware)."""
+    if hasattr(request, 'current_account'):
+        return request.current_account
+    return get_cached_account(request.session.get('account_id'))
 
 
-def login_view(request):
+async def login_view(request):
+    # Асинхронное: проверка пароля ждёт пул хэширования, не занимая поток синхронных представлений
     if get_current_account(request):
         return redirect('core:home')
     form = LoginForm(request.POST or None)
     if request.method == 'POST' and form.is_valid():
         username = form.cleaned_data['username'].strip()
         password = form.cleaned_data['password']
-        account = Account.objects.filter(
+        account = await Account.objects.filter(
             Q(email__iexact=username) | Q(username__iexact=username),
             is_active=True,
-        ).first()
-        if account and check_password(password, account.password_hash):
+        ).select_related('role').afirst()
+        if account and await averify_password(account, password):
             request.session['account_id'] = account.id
+            request.current_account = account
             account.last_login = timezone.now()
-            account.save(update_fields=['last_login'])
+            await account.asave(update_fields=['last_login'])
+            await sync_to_async(store_account_snapshot)(request.session, account)
             messages.success(request, f'Добро пожаловать, {account.username}!')
             return redirect('core:home')
         form.add_error(None, 'Неверный email/логин или пароль.')
     return render(request, 'accounts/auth/login.html', {'form': form})
 
 
-def register_view(request):
+async def register_view(request):
     if get_current_account(request):
         return redirect('core:home')
     form = RegisterForm(request.POST or None)
-    if request.method == 'POST' and form.is_valid():
-        role_client, _ = Role.objects.get_or_create(
-            name='client',
-            defaults={'description': 'Клиент (арендатор)'},
-        )
-        account = Account.objects.create(
-            email=form.cleaned_data['email'].strip().lower(),
-            username=form.cleaned_data['username'].strip(),
-            password_hash=make_password(form.cleaned_data['password1']),
-            role=role_client,
-            is_active=True,
-        )
-        UserProfile.objects.create(
-            account=account,
-            first_name=form.cleaned_data['first_name'].strip(),
-            last_name=form.cleaned_data['last_name'].strip(),
-            phone=form.cleaned_data.get('phone', '').strip() or '',
-        )
+    # Проверки уникальности логина и email обращаются к БД
+    if request.method == 'POST' and await sync_to_async(form.is_valid)():
+        password_hash = await amake_password(form.cleaned_data['password1'])
+        account = await sync_to_async(_create_client_account)(form.cleaned_data, password_hash)
         request.session['account_id'] = account.id
+        request.current_account = account
+        await sync_to_async(store_account_snapshot)(request.session, account)
         messages.success(
             request, 'Регистрация прошла успешно. Добро пожаловать!')
         return redirect('core:home')
     return render(request, 'accounts/auth/register.html', {'form': form})
 
 
+@transaction.atomic
+def _create_client_account(data, password_hash):
+    """Создаёт аккаунт клиента с профилем."""
+    role_client, _ = Role.objects.get_or_create(
+        name='client',
+        defaults={'description': 'Клиент (арендатор)'},
+    )
+    account = Account.objects.create(
+        email=data['email'].strip().lower(),
+        username=data['username'].strip(),
+        password_hash=password_hash,
+        role=role_client,
+        is_active=True,
+    )
+    UserProfile.objects.create(
+        account=account,
+        first_name=data['first_name'].strip(),
+        last_name=data['last_name'].strip(),
+        phone=data.get('phone', '').strip() or '',
+    )
+    return account
+
+
 def logout_view(request):
     request.session.flush()
+    request.current_account = None
     messages.info(request, 'Вы вышли из аккаунта.')
     return redirect('core:home')
 
@@ -200,8 +219,7 @@ def profile_view(request):
         data=request.POST if request.method == 'POST' else None,
     )
 
-    is_client = not (
-        account.role and account.role.name in ('admin', 'manager'))
+    is_client = has_perm(account, 'equipment.own')
     if is_client and request.method == 'POST' and form.is_valid():
         account.username = form.cleaned_data['username'].strip()
         account.email = form.cleaned_data['email'].strip().lower()
@@ -210,6 +228,8 @@ def profile_view(request):
             account.password_hash = make_password(
                 form.cleaned_data['new_password'])
             account.save(update_fields=['password_hash'])
+        # Обновляем снимок своей сессии, остальные сессии аккаунта перечитают его из БД
+        store_account_snapshot(request.session, account)
 
         if profile:
             profile.first_name = form.cleaned_data['first_name'].strip()
@@ -229,9 +249,7 @@ def profile_view(request):
         messages.success(request, 'Профиль обновлён.')
         return redirect('accounts:profile')
 
-    is_manager = account.role and account.role.name == 'manager'
-    is_client = not (
-        account.role and account.role.name in ('admin', 'manager'))
+    is_manager = has_perm(account, 'manager.workspace')
 
     # Компания клиента (для заявок на лизинг)
     from apps.leasing.models import Company
@@ -285,7 +303,7 @@ def profile_view(request):
         'company_form': company_form,
         'user_company': user_company,
         'need_company': need_company,
-        'is_admin': account.role and account.role.name == 'admin',
+        'is_admin': has_perm(account, 'control_panel.all_tables'),
         'is_manager': is_manager,
         'is_client': is_client,
     })
@@ -296,7 +314,7 @@ def backup_view(request):
     if not account:
         messages.error(request, 'Войдите в систему.')
         return redirect('accounts:login')
-    if not account.role or account.role.name != 'admin':
+    if not has_perm(account, 'backup.manage'):
         messages.error(request, 'Доступ только для администратора.')
         return redirect('accounts:profile')
 
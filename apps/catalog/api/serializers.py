@@ -1,20 +1,43 @@
 from rest_framework import serializers
 from apps.catalog.models import EquipmentCategory, Manufacturer, Equipment
+from apps.core.api.fields import SparseFieldsSerializerMixin
 
 
-class EquipmentCategorySerializer(serializers.ModelSerializer):
+class EquipmentCategorySerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = EquipmentCategory
         fields = '__all__'
 
+    def validate_parent(self, parent):
+        # DRF не вызывает Model.clean(); цикл отклоняется до записи в БД
+        if parent is not None and self.instance is not None and self.instance.is_ancestor_of(parent.pk):
+            raise serializers.ValidationError(EquipmentCategory.CYCLE_ERROR)
+        return parent
 
-class ManufacturerSerializer(serializers.ModelSerializer):
+
+class ManufacturerSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Manufacturer
         fields = '__all__'
 
 
-class EquipmentSerializer(serializers.ModelSerializer):
+class EquipmentSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    # Разобранные характеристики {'power_hp': 370.0, ...}; заполняются из specifications
+    spec_attributes = serializers.SerializerMethodField()
+
     class Meta:
         model = Equipment
-        fields = '__all__'
+        exclude = ('search_vector',)
+        field_prefetch = {'spec_attributes': ('specs',)}
+
+    def get_spec_attributes(self, obj):
+        return {spec.attribute: float(spec.value) for spec in obj.specs.all()}
+
+
+class PricePointSerializer(serializers.Serializer):
+    """Точка прореженной истории цены (apps/catalog/price_history.py)."""
+    effective_at = serializers.DateTimeField()
+    price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    monthly_lease_rate = serializers.DecimalField(max_digits=8, decimal_places=2, allow_null=True)
+    price_min = serializers.DecimalField(max_digits=12, decimal_places=2)
+    price_max = serializers.DecimalField(max_digits=12, decimal_places=2)
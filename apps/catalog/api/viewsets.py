@@ -1,29 +1,98 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
 
+from apps.catalog.importer import refresh_equipment_derived
 from apps.catalog.models import EquipmentCategory, Manufacturer, Equipment
+from apps.catalog.price_history import DEFAULT_SERIES_POINTS, parse_moment, price_series
+from apps.catalog.ranges import parse_ranges, range_q
+from apps.catalog.similar import deferred_neighbor_updates
+from apps.catalog.specs import parse_spec_filters, spec_q
+from apps.core.api.bulk import BulkModelMixin
+from apps.core.api.conditional import ConditionalGetMixin
+from apps.core.api.fields import SparseFieldsViewSetMixin
 from .serializers import (
     EquipmentCategorySerializer,
     ManufacturerSerializer,
     EquipmentSerializer,
+    PricePointSerializer,
 )
 
 
-class EquipmentCategoryViewSet(viewsets.ModelViewSet):
+class EquipmentCategoryViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = EquipmentCategory.objects.all()
     serializer_class = EquipmentCategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
-class ManufacturerViewSet(viewsets.ModelViewSet):
+class ManufacturerViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Manufacturer.objects.all()
     serializer_class = ManufacturerSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
-class EquipmentViewSet(viewsets.ModelViewSet):
+class EquipmentViewSet(BulkModelMixin, ConditionalGetMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet):
+    """
+    Техника. Фильтры списка: ?status=available&category=3, диапазоны
+    price_min/price_max, rate_min/rate_max, year_min/year_max
+    (индексы (status, price), (status, monthly_lease_rate), (status, category))
+    и характеристики spec_<атрибут>_min/_max (apps/catalog/specs.py).
+    История цены: /api/equipment/<id>/price-history/.
+    Условные GET по updated_at (ETag, Last-Modified; apps/core/api/conditional.py).
+    Пакетные изменения: /api/equipment/bulk/ (apps/core/api/bulk.py).
+    """
     queryset = Equipment.objects.select_related(
         'category', 'manufacturer'
-    ).all()
+    ).prefetch_related('specs').all()
     serializer_class = EquipmentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action != 'list':
+            return qs
+        params = self.request.query_params
+        status = params.get('status')
+        if status in dict(Equipment.STATUS_CHOICES):
+            qs = qs.filter(status=status)
+        category = params.get('category')
+        if category and category.isdigit():
+            qs = qs.filter(category_id=int(category))
+        ranges = parse_ranges(params)
+        if ranges:
+            qs = qs.filter(range_q(ranges))
+        spec_filters = parse_spec_filters(params)
+        if spec_filters:
+            qs = qs.filter(spec_q(spec_filters))
+        return qs
+
+    def bulk_saved(self, objects):
+        # Соседи — инкрементально для этих id после фиксации; полный пересчёт только командой
+        refresh_equipment_derived(sorted(obj.pk for obj in objects))
+
+    def bulk_deleting(self):
+        # Соседи пересчитываются один раз на пачку, а не в post_delete каждой строки
+        return deferred_neighbor_updates()
+
+    @action(detail=True, url_path='price-history')
+    def price_history(self, request, pk=None):
+        """
+        История цены, прореженная до ?points= точек (по умолчанию 100).
+        Период — ?from= и ?to= (дата или дата-время); по умолчанию вся история.
+        """
+        equipment = get_object_or_404(Equipment.objects.only('pk'), pk=pk)
+        params = request.query_params
+        points = params.get('points', '')
+        start = parse_moment(params.get('from'))
+        end = parse_moment(params.get('to'), end_of_day=True)
+        series = price_series(
+            equipment.pk, start, end, int(points) if points.isdigit() else DEFAULT_SERIES_POINTS,
+        )
+        return Response({
+            'equipment': equipment.pk,
+            'from': start,
+            'to': end,
+            'points': PricePointSerializer(series, many=True).data,
+        })
@@ -0,0 +1,67 @@
+"""
+Версии каталога в кэше Django.
+
+Сигналы (apps/catalog/signals.py) меняют версию каталога при любом изменении
+техники, категорий и производителей, а версию справочников — только при
+изменении категорий и производителей. Версии входят в ключи кэшей каталога,
+поэтому устаревшие записи перестают читаться без явного удаления.
+
+Версия справочников нужна фрагментам карточек техники: карточка зависит от
+самой техники (pk + updated_at) и от названий категории и производителя, и
+правка одной единицы техники не должна сбрасывать карточки остальных.
+"""
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'catalog:version'
+REFERENCES_VERSION_KEY = 'catalog:references_version'
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Начальное значение от времени, а не 1: после вытеснения ключа из кэша
+        # версия не совпадёт со старыми записями
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def _aget_version(key):
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_catalog_version():
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+async def aget_catalog_version():
+    return await _aget_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    _bump_version(CATALOG_VERSION_KEY)
+
+
+def get_references_version():
+    return _get_version(REFERENCES_VERSION_KEY)
+
+
+async def aget_references_version():
+    return await _aget_version(REFERENCES_VERSION_KEY)
+
+
+def bump_references_version():
+    _bump_version(REFERENCES_VERSION_KEY)
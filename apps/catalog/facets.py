@@ -0,0 +1,154 @@
+"""
+Счётчики фильтров каталога (фасеты): категория, производитель, состояние, цена.
+
+Все счётчики считаются одним сгруппированным запросом по таблице каталога
+catalog_entry (доступная техника, без JOIN), найденной строкой поиска:
+(категория, производитель, состояние, ценовой диапазон) -> количество.
+Счётчик каждого фильтра учитывает остальные выбранные фильтры, но не свой,
+чтобы было видно, сколько техники даст соседнее значение.
+
+Диапазоны цены, платежа и года (apps/catalog/ranges.py) и характеристик
+(apps/catalog/specs.py) сужают сам запрос: на них счётчики не делятся.
+Строки запроса кэшируются по строке поиска, диапазонам и версии каталога (apps/catalog/cache.py), которая меняется при
+любом изменении техники.
+"""
+import hashlib
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from .cache import aget_catalog_version
+from .models import CatalogEntry, Equipment
+from .ranges import range_q
+from .specs import spec_q
+from .search import filter_equipment
+
+# Ключ, подпись, нижняя граница (включительно), верхняя граница
+PRICE_BUCKETS = (
+    ('lt1m', 'до 1 млн ₽', None, 1_000_000),
+    ('1m-5m', '1–5 млн ₽', 1_000_000, 5_000_000),
+    ('5m-10m', '5–10 млн ₽', 5_000_000, 10_000_000),
+    ('gte10m', 'от 10 млн ₽', 10_000_000, None),
+)
+PRICE_BUCKET_KEYS = frozenset(key for key, *_ in PRICE_BUCKETS)
+
+FACETS = ('category', 'manufacturer', 'condition', 'price')
+
+# Страховка от изменений в обход сигналов (SQL-скрипты)
+FACETS_CACHE_TTL = 300
+
+
+def price_bucket_q(key):
+    """Условие на цену для ценового диапазона."""
+    for bucket_key, _, low, high in PRICE_BUCKETS:
+        if bucket_key == key:
+            q = Q()
+            if low is not None:
+                q &= Q(price__gte=low)
+            if high is not None:
+                q &= Q(price__lt=high)
+            return q
+    raise ValueError(f'Неизвестный ценовой диапазон: {key}')
+
+
+def _price_bucket_case():
+    whens = [
+        When(price_bucket_q(key), then=Value(key))
+        for key, *_ in PRICE_BUCKETS
+    ]
+    return Case(*whens, output_field=CharField())
+
+
+def facet_rows_queryset(q='', ranges=None, spec_filters=None):
+    qs = CatalogEntry.objects.all()
+    if q:
+        qs = filter_equipment(qs, q)
+    if ranges:
+        qs = qs.filter(range_q(ranges))
+    if spec_filters:
+        qs = qs.filter(spec_q(spec_filters, field='equipment_id'))
+    return (
+        qs.annotate(price_bucket=_price_bucket_case())
+        .values(
+            'category_id', 'category_name', 'manufacturer_id', 'manufacturer_name',
+            'condition', 'price_bucket',
+        )
+        .annotate(count=Count('equipment_id'))
+        .order_by()
+    )
+
+
+async def aget_facet_rows(q='', ranges=None, spec_filters=None):
+    """
+    Строки сгруппированного запроса (из кэша, если каталог не менялся).
+    ranges и spec_filters — разобранные диапазоны (apps/catalog/ranges.py:parse_ranges,
+    apps/catalog/specs.py:parse_spec_filters).
+    """
+    ranges = dict(sorted((ranges or {}).items()))
+    spec_filters = dict(sorted((spec_filters or {}).items()))
+    digest = hashlib.md5(f'{q.lower()}|{ranges!r}|{spec_filters!r}'.encode('utf-8')).hexdigest()
+    key = f'catalog:facets:{await aget_catalog_version()}:{digest}'
+    rows = await cache.aget(key)
+    if rows is None:
+        rows = [row async for row in facet_rows_queryset(q, ranges, spec_filters)]
+        await cache.aset(key, rows, FACETS_CACHE_TTL)
+    return rows
+
+
+def build_facets(rows, selected, tree=None):
+    """
+    Считает фасеты по строкам запроса.
+    selected — выбранные значения фильтров {'category': 3, 'price': 'lt1m', ...}.
+    tree — дерево категорий (apps/catalog/tree.py): техника засчитывается
+    категории и всем её предкам, выбранная категория включает подкатегории.
+    Возвращает {фасет: [{'id', 'name', 'count'}, ...]}, у категорий есть 'level'.
+    """
+    counts = {facet: Counter() for facet in FACETS}
+    names = {'category': {}, 'manufacturer': {}}
+    for row in rows:
+        category_id = row['category_id']
+        values = {
+            'category': tree.ancestor_ids(category_id) if tree else [category_id],
+            'manufacturer': [row['manufacturer_id']],
+            'condition': [row['condition']],
+            'price': [row['price_bucket']],
+        }
+        names['category'][category_id] = row['category_name']
+        if row['manufacturer_id'] is not None:
+            names['manufacturer'][row['manufacturer_id']] = row['manufacturer_name']
+        for facet in FACETS:
+            matches_others = all(
+                selected.get(other) is None or selected.get(other) in values[other]
+                for other in FACETS if other != facet
+            )
+            for value in values[facet]:
+                counts[facet][value] += row['count'] if matches_others else 0
+
+    def options(facet, labels):
+        return [
+            {'id': value, 'name': label, 'count': counts[facet][value]}
+            for value, label in labels
+            if value in counts[facet]
+        ]
+
+    if tree:
+        category_ids = sorted(counts['category'], key=tree.sort_key)
+        categories = options('category', [
+            (category_id, tree.names.get(category_id) or names['category'][category_id])
+            for category_id in category_ids
+        ])
+        for option in categories:
+            option['level'] = tree.level(option['id'])
+    else:
+        categories = options('category', sorted(names['category'].items(), key=lambda item: item[1]))
+        for option in categories:
+            option['level'] = 0
+
+    return {
+        'category': categories,
+        'manufacturer': options(
+            'manufacturer', sorted(names['manufacturer'].items(), key=lambda item: item[1])),
+        'condition': options('condition', Equipment.CONDITION_CHOICES),
+        'price': options('price', [(key, label) for key, label, *_ in PRICE_BUCKETS]),
+    }
@@ -0,0 +1,359 @@
+"""
+Массовая загрузка техники из прайс-листа (XLSX или CSV).
+
+Файл читается построчно (openpyxl read_only, csv.reader), строки проверяются
+и записываются пачками по IMPORT_BATCH_SIZE, поэтому память не зависит от
+размера файла. Категории и производители ищутся по названию в словарях,
+загруженных один раз; неизвестные — ошибка строки (справочники ведутся в
+панели управления).
+
+Строка с VIN обновляет технику с тем же VIN (INSERT ... ON CONFLICT (vin)
+DO UPDATE через bulk_create(update_conflicts=True)), строка без VIN — технику
+без VIN с тем же названием и моделью. У существующей техники меняются только
+поля, для которых в файле есть столбец; пустые «Состояние» и «Статус» не
+сбрасывают текущие значения (умолчания — только для новой техники). bulk_create не вызывает сигналы, поэтому
+после загрузки характеристики, таблица каталога, история цен и версия каталога
+обновляются пачкой, а похожая техника пересчитывается для затронутых id после
+фиксации транзакции. В журнал аудита пишется одна итоговая запись.
+"""
+import csv
+import io
+import os
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.audit_utils import log_audit
+from .cache import bump_catalog_version
+from .models import Equipment, EquipmentCategory, Manufacturer
+from .price_history import record_prices
+from .read_model import refresh_catalog_entries
+from .similar import schedule_neighbor_update
+from .specs import refresh_equipment_specs
+
+IMPORT_BATCH_SIZE = 1000
+# Сколько ошибок строк сохранять в итогах и в журнале аудита
+MAX_REPORTED_ERRORS = 100
+
+# Заголовок столбца (без регистра) -> поле Equipment
+COLUMN_ALIASES = {
+    'name': 'name', 'название': 'name', 'наименование': 'name',
+    'model': 'model', 'модель': 'model',
+    'category': 'category', 'категория': 'category',
+    'manufacturer': 'manufacturer', 'производитель': 'manufacturer',
+    'vin': 'vin',
+    'year': 'year', 'год': 'year', 'год выпуска': 'year',
+    'condition': 'condition', 'состояние': 'condition',
+    'status': 'status', 'статус': 'status',
+    'price': 'price', 'цена': 'price',
+    'residual_value': 'residual_value', 'остаточная стоимость': 'residual_value',
+    'monthly_lease_rate': 'monthly_lease_rate', 'платёж в месяц': 'monthly_lease_rate',
+    'платеж в месяц': 'monthly_lease_rate',
+    'location': 'location', 'местоположение': 'location',
+    'specifications': 'specifications', 'характеристики': 'specifications',
+}
+REQUIRED_COLUMNS = ('name', 'model', 'category', 'price')
+# Поля, которые загрузка может изменить у существующей техники (если в файле есть столбец)
+UPDATE_FIELDS = [
+    'name', 'model', 'category', 'manufacturer', 'specifications', 'year', 'condition',
+    'status', 'price', 'residual_value', 'monthly_lease_rate', 'location',
+]
+
+
+class ImportFileError(ValueError):
+    """Файл нельзя загрузить целиком (формат, заголовок)."""
+
+
+def _choice_lookup(choices):
+    """Код или подпись варианта (без регистра) -> код."""
+    lookup = {}
+    for code, label in choices:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+    return lookup
+
+
+_CONDITIONS = _choice_lookup(Equipment.CONDITION_CHOICES)
+_STATUSES = _choice_lookup(Equipment.STATUS_CHOICES)
+
+
+class ImportSummary:
+    """Итоги загрузки: счётчики и первые ошибки строк."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.error_count = 0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'file': self.filename,
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def _iter_xlsx(file):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def _iter_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=';,\t')
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        yield from csv.reader(text, dialect)
+    finally:
+        # Файл закрывает вызывающий код
+        text.detach()
+
+
+def iter_rows(file, filename):
+    """Строки файла (первая — заголовок) по одной."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.xlsx':
+        return _iter_xlsx(file)
+    if extension in ('.csv', '.txt'):
+        return _iter_csv(file)
+    raise ImportFileError('Поддерживаются файлы .xlsx и .csv')
+
+
+def _columns(header):
+    columns = {}
+    for index, title in enumerate(header or ()):
+        field = COLUMN_ALIASES.get(str(title or '').strip().lower())
+        if field and field not in columns:
+            columns[field] = index
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if missing:
+        raise ImportFileError(f'Нет обязательных столбцов: {", ".join(missing)}')
+    return columns
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _decimal(value, label, required=False, max_digits=12):
+    text = _text(value).replace(' ', '').replace('\xa0', '').replace(',', '.')
+    if not text:
+        if required:
+            raise ValueError(f'не указано поле «{label}»')
+        return None
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f'«{label}»: не число ({text})') from None
+    # Два знака после запятой, как в DecimalField(decimal_places=2)
+    if not number.is_finite() or number < 0 or number >= 10 ** (max_digits - 2):
+        raise ValueError(f'«{label}»: неверное значение ({text})')
+    return number.quantize(Decimal('0.01'))
+
+
+class _RowParser:
+    """Проверка строки и сборка Equipment; справочники — словари в памяти."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.categories = {
+            name.strip().lower(): pk for pk, name in EquipmentCategory.objects.values_list('id', 'name')
+        }
+        self.manufacturers = {
+            name.strip().lower(): pk for pk, name in Manufacturer.objects.values_list('id', 'name')
+        }
+
+    def _get(self, row, field):
+        index = self.columns.get(field)
+        return row[index] if index is not None and index < len(row) else None
+
+    def parse(self, row):
+        name = _text(self._get(row, 'name'))[:255]
+        model = _text(self._get(row, 'model'))[:150]
+        if not name or not model:
+            raise ValueError('не указаны название или модель')
+        category = _text(self._get(row, 'category'))
+        category_id = self.categories.get(category.lower())
+        if category_id is None:
+            raise ValueError(f'неизвестная категория «{category}»')
+        manufacturer = _text(self._get(row, 'manufacturer'))
+        manufacturer_id = None
+        if manufacturer:
+            manufacturer_id = self.manufacturers.get(manufacturer.lower())
+            if manufacturer_id is None:
+                raise ValueError(f'неизвестный производитель «{manufacturer}»')
+        year = _text(self._get(row, 'year'))
+        if year and not (year.isdigit() and 1900 <= int(year) <= 2100):
+            raise ValueError(f'«Год выпуска»: неверное значение ({year})')
+        # Пустые состояние и статус заполняет _save_batch: текущие значения или умолчания
+        condition = _text(self._get(row, 'condition')).lower()
+        if condition and condition not in _CONDITIONS:
+            raise ValueError(f'«Состояние»: неизвестное значение ({condition})')
+        status = _text(self._get(row, 'status')).lower()
+        if status and status not in _STATUSES:
+            raise ValueError(f'«Статус»: неизвестное значение ({status})')
+        return Equipment(
+            name=name,
+            model=model,
+            category_id=category_id,
+            manufacturer_id=manufacturer_id,
+            vin=_text(self._get(row, 'vin'))[:100] or None,
+            year=int(year) if year else None,
+            condition=_CONDITIONS.get(condition, ''),
+            status=_STATUSES.get(status, ''),
+            price=_decimal(self._get(row, 'price'), 'Цена', required=True),
+            residual_value=_decimal(self._get(row, 'residual_value'), 'Остаточная стоимость'),
+            monthly_lease_rate=_decimal(self._get(row, 'monthly_lease_rate'), 'Платёж в месяц', max_digits=8),
+            location=_text(self._get(row, 'location'))[:500],
+            specifications=_text(self._get(row, 'specifications')),
+        )
+
+
+def _update_fields(columns):
+    """Поля для обновления существующей техники: столбцы файла и updated_at."""
+    return [field for field in UPDATE_FIELDS if field in columns] + ['updated_at']
+
+
+def _fill_defaults(equipment, current=None):
+    """Пустые состояние и статус: текущие (condition, status) записи или умолчания новой техники."""
+    condition, status = current or ('new', 'available')
+    equipment.condition = equipment.condition or condition
+    equipment.status = equipment.status or status
+
+
+def _save_batch(batch, summary, update_fields):
+    """Записывает пачку; возвращает id затронутой техники."""
+    now = timezone.now()
+    # Повтор ключа в одной пачке — последняя строка (ON CONFLICT не допускает дублей)
+    by_vin, by_name = {}, {}
+    for equipment in batch:
+        equipment.updated_at = now
+        if equipment.vin:
+            by_vin[equipment.vin] = equipment
+        else:
+            by_name[(equipment.name, equipment.model)] = equipment
+
+    ids = []
+    if by_vin:
+        existing = {
+            vin: (condition, status) for vin, condition, status
+            in Equipment.objects.filter(vin__in=list(by_vin)).values_list('vin', 'condition', 'status')
+        }
+        for vin, equipment in by_vin.items():
+            _fill_defaults(equipment, existing.get(vin))
+        Equipment.objects.bulk_create(
+            list(by_vin.values()),
+            update_conflicts=True,
+            unique_fields=['vin'],
+            update_fields=update_fields,
+        )
+        summary.created += len(by_vin) - len(existing)
+        summary.updated += len(existing)
+        ids.extend(Equipment.objects.filter(vin__in=list(by_vin)).values_list('id', flat=True))
+    if by_name:
+        names = {name for name, _ in by_name}
+        existing = {}
+        rows = (
+            Equipment.objects.filter(vin__isnull=True, name__in=names)
+            .order_by('id').values_list('name', 'model', 'id', 'condition', 'status')
+        )
+        for name, model, pk, condition, status in rows:
+            existing.setdefault((name, model), (pk, (condition, status)))
+        to_update, to_create = [], []
+        for key, equipment in by_name.items():
+            if key in existing:
+                equipment.pk, current = existing[key]
+                _fill_defaults(equipment, current)
+                to_update.append(equipment)
+            else:
+                _fill_defaults(equipment)
+                to_create.append(equipment)
+        Equipment.objects.bulk_update(to_update, update_fields)
+        # PostgreSQL и SQLite возвращают id новых строк (RETURNING)
+        Equipment.objects.bulk_create(to_create)
+        summary.created += len(to_create)
+        summary.updated += len(to_update)
+        ids.extend(equipment.pk for equipment in to_update + to_create)
+    return ids
+
+
+def refresh_equipment_derived(equipment_ids):
+    """
+    После bulk_create/bulk_update техники (загрузка, пакетный API) — то, что
+    при обычном сохранении делают сигналы apps/catalog/signals.py. Похожая
+    техника — инкрементально для equipment_ids после фиксации транзакции
+    (полный пересчёт — только manage.py rebuild_similar_equipment).
+    """
+    for start in range(0, len(equipment_ids), IMPORT_BATCH_SIZE):
+        batch = equipment_ids[start:start + IMPORT_BATCH_SIZE]
+        refresh_equipment_specs(batch)
+        refresh_catalog_entries(batch)
+        record_prices(batch)
+    schedule_neighbor_update(equipment_ids)
+    bump_catalog_version()
+
+
+@transaction.atomic
+def import_equipment(file, filename, request=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Загружает технику из файла (XLSX/CSV). Возвращает ImportSummary.
+    Ошибки строк не прерывают загрузку; ошибки файла — ImportFileError.
+    """
+    summary = ImportSummary(os.path.basename(filename or ''))
+    rows = iter_rows(file, filename)
+    columns = _columns(next(rows, None))
+    parser = _RowParser(columns)
+    update_fields = _update_fields(columns)
+    equipment_ids = []
+    batch = []
+    for line, row in enumerate(rows, start=2):
+        if not any(_text(value) for value in row):
+            continue
+        summary.rows += 1
+        try:
+            batch.append(parser.parse(row))
+        except ValueError as e:
+            summary.add_error(line, str(e))
+            continue
+        if len(batch) >= batch_size:
+            equipment_ids.extend(_save_batch(batch, summary, update_fields))
+            batch = []
+    if batch:
+        equipment_ids.extend(_save_batch(batch, summary, update_fields))
+
+    if equipment_ids:
+        refresh_equipment_derived(sorted(set(equipment_ids)))
+    log_audit(
+        action='IMPORT',
+        table_name=Equipment._meta.db_table,
+        record_id=0,
+        request=request,
+        new_values=summary.as_dict(),
+    )
+    return summary
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.snapshot import DEFAULT_SHARD_SIZE, export_catalog_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает доступный каталог в статические JSON-шарды (с .gz) и обратный поисковый индекс '
+        '(CATALOG_SNAPSHOT_DIR). Перезаписываются только шарды с изменившейся техникой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shard-size',
+            type=int,
+            default=DEFAULT_SHARD_SIZE,
+            help='Диапазон id техники в одном шарде (при смене пересобираются все шарды).',
+        )
+        parser.add_argument(
+            '--output',
+            help='Каталог для файлов снимка (по умолчанию CATALOG_SNAPSHOT_DIR).',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересобрать все шарды.',
+        )
+
+    def handle(self, *args, **options):
+        manifest, written = export_catalog_snapshot(
+            directory=options['output'],
+            shard_size=options['shard_size'],
+            force=options['force'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Снимок каталога {manifest['version']}: {manifest['total']} позиций, "
+            f"{len(manifest['shards'])} шардов, перезаписано {written}."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.importer import IMPORT_BATCH_SIZE, ImportFileError, import_equipment
+
+
+class Command(BaseCommand):
+    help = 'Загружает технику из прайс-листа XLSX/CSV (обновляет существующую по VIN или названию и модели).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .xlsx или .csv.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Сколько строк записывать за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as f:
+                summary = import_equipment(f, options['path'], batch_size=options['batch_size'])
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e)) from e
+        for error in summary.errors:
+            self.stderr.write(f"Строка {error['row']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк: {summary.rows}. Создано: {summary.created}, обновлено: {summary.updated}, '
+            f'пропущено с ошибками: {summary.error_count}.'))
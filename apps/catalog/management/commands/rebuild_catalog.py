@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.cache import bump_catalog_version, bump_references_version
+from apps.catalog.read_model import REBUILD_BATCH_SIZE, rebuild_catalog
+from apps.catalog.similar import rebuild_equipment_neighbors
+from apps.catalog.specs import rebuild_equipment_specs
+from apps.catalog.tree import rebuild_category_closure
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает дерево категорий, характеристики техники, таблицу каталога catalog_entry и похожую технику.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REBUILD_BATCH_SIZE,
+            help='Сколько строк записывать за один INSERT.',
+        )
+
+    def handle(self, *args, **options):
+        links = rebuild_category_closure()
+        specs = rebuild_equipment_specs(batch_size=options['batch_size'])
+        total = rebuild_catalog(batch_size=options['batch_size'])
+        neighbors = rebuild_equipment_neighbors(batch_size=options['batch_size'])
+        bump_catalog_version()
+        bump_references_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Каталог пересобран: {total} позиций, {links} связей категорий, {specs} характеристик, '
+            f'{neighbors} связей похожей техники.'))
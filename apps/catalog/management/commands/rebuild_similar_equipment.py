@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.read_model import REBUILD_BATCH_SIZE
+from apps.catalog.similar import NEIGHBORS_COUNT, rebuild_equipment_neighbors
+
+
+class Command(BaseCommand):
+    help = 'Заново считает похожую технику (equipment_neighbor) для всей доступной техники.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REBUILD_BATCH_SIZE,
+            help='Сколько строк записывать за один INSERT.',
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_equipment_neighbors(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожая техника пересчитана: {total} связей (до {NEIGHBORS_COUNT} на единицу).'))
@@ -0,0 +1,84 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Триггеры поддерживают equipment.search_vector при любых изменениях,
+# в том числе из SQL-скриптов (scripts/seed_db.sql) и массовых UPDATE.
+FORWARD_SQL = """
+CREATE OR REPLACE FUNCTION equipment_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.model, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(
+            (SELECT name FROM manufacturer WHERE id = NEW.manufacturer_id), '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(
+            (SELECT name FROM equipment_category WHERE id = NEW.category_id), '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(NEW.specifications, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_search_vector_trigger ON equipment;
+CREATE TRIGGER equipment_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, model, manufacturer_id, category_id, specifications
+    ON equipment FOR EACH ROW EXECUTE FUNCTION equipment_search_vector_update();
+
+CREATE OR REPLACE FUNCTION equipment_search_vector_refresh_related() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'manufacturer' THEN
+        UPDATE equipment SET name = name WHERE manufacturer_id = NEW.id;
+    ELSE
+        UPDATE equipment SET name = name WHERE category_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS manufacturer_search_vector_trigger ON manufacturer;
+CREATE TRIGGER manufacturer_search_vector_trigger
+    AFTER UPDATE OF name ON manufacturer FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION equipment_search_vector_refresh_related();
+
+DROP TRIGGER IF EXISTS equipment_category_search_vector_trigger ON equipment_category;
+CREATE TRIGGER equipment_category_search_vector_trigger
+    AFTER UPDATE OF name ON equipment_category FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION equipment_search_vector_refresh_related();
+
+CREATE INDEX IF NOT EXISTS idx_equipment_search_vector ON equipment USING gin (search_vector);
+
+UPDATE equipment SET name = name;
+"""
+
+REVERSE_SQL = """
+DROP INDEX IF EXISTS idx_equipment_search_vector;
+DROP TRIGGER IF EXISTS equipment_category_search_vector_trigger ON equipment_category;
+DROP TRIGGER IF EXISTS manufacturer_search_vector_trigger ON manufacturer;
+DROP TRIGGER IF EXISTS equipment_search_vector_trigger ON equipment;
+DROP FUNCTION IF EXISTS equipment_search_vector_refresh_related();
+DROP FUNCTION IF EXISTS equipment_search_vector_update();
+"""
+
+
+def _postgres_only(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(_postgres_only(FORWARD_SQL), _postgres_only(REVERSE_SQL)),
+    ]
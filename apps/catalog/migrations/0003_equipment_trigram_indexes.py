@@ -0,0 +1,33 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+FORWARD_SQL = """
+CREATE INDEX IF NOT EXISTS idx_equipment_name_trgm ON equipment USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_equipment_model_trgm ON equipment USING gin (model gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_manufacturer_name_trgm ON manufacturer USING gin (name gin_trgm_ops);
+"""
+
+REVERSE_SQL = """
+DROP INDEX IF EXISTS idx_manufacturer_name_trgm;
+DROP INDEX IF EXISTS idx_equipment_model_trgm;
+DROP INDEX IF EXISTS idx_equipment_name_trgm;
+"""
+
+
+def _postgres_only(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_equipment_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(_postgres_only(FORWARD_SQL), _postgres_only(REVERSE_SQL)),
+    ]
@@ -0,0 +1,106 @@
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+FORWARD_SQL = """
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_search_vector ON catalog_entry USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_name_trgm ON catalog_entry USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_model_trgm ON catalog_entry USING gin (model gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_manufacturer_trgm
+    ON catalog_entry USING gin (manufacturer_name gin_trgm_ops);
+"""
+
+REVERSE_SQL = """
+DROP INDEX IF EXISTS idx_catalog_entry_manufacturer_trgm;
+DROP INDEX IF EXISTS idx_catalog_entry_model_trgm;
+DROP INDEX IF EXISTS idx_catalog_entry_name_trgm;
+DROP INDEX IF EXISTS idx_catalog_entry_search_vector;
+"""
+
+
+def _postgres_only(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return run
+
+
+def fill_catalog_entries(apps, schema_editor):
+    Equipment = apps.get_model('catalog', 'Equipment')
+    CatalogEntry = apps.get_model('catalog', 'CatalogEntry')
+    entries = []
+    for equipment in Equipment.objects.filter(status='available').select_related('category', 'manufacturer'):
+        images = equipment.images_urls
+        if isinstance(images, list):
+            image_url = images[0] if images else ''
+        else:
+            image_url = images or ''
+        entries.append(CatalogEntry(
+            equipment_id=equipment.pk,
+            name=equipment.name,
+            model=equipment.model,
+            category_id=equipment.category_id,
+            category_name=equipment.category.name,
+            manufacturer_id=equipment.manufacturer_id,
+            manufacturer_name=equipment.manufacturer.name if equipment.manufacturer_id else '',
+            specifications=equipment.specifications or '',
+            condition=equipment.condition,
+            price=equipment.price,
+            monthly_lease_rate=equipment.monthly_lease_rate,
+            image_url=str(image_url)[:500],
+            search_vector=equipment.search_vector,
+            updated_at=equipment.updated_at,
+        ))
+    CatalogEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_equipment_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('equipment', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE, primary_key=True,
+                    related_name='catalog_entry', serialize=False, to='catalog.equipment',
+                )),
+                ('name', models.CharField(max_length=255)),
+                ('model', models.CharField(max_length=150)),
+                ('category_name', models.CharField(max_length=150)),
+                ('manufacturer_name', models.CharField(blank=True, max_length=255)),
+                ('specifications', models.TextField(blank=True, default='')),
+                ('condition', models.CharField(
+                    choices=[('new', 'Новая'), ('used', 'Б/У'), ('refurbished', 'Восстановленная')], max_length=50,
+                )),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('monthly_lease_rate', models.DecimalField(decimal_places=2, max_digits=8, null=True)),
+                ('image_url', models.CharField(blank=True, max_length=500)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField()),
+                ('category', models.ForeignKey(
+                    db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING,
+                    related_name='+', to='catalog.equipmentcategory',
+                )),
+                ('manufacturer', models.ForeignKey(
+                    db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING,
+                    related_name='+', to='catalog.manufacturer',
+                )),
+            ],
+            options={
+                'verbose_name': 'карточка каталога',
+                'verbose_name_plural': 'карточки каталога',
+                'db_table': 'catalog_entry',
+                'indexes': [
+                    models.Index(fields=['category_name', 'name', 'equipment'], name='idx_catalog_entry_name'),
+                    models.Index(fields=['price', 'equipment'], name='idx_catalog_entry_price'),
+                    models.Index(fields=['monthly_lease_rate', 'equipment'], name='idx_catalog_entry_rate'),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_catalog_entries, migrations.RunPython.noop),
+        migrations.RunPython(_postgres_only(FORWARD_SQL), _postgres_only(REVERSE_SQL)),
+    ]
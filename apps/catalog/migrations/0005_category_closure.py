@@ -0,0 +1,48 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_category_closure(apps, schema_editor):
+    EquipmentCategory = apps.get_model('catalog', 'EquipmentCategory')
+    CategoryClosure = apps.get_model('catalog', 'CategoryClosure')
+    parents = dict(EquipmentCategory.objects.values_list('id', 'parent_id'))
+    links = []
+    for category_id in parents:
+        ancestor_id, depth, seen = category_id, 0, set()
+        while ancestor_id is not None and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            links.append(CategoryClosure(ancestor_id=ancestor_id, descendant_id=category_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+    CategoryClosure.objects.bulk_create(links, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_catalog_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('ancestor', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links',
+                    to='catalog.equipmentcategory',
+                )),
+                ('descendant', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links',
+                    to='catalog.equipmentcategory',
+                )),
+            ],
+            options={
+                'verbose_name': 'связь категорий',
+                'verbose_name_plural': 'связи категорий',
+                'db_table': 'equipment_category_closure',
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='uq_category_closure')],
+            },
+        ),
+        migrations.RunPython(fill_category_closure, migrations.RunPython.noop),
+    ]
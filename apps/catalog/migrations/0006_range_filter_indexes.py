@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+def fill_catalog_entry_year(apps, schema_editor):
+    Equipment = apps.get_model('catalog', 'Equipment')
+    CatalogEntry = apps.get_model('catalog', 'CatalogEntry')
+    CatalogEntry.objects.update(year=models.Subquery(
+        Equipment.objects.filter(pk=models.OuterRef('equipment_id')).values('year')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_category_closure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogentry',
+            name='year',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.RunPython(fill_catalog_entry_year, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['year'], name='idx_catalog_entry_year'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['status', 'price'], name='idx_equipment_status_price'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['status', 'monthly_lease_rate'], name='idx_equipment_status_rate'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['status', 'category'], name='idx_equipment_status_category'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+import re
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Копия шаблонов apps/catalog/specs.py на момент миграции: её результат не
+# должен зависеть от последующих изменений модуля
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+SPEC_PATTERNS = {
+    'power_hp': re.compile(r'мощность\s+' + _NUMBER + r'\s*л\.\s*с', re.IGNORECASE),
+    'throughput_tph': re.compile(r'производительность\s+' + _NUMBER + r'\s*т/ч', re.IGNORECASE),
+    'tank_l': re.compile(r'бак\s+' + _NUMBER + r'\s*л', re.IGNORECASE),
+    'working_width_m': re.compile(r'ширина\s+захвата\s+' + _NUMBER + r'\s*м', re.IGNORECASE),
+    'cut_length_mm': re.compile(r'длина\s+резки\s+' + _NUMBER + r'\s*мм', re.IGNORECASE),
+    'hoppers': re.compile(r'(\d+)\s+бункер', re.IGNORECASE),
+    'plough_bodies': re.compile(r'(\d+)\s+корпус', re.IGNORECASE),
+}
+
+
+def parse_specifications(text):
+    attributes = {}
+    for attribute, pattern in SPEC_PATTERNS.items():
+        match = pattern.search(text or '')
+        if match:
+            attributes[attribute] = Decimal(match.group(1).replace(',', '.'))
+    return attributes
+
+
+def parse_existing_specifications(apps, schema_editor):
+    Equipment = apps.get_model('catalog', 'Equipment')
+    EquipmentSpec = apps.get_model('catalog', 'EquipmentSpec')
+    specs = []
+    for equipment_id, text in Equipment.objects.values_list('id', 'specifications'):
+        specs.extend(
+            EquipmentSpec(equipment_id=equipment_id, attribute=attribute, value=value)
+            for attribute, value in parse_specifications(text).items()
+        )
+    EquipmentSpec.objects.bulk_create(specs, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_range_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentSpec',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attribute', models.CharField(
+                    choices=[
+                        ('power_hp', 'Мощность, л.с.'), ('throughput_tph', 'Производительность, т/ч'),
+                        ('tank_l', 'Бак, л'), ('working_width_m', 'Ширина захвата, м'),
+                        ('cut_length_mm', 'Длина резки, мм'), ('hoppers', 'Бункеров'),
+                        ('plough_bodies', 'Корпусов плуга'),
+                    ],
+                    max_length=50,
+                )),
+                ('value', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('equipment', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='specs', to='catalog.equipment',
+                )),
+            ],
+            options={
+                'verbose_name': 'характеристика техники',
+                'verbose_name_plural': 'характеристики техники',
+                'db_table': 'equipment_spec',
+                'indexes': [models.Index(fields=['attribute', 'value', 'equipment'], name='idx_equipment_spec_value')],
+                'constraints': [models.UniqueConstraint(fields=('equipment', 'attribute'), name='uq_equipment_spec')],
+            },
+        ),
+        migrations.RunPython(parse_existing_specifications, migrations.RunPython.noop),
+    ]
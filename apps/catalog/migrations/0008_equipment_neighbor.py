@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_equipment_spec'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('distance', models.FloatField()),
+                ('equipment', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='catalog.equipment',
+                )),
+                ('neighbor', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='catalog.equipment',
+                )),
+            ],
+            options={
+                'verbose_name': 'похожая техника',
+                'verbose_name_plural': 'похожая техника',
+                'db_table': 'equipment_neighbor',
+                'constraints': [
+                    models.UniqueConstraint(fields=('equipment', 'rank'), name='uq_equipment_neighbor_rank'),
+                ],
+            },
+        ),
+    ]
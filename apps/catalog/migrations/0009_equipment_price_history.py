@@ -0,0 +1,46 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_current_prices(apps, schema_editor):
+    # Начало истории — текущие цена и платёж на момент последнего изменения техники
+    Equipment = apps.get_model('catalog', 'Equipment')
+    EquipmentPrice = apps.get_model('catalog', 'EquipmentPrice')
+    EquipmentPrice.objects.bulk_create(
+        (
+            EquipmentPrice(equipment_id=pk, effective_at=updated_at, price=price, monthly_lease_rate=rate)
+            for pk, updated_at, price, rate in Equipment.objects.values_list(
+                'id', 'updated_at', 'price', 'monthly_lease_rate'
+            ).iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_equipment_neighbor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('effective_at', models.DateTimeField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('monthly_lease_rate', models.DecimalField(decimal_places=2, max_digits=8, null=True)),
+                ('equipment', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='catalog.equipment',
+                )),
+            ],
+            options={
+                'verbose_name': 'цена техники',
+                'verbose_name_plural': 'история цен техники',
+                'db_table': 'equipment_price_history',
+                'indexes': [models.Index(fields=['equipment', 'effective_at'], name='idx_equipment_price_history')],
+            },
+        ),
+        migrations.RunPython(record_current_prices, migrations.RunPython.noop),
+    ]
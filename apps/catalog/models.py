@@ -1,3 +1,5 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
@@ -22,6 +24,48 @@ class EquipmentCategory(models.Model):
     def __str__(self):
         return self.name
 
+    CYCLE_ERROR = 'Категория не может быть вложена в саму себя или свою подкатегорию.'
+
+    def is_ancestor_of(self, category_id):
+        """Является ли категория category_id ею самой или её подкатегорией (по таблице замыкания)."""
+        return bool(self.pk and category_id) and CategoryClosure.objects.filter(
+            ancestor_id=self.pk, descendant_id=category_id
+        ).exists()
+
+    def clean(self):
+        super().clean()
+        if self.is_ancestor_of(self.parent_id):
+            raise ValidationError({'parent': self.CYCLE_ERROR})
+
+
+class CategoryClosure(models.Model):
+    """
+    Таблица замыкания дерева категорий: пара (предок, потомок) для каждого пути,
+    включая саму категорию (depth=0). Поддерживается сигналами (apps/catalog/tree.py).
+    """
+    ancestor = models.ForeignKey(
+        EquipmentCategory,
+        on_delete=models.CASCADE,
+        related_name='descendant_links',
+    )
+    descendant = models.ForeignKey(
+        EquipmentCategory,
+        on_delete=models.CASCADE,
+        related_name='ancestor_links',
+    )
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = 'equipment_category_closure'
+        verbose_name = 'связь категорий'
+        verbose_name_plural = 'связи категорий'
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='uq_category_closure'),
+        ]
+
+    def __str__(self):
+        return f'{self.ancestor_id} -> {self.descendant_id} ({self.depth})'
+
 
 class Manufacturer(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -79,6 +123,8 @@ class Equipment(models.Model):
     status = models.CharField(max_length=50, default='available', choices=STATUS_CHOICES)
     location = models.CharField(max_length=500, blank=True)
     images_urls = models.JSONField(default=list, blank=True)
+    # Заполняется триггером PostgreSQL (см. apps/catalog/search.py), индекс GIN
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -86,6 +132,162 @@ class Equipment(models.Model):
         db_table = 'equipment'
         verbose_name = 'техника'
         verbose_name_plural = 'техника'
+        # Фильтры API по статусу с диапазоном цены/платежа и по категории
+        indexes = [
+            models.Index(fields=['status', 'price'], name='idx_equipment_status_price'),
+            models.Index(fields=['status', 'monthly_lease_rate'], name='idx_equipment_status_rate'),
+            models.Index(fields=['status', 'category'], name='idx_equipment_status_category'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.model})'
+
+
+class EquipmentSpec(models.Model):
+    """
+    Числовая характеристика техники, разобранная из Equipment.specifications
+    (apps/catalog/specs.py). Индекс (attribute, value) обслуживает фильтры
+    вида «мощность от 300 л.с.».
+    """
+    ATTRIBUTE_CHOICES = [
+        ('power_hp', 'Мощность, л.с.'),
+        ('throughput_tph', 'Производительность, т/ч'),
+        ('tank_l', 'Бак, л'),
+        ('working_width_m', 'Ширина захвата, м'),
+        ('cut_length_mm', 'Длина резки, мм'),
+        ('hoppers', 'Бункеров'),
+        ('plough_bodies', 'Корпусов плуга'),
+    ]
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='specs',
+    )
+    attribute = models.CharField(max_length=50, choices=ATTRIBUTE_CHOICES)
+    value = models.DecimalField(max_digits=12, decimal_places=3)
+
+    class Meta:
+        db_table = 'equipment_spec'
+        verbose_name = 'характеристика техники'
+        verbose_name_plural = 'характеристики техники'
+        constraints = [
+            models.UniqueConstraint(fields=['equipment', 'attribute'], name='uq_equipment_spec'),
+        ]
+        indexes = [
+            models.Index(fields=['attribute', 'value', 'equipment'], name='idx_equipment_spec_value'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_attribute_display()}: {self.value}'
+
+
+class EquipmentNeighbor(models.Model):
+    """
+    Похожая техника: для каждой доступной единицы — ближайшие соседи по
+    признакам (apps/catalog/similar.py), rank 1 — самая похожая.
+    """
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='neighbors',
+    )
+    neighbor = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='neighbor_of',
+    )
+    rank = models.PositiveSmallIntegerField()
+    distance = models.FloatField()
+
+    class Meta:
+        db_table = 'equipment_neighbor'
+        verbose_name = 'похожая техника'
+        verbose_name_plural = 'похожая техника'
+        constraints = [
+            models.UniqueConstraint(fields=['equipment', 'rank'], name='uq_equipment_neighbor_rank'),
+        ]
+
+    def __str__(self):
+        return f'{self.equipment_id} → {self.neighbor_id} ({self.rank})'
+
+
+class EquipmentPrice(models.Model):
+    """
+    История цены и ежемесячного платежа техники: строка на каждое изменение,
+    только добавление (apps/catalog/price_history.py).
+    """
+    equipment = models.ForeignKey(
+        Equipment,
+        on_delete=models.CASCADE,
+        related_name='price_history',
+    )
+    effective_at = models.DateTimeField()
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    monthly_lease_rate = models.DecimalField(max_digits=8, decimal_places=2, null=True)
+
+    class Meta:
+        db_table = 'equipment_price_history'
+        verbose_name = 'цена техники'
+        verbose_name_plural = 'история цен техники'
+        indexes = [
+            models.Index(fields=['equipment', 'effective_at'], name='idx_equipment_price_history'),
+        ]
+
+    def __str__(self):
+        return f'{self.equipment_id}: {self.price} с {self.effective_at:%d.%m.%Y}'
+
+
+class CatalogEntry(models.Model):
+    """
+    Карточка каталога (read model): доступная техника со всем, что выводит
+    страница лизинга, — названия категории и производителя, первое фото,
+    ключи сортировки и поисковый текст — без JOIN. Поддерживается сигналами
+    (apps/catalog/read_model.py), пересобирается командой rebuild_catalog.
+    """
+    equipment = models.OneToOneField(
+        Equipment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='catalog_entry',
+    )
+    name = models.CharField(max_length=255)
+    model = models.CharField(max_length=150)
+    # Без ограничений FK: строка обновляется после изменения справочников
+    category = models.ForeignKey(
+        EquipmentCategory,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+    )
+    category_name = models.CharField(max_length=150)
+    manufacturer = models.ForeignKey(
+        Manufacturer,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+',
+    )
+    manufacturer_name = models.CharField(max_length=255, blank=True)
+    specifications = models.TextField(blank=True, default='')
+    condition = models.CharField(max_length=50, choices=Equipment.CONDITION_CHOICES)
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    monthly_lease_rate = models.DecimalField(max_digits=8, decimal_places=2, null=True)
+    year = models.IntegerField(null=True)
+    image_url = models.CharField(max_length=500, blank=True)
+    # Копия equipment.search_vector
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'catalog_entry'
+        verbose_name = 'карточка каталога'
+        verbose_name_plural = 'карточки каталога'
+        indexes = [
+            models.Index(fields=['category_name', 'name', 'equipment'], name='idx_catalog_entry_name'),
+            models.Index(fields=['price', 'equipment'], name='idx_catalog_entry_price'),
+            models.Index(fields=['monthly_lease_rate', 'equipment'], name='idx_catalog_entry_rate'),
+            models.Index(fields=['year'], name='idx_catalog_entry_year'),
+        ]
 
     def __str__(self):
         return f'{self.name} ({self.model})'
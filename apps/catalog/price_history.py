@@ -0,0 +1,115 @@
+"""
+История цен техники (таблица equipment_price_history).
+
+Строка добавляется, когда цена или ежемесячный платёж отличаются от последней
+записанной: при сохранении техники (apps/catalog/signals.py) и после загрузки
+прайс-листа (apps/catalog/importer.py). Строки не меняются и не удаляются,
+кроме каскада при удалении техники.
+
+Графики и калькулятор читают историю через API
+(GET /api/equipment/<id>/price-history/): диапазон по индексу
+(equipment_id, effective_at) проходится один раз и прореживается до заданного
+числа точек — журнал аудита для этого не нужен.
+"""
+from datetime import datetime, time
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Equipment, EquipmentPrice
+
+DEFAULT_SERIES_POINTS = 100
+MAX_SERIES_POINTS = 1000
+
+
+def record_prices(equipment_ids):
+    """
+    Добавляет строку истории технике, у которой цена или платёж изменились
+    (или истории ещё нет). Время — updated_at техники. Возвращает число строк.
+    """
+    latest = EquipmentPrice.objects.filter(equipment=OuterRef('pk')).order_by('-effective_at', '-id')
+    rows = Equipment.objects.filter(pk__in=list(equipment_ids)).annotate(
+        last_id=Subquery(latest.values('id')[:1]),
+        last_price=Subquery(latest.values('price')[:1]),
+        last_rate=Subquery(latest.values('monthly_lease_rate')[:1]),
+    ).values_list('id', 'updated_at', 'price', 'monthly_lease_rate', 'last_id', 'last_price', 'last_rate')
+    prices = [
+        EquipmentPrice(equipment_id=equipment_id, effective_at=updated_at, price=price, monthly_lease_rate=rate)
+        for equipment_id, updated_at, price, rate, last_id, last_price, last_rate in rows
+        if last_id is None or (price, rate) != (last_price, last_rate)
+    ]
+    EquipmentPrice.objects.bulk_create(prices)
+    return len(prices)
+
+
+def parse_moment(raw, end_of_day=False):
+    """Дата или дата-время из GET-параметра; неверное значение — None."""
+    if not raw:
+        return None
+    try:
+        moment = parse_datetime(raw)
+        if moment is None:
+            day = parse_date(raw)
+            if day is None:
+                return None
+            moment = datetime.combine(day, time.max if end_of_day else time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _point(effective_at, price, rate, price_min, price_max):
+    return {
+        'effective_at': effective_at,
+        'price': price,
+        'monthly_lease_rate': rate,
+        'price_min': price_min,
+        'price_max': price_max,
+    }
+
+
+def price_series(equipment_id, start=None, end=None, points=DEFAULT_SERIES_POINTS):
+    """
+    История цены за период [start, end], прореженная до points точек.
+
+    Период делится на points равных интервалов; от каждого интервала
+    остаётся последнее изменение (цена ступенчатая — она и действует до
+    следующей точки) с минимумом и максимумом цены внутри интервала. Цена,
+    действовавшая на start, входит в первый интервал. Память не зависит от
+    длины истории.
+    """
+    points = max(1, min(points, MAX_SERIES_POINTS))
+    end = end or timezone.now()
+    history = EquipmentPrice.objects.filter(equipment_id=equipment_id)
+    fields = ('effective_at', 'price', 'monthly_lease_rate')
+    bucket = current = None
+    if start is None:
+        start = history.order_by('effective_at', 'id').values_list('effective_at', flat=True).first()
+        if start is None:
+            return []
+    else:
+        before = history.filter(effective_at__lt=start).order_by('-effective_at', '-id').values_list(*fields).first()
+        if before is not None:
+            bucket, current = 0, [start, before[1], before[2], before[1], before[1]]
+    if end < start:
+        return [_point(*current)] if current else []
+
+    series = []
+    width = (end - start) / points
+    rows = history.filter(effective_at__gte=start, effective_at__lte=end).order_by('effective_at', 'id')
+    for effective_at, price, rate in rows.values_list(*fields).iterator(chunk_size=2000):
+        index = min(int((effective_at - start) / width), points - 1) if width else 0
+        if index != bucket:
+            if current is not None:
+                series.append(_point(*current))
+            bucket, current = index, [effective_at, price, rate, price, price]
+        else:
+            current[:3] = effective_at, price, rate
+            current[3] = min(current[3], price)
+            current[4] = max(current[4], price)
+    if current is not None:
+        series.append(_point(*current))
+    return series
@@ -0,0 +1,152 @@
+"""
+Диапазонные фильтры каталога (цена, платёж в месяц, год) и гистограммы к ним.
+
+Параметры запроса: price_min/price_max, rate_min/rate_max, year_min/year_max
+(границы включительно). Одни и те же параметры понимают страница лизинга
+(таблица catalog_entry, индексы (price), (monthly_lease_rate), (year)) и API
+техники (индексы (status, price), (status, monthly_lease_rate) на equipment).
+
+Гистограммы для ползунков считаются по доступной технике один раз на версию
+каталога (apps/catalog/cache.py): MIN/MAX по индексу и по одному
+сгруппированному запросу на поле.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, IntegerField, Max, Min, Q, Value
+from django.db.models.functions import Cast, Floor, Least
+
+from .cache import aget_catalog_version
+from .models import CatalogEntry
+
+# Параметр запроса -> (поле модели, тип значения, подпись)
+RANGE_FILTERS = {
+    'price': ('price', Decimal, 'Цена, ₽'),
+    'rate': ('monthly_lease_rate', Decimal, 'Платёж в месяц, ₽'),
+    'year': ('year', int, 'Год выпуска'),
+}
+
+HISTOGRAM_BINS = 12
+# Страховка от изменений в обход сигналов (SQL-скрипты)
+HISTOGRAMS_CACHE_TTL = 300
+
+
+def _parse_value(raw, value_type):
+    if raw in (None, ''):
+        return None
+    try:
+        value = value_type(str(raw).strip().replace(' ', '').replace(',', '.'))
+    except (ValueError, TypeError, InvalidOperation):
+        return None
+    if value_type is Decimal and not value.is_finite():
+        return None
+    return value
+
+
+def parse_ranges(params):
+    """Диапазоны из GET-параметров: {'price': (от, до), ...}, неверные значения пропускаются."""
+    ranges = {}
+    for name, (_, value_type, _) in RANGE_FILTERS.items():
+        low = _parse_value(params.get(f'{name}_min'), value_type)
+        high = _parse_value(params.get(f'{name}_max'), value_type)
+        if low is not None and high is not None and low > high:
+            low, high = high, low
+        if low is not None or high is not None:
+            ranges[name] = (low, high)
+    return ranges
+
+
+def range_q(ranges):
+    """Условие на поля модели по разобранным диапазонам."""
+    q = Q()
+    for name, (low, high) in ranges.items():
+        field = RANGE_FILTERS[name][0]
+        if low is not None:
+            q &= Q(**{f'{field}__gte': low})
+        if high is not None:
+            q &= Q(**{f'{field}__lte': high})
+    return q
+
+
+def range_filter_options(ranges, histograms):
+    """Поля диапазонов для шаблона: выбранные границы и гистограмма."""
+    options = []
+    for name, (_, _, label) in RANGE_FILTERS.items():
+        low, high = ranges.get(name, (None, None))
+        options.append({
+            'name': name,
+            'label': label,
+            'min': low,
+            'max': high,
+            'histogram': histograms.get(name),
+        })
+    return options
+
+
+def _bins(low, high, counts, value_type):
+    bin_count = HISTOGRAM_BINS if high > low else 1
+    width = (high - low) / bin_count
+    peak = max(counts.values(), default=0) or 1
+    bins = []
+    for index in range(bin_count):
+        start = low + width * index
+        end = high if index == bin_count - 1 else low + width * (index + 1)
+        count = counts.get(index, 0)
+        bins.append({
+            'low': value_type(start) if value_type is int else round(start, 2),
+            'high': value_type(end) if value_type is int else round(end, 2),
+            'count': count,
+            'percent': round(count * 100 / peak),
+        })
+    return bins
+
+
+async def compute_histograms():
+    """Гистограммы доступной техники: {'price': {'min', 'max', 'bins': [...]}, ...}."""
+    qs = CatalogEntry.objects.all()
+    aggregates = {}
+    for name, (field, *_) in RANGE_FILTERS.items():
+        aggregates[f'{name}_min'] = Min(field)
+        aggregates[f'{name}_max'] = Max(field)
+    bounds = await qs.aaggregate(**aggregates)
+
+    histograms = {}
+    for name, (field, value_type, _) in RANGE_FILTERS.items():
+        low, high = bounds[f'{name}_min'], bounds[f'{name}_max']
+        if low is None:
+            continue
+        low, high = float(low), float(high)
+        counts = {}
+        if high > low:
+            width = (high - low) / HISTOGRAM_BINS
+            bucket = Least(
+                Cast(Floor((Cast(F(field), FloatField()) - Value(low)) / Value(width)), IntegerField()),
+                Value(HISTOGRAM_BINS - 1),
+            )
+            rows = (
+                qs.filter(**{f'{field}__isnull': False})
+                .annotate(bucket=bucket)
+                .values('bucket')
+                .annotate(count=Count('pk'))
+                .order_by()
+            )
+            async for row in rows:
+                counts[int(row['bucket'])] = row['count']
+        else:
+            counts[0] = await qs.filter(**{field: bounds[f'{name}_min']}).acount()
+        histograms[name] = {
+            'min': bounds[f'{name}_min'],
+            'max': bounds[f'{name}_max'],
+            'bins': _bins(low, high, counts, value_type),
+        }
+    return histograms
+
+
+async def aget_histograms():
+    """Гистограммы из кэша (пересчитываются после изменения каталога)."""
+    key = f'catalog:histograms:{await aget_catalog_version()}'
+    histograms = await cache.aget(key)
+    if histograms is None:
+        histograms = await compute_histograms()
+        await cache.aset(key, histograms, HISTOGRAMS_CACHE_TTL)
+    return histograms
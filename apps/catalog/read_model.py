@@ -0,0 +1,97 @@
+"""
+Read model каталога: таблица catalog_entry (модель CatalogEntry).
+
+Страница лизинга читает одну таблицу: в строке уже лежат названия категории и
+производителя, первое фото, ключи сортировки и копия search_vector, а индексы
+(category_name, name), (price) и (monthly_lease_rate) соответствуют сортировкам
+каталога. В таблице только доступная техника (status='available').
+
+Строки обновляются сигналами (apps/catalog/signals.py) при изменении техники,
+категорий и производителей; полная пересборка — manage.py rebuild_catalog.
+"""
+from django.db import transaction
+
+from .models import CatalogEntry, Equipment
+
+REBUILD_BATCH_SIZE = 500
+
+_UPDATE_FIELDS = [
+    'name', 'model', 'category', 'category_name', 'manufacturer', 'manufacturer_name',
+    'specifications', 'condition', 'price', 'monthly_lease_rate', 'year', 'image_url',
+    'search_vector', 'updated_at',
+]
+
+
+def first_image_url(images_urls):
+    """Первое фото: images_urls — список или строка."""
+    if not images_urls:
+        return ''
+    if isinstance(images_urls, (list, tuple)):
+        return images_urls[0] or ''
+    return str(images_urls)
+
+
+def entry_from_equipment(equipment):
+    manufacturer = equipment.manufacturer
+    return CatalogEntry(
+        equipment_id=equipment.pk,
+        name=equipment.name,
+        model=equipment.model,
+        category_id=equipment.category_id,
+        category_name=equipment.category.name,
+        manufacturer_id=equipment.manufacturer_id,
+        manufacturer_name=manufacturer.name if manufacturer else '',
+        specifications=equipment.specifications or '',
+        condition=equipment.condition,
+        price=equipment.price,
+        monthly_lease_rate=equipment.monthly_lease_rate,
+        year=equipment.year,
+        image_url=first_image_url(equipment.images_urls)[:500],
+        search_vector=equipment.search_vector,
+        updated_at=equipment.updated_at,
+    )
+
+
+def _source_queryset():
+    return Equipment.objects.filter(status='available').select_related('category', 'manufacturer')
+
+
+def _upsert(equipment_list):
+    CatalogEntry.objects.bulk_create(
+        [entry_from_equipment(equipment) for equipment in equipment_list],
+        update_conflicts=True,
+        unique_fields=['equipment'],
+        update_fields=_UPDATE_FIELDS,
+    )
+
+
+@transaction.atomic
+def refresh_catalog_entries(equipment_ids):
+    """Пересчитывает строки каталога для указанной техники (недоступная удаляется)."""
+    equipment_ids = set(equipment_ids)
+    if not equipment_ids:
+        return
+    # Заново из БД: search_vector заполняет триггер после сохранения
+    equipment_list = list(_source_queryset().filter(pk__in=equipment_ids))
+    _upsert(equipment_list)
+    CatalogEntry.objects.filter(equipment_id__in=equipment_ids).exclude(
+        equipment_id__in=[equipment.pk for equipment in equipment_list]
+    ).delete()
+
+
+@transaction.atomic
+def rebuild_catalog(batch_size=REBUILD_BATCH_SIZE):
+    """Полностью пересобирает каталог. Возвращает число строк."""
+    CatalogEntry.objects.all().delete()
+    total = 0
+    batch = []
+    for equipment in _source_queryset().order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(equipment)
+        if len(batch) >= batch_size:
+            _upsert(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        _upsert(batch)
+        total += len(batch)
+    return total
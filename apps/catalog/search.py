@@ -0,0 +1,115 @@
+"""
+Поиск по технике.
+
+На PostgreSQL столбец equipment.search_vector (tsvector, конфигурация russian)
+поддерживают триггеры БД (миграция catalog 0002, scripts/create_db.sql):
+название и модель — вес A, производитель и категория — B, характеристики — C.
+Поиск идёт по GIN-индексу, результаты ранжируются ts_rank.
+
+Опечатки и разные написания («Jon Dere 8R») ловит триграммный поиск pg_trgm по
+названию, модели и производителю (GIN-индексы gin_trgm_ops, миграция catalog 0003).
+
+Каталог ищет по таблице catalog_entry (apps/catalog/read_model.py), где те же
+индексы построены по копии search_vector и денормализованным названиям; функции
+ниже принимают queryset и Equipment, и CatalogEntry.
+
+На других СУБД (SQLite в тестах) — поиск по подстроке без ранжирования.
+"""
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+from .models import CatalogEntry, Manufacturer
+
+SEARCH_CONFIG = 'russian'
+
+# Подсказок в автодополнении и минимальная длина запроса
+SUGGEST_LIMIT = 8
+SUGGEST_MIN_LENGTH = 2
+
+
+def supports_fulltext(qs):
+    return connections[qs.db].vendor == 'postgresql'
+
+
+def _is_catalog(qs):
+    return qs.model is CatalogEntry
+
+
+def _trigram_match(qs, q):
+    """Условие по триграммам: оператор %> использует GIN-индексы gin_trgm_ops."""
+    if _is_catalog(qs):
+        manufacturer = Q(manufacturer_name__trigram_word_similar=q)
+    else:
+        manufacturer = Q(manufacturer_id__in=Manufacturer.objects.filter(
+            name__trigram_word_similar=q).values('id'))
+    return Q(name__trigram_word_similar=q) | Q(model__trigram_word_similar=q) | manufacturer
+
+
+def _trigram_similarity(qs, q):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    manufacturer = 'manufacturer_name' if _is_catalog(qs) else 'manufacturer__name'
+    return Greatest(
+        TrigramWordSimilarity(q, 'name'),
+        TrigramWordSimilarity(q, 'model'),
+        Coalesce(TrigramWordSimilarity(q, manufacturer), 0.0),
+    )
+
+
+def _substring_match(qs, q):
+    if _is_catalog(qs):
+        manufacturer, category = 'manufacturer_name', 'category_name'
+    else:
+        manufacturer, category = 'manufacturer__name', 'category__name'
+    return (
+        Q(name__icontains=q)
+        | Q(model__icontains=q)
+        | Q(**{f'{manufacturer}__icontains': q})
+        | Q(**{f'{category}__icontains': q})
+        | Q(specifications__icontains=q)
+    )
+
+
+def _search_query(q):
+    from django.contrib.postgres.search import SearchQuery
+
+    return SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def filter_equipment(qs, q):
+    """Фильтрует технику по строке поиска (без ранжирования)."""
+    if supports_fulltext(qs):
+        return qs.filter(Q(search_vector=_search_query(q)) | _trigram_match(qs, q))
+    return qs.filter(_substring_match(qs, q))
+
+
+def search_equipment(qs, q):
+    """
+    Фильтрует технику по строке поиска и добавляет аннотацию search_rank.
+
+    ts_rank и similarity возвращают real; ранг приводится к double precision,
+    иначе значение из курсора keyset-пагинации не совпадёт с ним при сравнении.
+    """
+    qs = filter_equipment(qs, q)
+    if supports_fulltext(qs):
+        from django.contrib.postgres.search import SearchRank
+
+        return qs.annotate(
+            search_rank=Cast(
+                Coalesce(SearchRank(F('search_vector'), _search_query(q)), 0.0) + _trigram_similarity(qs, q),
+                FloatField(),
+            ),
+        )
+    return qs.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def suggest_equipment(q, limit=SUGGEST_LIMIT):
+    """Queryset подсказок для строки поиска: доступная техника, самые похожие первыми."""
+    qs = CatalogEntry.objects.all()
+    if supports_fulltext(qs):
+        qs = qs.filter(_trigram_match(qs, q)).annotate(similarity=_trigram_similarity(qs, q))
+        qs = qs.order_by('-similarity', 'name')
+    else:
+        qs = qs.filter(_substring_match(qs, q)).order_by('name')
+    return qs.values('equipment_id', 'name', 'model', 'manufacturer_name')[:limit]
@@ -0,0 +1,85 @@
+"""Сигналы приложения catalog: версия каталога, read model, дерево категорий, похожая техника и история цен."""
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version, bump_references_version
+from .models import CatalogEntry, Equipment, EquipmentCategory, EquipmentNeighbor, Manufacturer
+from .price_history import record_prices
+from .read_model import refresh_catalog_entries
+from .similar import schedule_neighbor_update
+from .specs import sync_equipment_specs
+from .tree import attach_category, detach_subtree, subtree_q
+
+
+@receiver(post_save, sender=Equipment)
+@receiver(post_delete, sender=Equipment)
+@receiver(post_save, sender=EquipmentCategory)
+@receiver(post_delete, sender=EquipmentCategory)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+def catalog_changed(sender, instance, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=EquipmentCategory)
+@receiver(post_delete, sender=EquipmentCategory)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+def references_changed(sender, instance, **kwargs):
+    bump_references_version()
+
+
+@receiver(post_save, sender=Equipment)
+def equipment_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_equipment_specs(instance)
+        refresh_catalog_entries([instance.pk])
+        schedule_neighbor_update([instance.pk])
+        record_prices([instance.pk])
+
+
+@receiver(pre_delete, sender=Equipment)
+def equipment_deleting(sender, instance, **kwargs):
+    # Связи «сосед — удаляемая техника» снимет каскад; списки пересчитываются после удаления
+    instance._neighbor_of = list(
+        EquipmentNeighbor.objects.filter(neighbor=instance).values_list('equipment_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Equipment)
+def equipment_deleted(sender, instance, **kwargs):
+    schedule_neighbor_update([instance.pk], neighbor_of=getattr(instance, '_neighbor_of', ()))
+
+
+@receiver(post_save, sender=EquipmentCategory)
+def category_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    moved = attach_category(instance)
+    if not created:
+        refresh_catalog_entries(
+            CatalogEntry.objects.filter(category_id=instance.pk).values_list('equipment_id', flat=True)
+        )
+    if moved and not created:
+        # Предки категории — признаки похожести всей техники поддерева
+        schedule_neighbor_update(
+            CatalogEntry.objects.filter(subtree_q(instance.pk)).values_list('equipment_id', flat=True)
+        )
+
+
+@receiver(pre_delete, sender=EquipmentCategory)
+def category_deleting(sender, instance, **kwargs):
+    detach_subtree(instance)
+
+
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_delete, sender=Manufacturer)
+def manufacturer_changed(sender, instance, signal=None, created=False, raw=False, **kwargs):
+    # После удаления у техники manufacturer_id = NULL, строки ищем по старому id
+    if not raw and not created:
+        equipment_ids = list(
+            CatalogEntry.objects.filter(manufacturer_id=instance.pk).values_list('equipment_id', flat=True)
+        )
+        refresh_catalog_entries(equipment_ids)
+        if signal is post_delete:
+            schedule_neighbor_update(equipment_ids)
@@ -0,0 +1,268 @@
+"""
+Похожая техника для карточки (таблица equipment_neighbor).
+
+Доступная техника описывается вектором признаков: категория и её предки по
+дереву, производитель, log2 цены и платежа, год выпуска и состояние. Соседи —
+k ближайших по евклидову расстоянию; расстояния считаются NumPy сразу для
+пачки строк (|a|² + |b|² − 2ab), без цикла по парам.
+
+Полный расчёт — manage.py rebuild_similar_equipment (входит в rebuild_catalog).
+После изменения техники (apps/catalog/signals.py, загрузка, пакетный API)
+schedule_neighbor_update пересчитывает только её список и списки, в которые
+она входила или теперь должна войти, — после фиксации транзакции
+(transaction.on_commit), вне пути сохранения. Внутри deferred_neighbor_updates()
+такие запросы копятся в один. Матрица признаков держится в памяти процесса до
+смены версии каталога (apps/catalog/cache.py). Карточка читает готовый список
+одним запросом по индексу.
+"""
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+
+from .cache import get_catalog_version
+from .models import CatalogEntry, CategoryClosure, EquipmentNeighbor
+
+NEIGHBORS_COUNT = 6
+DISTANCE_BATCH_SIZE = 256
+# Размер списка id в одном запросе WHERE ... IN (загрузка, пакетный API)
+IN_BATCH_SIZE = 1000
+
+# Веса признаков. Категория и производитель — one-hot, поэтому несовпадение
+# стоит вес·√2; цена и платёж — на двукратную разницу, год — на год разницы.
+CATEGORY_WEIGHT = 1.5
+MANUFACTURER_WEIGHT = 1.0
+PRICE_WEIGHT = 1.0
+RATE_WEIGHT = 0.5
+YEAR_WEIGHT = 0.15
+CONDITION_WEIGHT = 1.0
+CONDITION_LEVELS = {'new': 0.0, 'refurbished': 0.5, 'used': 1.0}
+# Платёж техники без ставки оценивается как цена / срок
+DEFAULT_LEASE_TERM_MONTHS = 36
+
+# Страховка от изменений в обход сигналов (SQL-скрипты)
+FEATURE_INDEX_TTL = 300
+
+# Отложенный пересчёт: {'ids': set(), 'neighbor_of': set()} или None
+_deferred_updates = ContextVar('deferred_neighbor_updates', default=None)
+# (версия каталога, время загрузки, FeatureIndex) — матрица признаков процесса
+_feature_index = None
+
+
+def _log2(value):
+    return math.log2(float(value)) if value and value > 0 else 0.0
+
+
+class FeatureIndex:
+    """Матрица признаков доступной техники (строка — единица техники)."""
+
+    def __init__(self, rows, ancestors):
+        # rows — (id, категория, производитель, цена, платёж, год, состояние)
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.positions = {equipment_id: position for position, equipment_id in enumerate(self.ids.tolist())}
+        category_columns, manufacturer_columns = {}, {}
+        for _, category_id, manufacturer_id, *_ in rows:
+            for ancestor_id in ancestors.get(category_id, [category_id]):
+                category_columns.setdefault(ancestor_id, len(category_columns))
+            if manufacturer_id is not None:
+                manufacturer_columns.setdefault(manufacturer_id, len(manufacturer_columns))
+        offset = len(category_columns)
+        numeric = offset + len(manufacturer_columns)
+        # Год без значения — средний по каталогу, чтобы не отдалял технику
+        years = [row[5] for row in rows if row[5]]
+        default_year = sum(years) / len(years) if years else 0
+
+        matrix = np.zeros((len(rows), numeric + 4))
+        for position, (_, category_id, manufacturer_id, price, rate, year, condition) in enumerate(rows):
+            for ancestor_id in ancestors.get(category_id, [category_id]):
+                matrix[position, category_columns[ancestor_id]] = CATEGORY_WEIGHT
+            if manufacturer_id is not None:
+                matrix[position, offset + manufacturer_columns[manufacturer_id]] = MANUFACTURER_WEIGHT
+            matrix[position, numeric:] = (
+                _log2(price) * PRICE_WEIGHT,
+                (_log2(rate) if rate else _log2(price) - math.log2(DEFAULT_LEASE_TERM_MONTHS)) * RATE_WEIGHT,
+                (year or default_year) * YEAR_WEIGHT,
+                CONDITION_LEVELS.get(condition, 0.0) * CONDITION_WEIGHT,
+            )
+        self.matrix = matrix
+        self.norms = np.einsum('ij,ij->i', matrix, matrix)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distances(self, positions):
+        """Расстояния от строк positions до всех строк (матрица len(positions) × n)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        squared = self.norms[positions, None] + self.norms[None, :] - 2 * (self.matrix[positions] @ self.matrix.T)
+        return np.sqrt(np.maximum(squared, 0))
+
+    def closest(self, positions):
+        """Для каждой строки — расстояние до ближайшей из positions (пачками, без матрицы positions × n)."""
+        result = np.full(len(self), np.inf)
+        for start in range(0, len(positions), DISTANCE_BATCH_SIZE):
+            np.minimum(result, self.distances(positions[start:start + DISTANCE_BATCH_SIZE]).min(axis=0), out=result)
+        return result
+
+    def nearest(self, positions, k=NEIGHBORS_COUNT):
+        """Для каждой строки из positions — (позиции соседей, расстояния), ближайшие первыми."""
+        k = min(k, len(self) - 1)
+        positions = list(positions)
+        if k <= 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0)) for _ in positions]
+        result = []
+        for start in range(0, len(positions), DISTANCE_BATCH_SIZE):
+            batch = np.asarray(positions[start:start + DISTANCE_BATCH_SIZE], dtype=np.int64)
+            distances = self.distances(batch)
+            distances[np.arange(len(batch)), batch] = np.inf
+            candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+            # При равных расстояниях — по позиции, чтобы порядок был устойчивым
+            order = np.lexsort((candidates, candidate_distances))
+            candidates = np.take_along_axis(candidates, order, axis=1)
+            candidate_distances = np.take_along_axis(candidate_distances, order, axis=1)
+            result.extend(zip(candidates, candidate_distances))
+        return result
+
+
+def load_feature_index():
+    """Признаки доступной техники: один запрос к catalog_entry и один к дереву категорий."""
+    rows = list(
+        CatalogEntry.objects.order_by('equipment_id').values_list(
+            'equipment_id', 'category_id', 'manufacturer_id', 'price', 'monthly_lease_rate', 'year', 'condition',
+        )
+    )
+    ancestors = defaultdict(list)
+    for ancestor_id, descendant_id in CategoryClosure.objects.values_list('ancestor_id', 'descendant_id'):
+        ancestors[descendant_id].append(ancestor_id)
+    return FeatureIndex(rows, ancestors)
+
+
+def _chunks(values, size=IN_BATCH_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def get_feature_index():
+    """Матрица признаков из памяти процесса; заново читается при смене версии каталога."""
+    global _feature_index
+    version = get_catalog_version()
+    cached = _feature_index
+    if cached is not None and cached[0] == version and time.monotonic() - cached[1] < FEATURE_INDEX_TTL:
+        return cached[2]
+    index = load_feature_index()
+    _feature_index = (version, time.monotonic(), index)
+    return index
+
+
+def _neighbor_rows(index, positions, k):
+    rows = []
+    for position, (neighbors, distances) in zip(positions, index.nearest(positions, k)):
+        rows.extend(
+            EquipmentNeighbor(
+                equipment_id=int(index.ids[position]),
+                neighbor_id=int(index.ids[neighbor]),
+                rank=rank,
+                distance=float(distance),
+            )
+            for rank, (neighbor, distance) in enumerate(zip(neighbors, distances), start=1)
+        )
+    return rows
+
+
+@transaction.atomic
+def rebuild_equipment_neighbors(batch_size=500):
+    """Заново считает соседей всей доступной техники. Возвращает число связей."""
+    index = load_feature_index()
+    EquipmentNeighbor.objects.all().delete()
+    rows = _neighbor_rows(index, range(len(index)), NEIGHBORS_COUNT)
+    EquipmentNeighbor.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+@transaction.atomic
+def update_equipment_neighbors(equipment_ids, neighbor_of=()):
+    """
+    Пересчёт после изменения техники equipment_ids: её собственные списки и
+    списки, в которые она входила (neighbor_of — для удалённой техники, чьи
+    связи уже сняты каскадом) или теперь ближе их последнего соседа.
+    """
+    equipment_ids = list(equipment_ids)
+    if not equipment_ids:
+        return
+    index = get_feature_index()
+    affected = set(neighbor_of)
+    for chunk in _chunks(equipment_ids):
+        affected.update(
+            EquipmentNeighbor.objects.filter(neighbor_id__in=chunk).values_list('equipment_id', flat=True)
+        )
+    changed = [index.positions[equipment_id] for equipment_id in equipment_ids if equipment_id in index.positions]
+    if changed and len(index) - 1 < NEIGHBORS_COUNT:
+        # Списки неполные (меньше k соседей) и принимают любую технику
+        affected.update(index.ids.tolist())
+    elif changed:
+        closest = index.closest(changed)
+        # Войти в список можно, только если ближе его последнего соседа: сначала
+        # отсекаем технику дальше самого дальнего k-го соседа, затем читаем
+        # последних соседей только оставшихся кандидатов
+        farthest = EquipmentNeighbor.objects.filter(rank=NEIGHBORS_COUNT).aggregate(Max('distance'))['distance__max']
+        mask = closest < farthest if farthest is not None else np.ones(len(index), dtype=bool)
+        candidates = index.ids[mask]
+        worst = {}
+        for chunk in _chunks(candidates.tolist()):
+            worst.update(
+                EquipmentNeighbor.objects.filter(rank=NEIGHBORS_COUNT, equipment_id__in=chunk)
+                .values_list('equipment_id', 'distance')
+            )
+        # Список без k-го соседа ещё не посчитан — принимает любую технику
+        limits = np.array([worst.get(equipment_id, np.inf) for equipment_id in candidates.tolist()])
+        affected.update(candidates[closest[mask] < limits].tolist())
+    affected.update(equipment_ids)
+
+    for chunk in _chunks(sorted(affected)):
+        EquipmentNeighbor.objects.filter(equipment_id__in=chunk).delete()
+    positions = sorted(index.positions[equipment_id] for equipment_id in affected if equipment_id in index.positions)
+    EquipmentNeighbor.objects.bulk_create(_neighbor_rows(index, positions, NEIGHBORS_COUNT), batch_size=500)
+
+
+def schedule_neighbor_update(equipment_ids, neighbor_of=()):
+    """
+    update_equipment_neighbors после фиксации текущей транзакции (сразу — вне
+    транзакции); внутри deferred_neighbor_updates() id только копятся.
+    """
+    equipment_ids = list(equipment_ids)
+    neighbor_of = list(neighbor_of)
+    if not equipment_ids:
+        return
+    pending = _deferred_updates.get()
+    if pending is not None:
+        pending['ids'].update(equipment_ids)
+        pending['neighbor_of'].update(neighbor_of)
+        return
+    # robust: ошибка пересчёта не превращает уже сохранённое изменение в ошибку запроса
+    transaction.on_commit(lambda: update_equipment_neighbors(equipment_ids, neighbor_of), robust=True)
+
+
+@contextmanager
+def deferred_neighbor_updates():
+    """Внутри блока schedule_neighbor_update только копит id; пересчёт — один на выходе."""
+    pending = {'ids': set(), 'neighbor_of': set()}
+    token = _deferred_updates.set(pending)
+    try:
+        yield
+    finally:
+        _deferred_updates.reset(token)
+    schedule_neighbor_update(sorted(pending['ids']), neighbor_of=pending['neighbor_of'])
+
+
+def similar_equipment(equipment_id, limit=NEIGHBORS_COUNT):
+    """Похожая доступная техника (строки каталога), самая похожая первой."""
+    return (
+        CatalogEntry.objects.filter(equipment__neighbor_of__equipment_id=equipment_id)
+        .order_by('equipment__neighbor_of__rank')[:limit]
+    )
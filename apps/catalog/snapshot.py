@@ -0,0 +1,262 @@
+"""
+Статический снимок каталога: JSON-файлы для клиентов и партнёров.
+
+manage.py export_catalog_snapshot пишет в CATALOG_SNAPSHOT_DIR (по умолчанию
+public/catalog-snapshot, раздаётся по адресу /catalog-snapshot/):
+  manifest.json               — версия снимка и имена остальных файлов;
+  equipment-0003.<хэш>.json   — шард доступной техники (id // shard_size);
+  references.<хэш>.json       — категории и производители;
+  search-index.<хэш>.json     — обратный индекс: слово -> id техники.
+Рядом с каждым файлом лежит его .gz — сжатая копия для клиентов с
+Accept-Encoding: gzip. Файлы отдаёт представление apps/core/views.py:
+catalog_snapshot_file, которое открывает файл с диска при каждом запросе, —
+новая выгрузка видна всем процессам сразу, без перезапуска (WhiteNoise
+индексирует свой каталог только при старте). В имени файла — хэш содержимого,
+поэтому такие файлы отдаются с Cache-Control: immutable; manifest.json
+кэшируется на MANIFEST_MAX_AGE секунд.
+
+Повторный запуск перезаписывает только шарды, в которых изменилась техника:
+отпечаток шарда (id и updated_at строк catalog_entry) сравнивается с
+предыдущим manifest.json. Файлы предыдущей версии сохраняются для клиентов,
+начавших чтение до обновления; более старые удаляются, только когда manifest,
+который на них ссылался, вышел из кэша клиентов (MANIFEST_MAX_AGE).
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Prefetch, Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import CatalogEntry, EquipmentCategory, EquipmentSpec, Manufacturer
+
+MANIFEST_NAME = 'manifest.json'
+SNAPSHOT_FORMAT = 1
+DEFAULT_SHARD_SIZE = 500
+# Сколько секунд клиенты и прокси могут держать manifest.json
+MANIFEST_MAX_AGE = 60
+# Имена файлов снимка: «manifest.json» и «<префикс>.<хэш>.json»
+SNAPSHOT_FILE_NAME = re.compile(r'^[\w-]+(\.[0-9a-f]{12})?\.json$')
+HASHED_FILE_NAME = re.compile(r'^.+\.[0-9a-f]{12}\.json$')
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+INDEX_MIN_TOKEN_LENGTH = 2
+
+
+def tokenize(*texts):
+    """Слова для обратного индекса: нижний регистр, ё -> е, от двух символов."""
+    tokens = set()
+    for text in texts:
+        for token in _TOKEN.findall((text or '').lower().replace('ё', 'е')):
+            if len(token) >= INDEX_MIN_TOKEN_LENGTH:
+                tokens.add(token)
+    return tokens
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _write(directory, prefix, data):
+    """Пишет JSON и его .gz под именем с хэшем содержимого; существующий файл не трогает."""
+    content = _dumps(data)
+    name = f'{prefix}.{hashlib.sha256(content).hexdigest()[:12]}.json'
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        _write_atomic(path + '.gz', gzip.compress(content, mtime=0))
+        _write_atomic(path, content)
+    return name
+
+
+def _write_atomic(path, content):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_file(name, accept_gzip=False):
+    """
+    Путь к файлу снимка для ответа и признак сжатой копии: (путь, gzip) или
+    None, если имя не из снимка или файла нет.
+    """
+    if not SNAPSHOT_FILE_NAME.match(name):
+        return None
+    path = os.path.join(str(settings.CATALOG_SNAPSHOT_DIR), name)
+    if accept_gzip and os.path.exists(path + '.gz'):
+        return path + '.gz', True
+    return (path, False) if os.path.exists(path) else None
+
+
+def _shard_fingerprints(shard_size):
+    """Отпечатки шардов по (id, updated_at) одним лёгким запросом."""
+    digests = defaultdict(hashlib.sha256)
+    for equipment_id, updated_at in CatalogEntry.objects.order_by('equipment_id').values_list(
+        'equipment_id', 'updated_at'
+    ):
+        digests[equipment_id // shard_size].update(f'{equipment_id}:{updated_at.isoformat()};'.encode())
+    return {shard: digest.hexdigest() for shard, digest in digests.items()}
+
+
+def _entry_data(entry):
+    return {
+        'id': entry.equipment_id,
+        'name': entry.name,
+        'model': entry.model,
+        'category_id': entry.category_id,
+        'manufacturer_id': entry.manufacturer_id,
+        'condition': entry.condition,
+        'price': entry.price,
+        'monthly_lease_rate': entry.monthly_lease_rate,
+        'year': entry.year,
+        'image_url': entry.image_url,
+        'specifications': entry.specifications,
+        'specs': {spec.attribute: spec.value for spec in entry.equipment.specs.all()},
+        'url': reverse('core:leasing_detail', args=[entry.equipment_id]),
+    }
+
+
+def _shard_data(shards, shard_size):
+    """Строки шардов shards: {номер: [техника, ...]}."""
+    rows = defaultdict(list)
+    if not shards:
+        return rows
+    condition = reduce(or_, (
+        Q(equipment_id__gte=shard * shard_size, equipment_id__lt=(shard + 1) * shard_size) for shard in shards
+    ))
+    qs = CatalogEntry.objects.filter(condition).select_related('equipment').prefetch_related(
+        Prefetch('equipment__specs', queryset=EquipmentSpec.objects.order_by('attribute'))
+    ).order_by('equipment_id')
+    for entry in qs.iterator(chunk_size=shard_size):
+        rows[entry.equipment_id // shard_size].append(_entry_data(entry))
+    return rows
+
+
+def _search_index():
+    """Обратный индекс по названию, модели, категории, производителю и характеристикам."""
+    index = defaultdict(list)
+    rows = CatalogEntry.objects.order_by('equipment_id').values_list(
+        'equipment_id', 'name', 'model', 'category_name', 'manufacturer_name', 'specifications',
+    )
+    for equipment_id, *texts in rows.iterator(chunk_size=2000):
+        for token in tokenize(*texts):
+            index[token].append(equipment_id)
+    return dict(sorted(index.items()))
+
+
+def _references():
+    return {
+        'categories': [
+            {'id': pk, 'name': name, 'parent_id': parent_id}
+            for pk, name, parent_id in EquipmentCategory.objects.order_by('id').values_list('id', 'name', 'parent_id')
+        ],
+        'manufacturers': [
+            {'id': pk, 'name': name, 'country': country}
+            for pk, name, country in Manufacturer.objects.order_by('id').values_list('id', 'name', 'country')
+        ],
+    }
+
+
+def _manifest_files(manifest):
+    if not manifest:
+        return set()
+    files = {manifest['references'], manifest['search_index']}
+    files.update(shard['file'] for shard in manifest['shards'])
+    return files
+
+
+def _cleanup(directory, keep):
+    for name in os.listdir(directory):
+        base = name[:-3] if name.endswith('.gz') else name
+        if base != MANIFEST_NAME and base not in keep and base.endswith('.json'):
+            os.remove(os.path.join(directory, name))
+
+
+def export_catalog_snapshot(directory=None, shard_size=DEFAULT_SHARD_SIZE, force=False):
+    """
+    Выгружает снимок каталога. Возвращает (манифест, число записанных шардов).
+    force — пересобрать все шарды, даже если техника в них не менялась.
+    """
+    directory = str(directory or settings.CATALOG_SNAPSHOT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    live = previous = read_manifest(directory)
+    if previous and (previous.get('format') != SNAPSHOT_FORMAT or previous.get('shard_size') != shard_size):
+        previous = None
+    previous_shards = {shard['shard']: shard for shard in previous['shards']} if previous else {}
+
+    fingerprints = _shard_fingerprints(shard_size)
+    changed = [
+        shard for shard, fingerprint in fingerprints.items()
+        if force
+        or shard not in previous_shards
+        or previous_shards[shard]['fingerprint'] != fingerprint
+        or not os.path.exists(os.path.join(directory, previous_shards[shard]['file']))
+    ]
+    rows = _shard_data(changed, shard_size)
+
+    shards = []
+    for shard in sorted(fingerprints):
+        if shard in rows:
+            items = rows[shard]
+            name = _write(directory, f'equipment-{shard:04d}', {'shard': shard, 'equipment': items})
+            count = len(items)
+        else:
+            name, count = previous_shards[shard]['file'], previous_shards[shard]['count']
+        shards.append({
+            'shard': shard,
+            'first_id': shard * shard_size,
+            'last_id': (shard + 1) * shard_size - 1,
+            'file': name,
+            'count': count,
+            'fingerprint': fingerprints[shard],
+        })
+
+    references = _write(directory, 'references', _references())
+    # Индекс зависит от всех шардов и от названий категорий и производителей
+    if (
+        changed or not previous or set(fingerprints) != set(previous_shards)
+        or previous['references'] != references
+    ):
+        search_index = _write(directory, 'search-index', {'tokens': _search_index()})
+    else:
+        search_index = previous['search_index']
+
+    files = [references, search_index] + [shard['file'] for shard in shards]
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'version': hashlib.sha256('|'.join(files).encode()).hexdigest()[:12],
+        'generated_at': timezone.now().isoformat(),
+        'shard_size': shard_size,
+        'total': sum(shard['count'] for shard in shards),
+        'references': references,
+        'search_index': search_index,
+        'shards': shards,
+    }
+    if previous and previous['version'] == manifest['version'] and previous['shards'] == shards:
+        # Ничего не изменилось — manifest и его время не трогаем
+        return previous, 0
+    content = _dumps(manifest)
+    _write_atomic(os.path.join(directory, MANIFEST_NAME + '.gz'), gzip.compress(content, mtime=0))
+    _write_atomic(os.path.join(directory, MANIFEST_NAME), content)
+    # Файлы старше предыдущей версии могут быть нужны клиентам, которые ещё держат
+    # в кэше manifest до неё, — их удалит следующая выгрузка
+    replaced_at = parse_datetime(live['generated_at']) if live and live.get('generated_at') else None
+    if replaced_at is None or (timezone.now() - replaced_at).total_seconds() >= MANIFEST_MAX_AGE:
+        _cleanup(directory, set(files) | _manifest_files(live))
+    return manifest, len(changed)
@@ -0,0 +1,128 @@
+"""
+Структурированные характеристики техники (таблица equipment_spec).
+
+Свободный текст Equipment.specifications («Мощность 370 л.с., дизель») при
+сохранении техники разбирается на числовые атрибуты из
+EquipmentSpec.ATTRIBUTE_CHOICES. Фильтр «мощность от 300 л.с.» — подзапрос
+по индексу (attribute, value), без просмотра текста всех строк.
+
+Параметры фильтра: spec_<атрибут>_min / spec_<атрибут>_max, например
+?spec_power_hp_min=300. Шаблоны ниже повторяет scripts/seed_db.sql.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Equipment, EquipmentSpec
+
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+
+SPEC_PATTERNS = {
+    'power_hp': re.compile(r'мощность\s+' + _NUMBER + r'\s*л\.\s*с', re.IGNORECASE),
+    'throughput_tph': re.compile(r'производительность\s+' + _NUMBER + r'\s*т/ч', re.IGNORECASE),
+    'tank_l': re.compile(r'бак\s+' + _NUMBER + r'\s*л', re.IGNORECASE),
+    'working_width_m': re.compile(r'ширина\s+захвата\s+' + _NUMBER + r'\s*м', re.IGNORECASE),
+    'cut_length_mm': re.compile(r'длина\s+резки\s+' + _NUMBER + r'\s*мм', re.IGNORECASE),
+    'hoppers': re.compile(r'(\d+)\s+бункер', re.IGNORECASE),
+    'plough_bodies': re.compile(r'(\d+)\s+корпус', re.IGNORECASE),
+}
+
+SPEC_LABELS = dict(EquipmentSpec.ATTRIBUTE_CHOICES)
+
+
+def parse_specifications(text):
+    """Атрибуты из текста характеристик: {'power_hp': Decimal('370'), ...}."""
+    attributes = {}
+    for attribute, pattern in SPEC_PATTERNS.items():
+        match = pattern.search(text or '')
+        if match:
+            attributes[attribute] = Decimal(match.group(1).replace(',', '.'))
+    return attributes
+
+
+@transaction.atomic
+def sync_equipment_specs(equipment):
+    """Приводит строки equipment_spec техники в соответствие с её текстом."""
+    attributes = parse_specifications(equipment.specifications)
+    current = dict(EquipmentSpec.objects.filter(equipment=equipment).values_list('attribute', 'value'))
+    if current == attributes:
+        return
+    EquipmentSpec.objects.filter(equipment=equipment).delete()
+    EquipmentSpec.objects.bulk_create([
+        EquipmentSpec(equipment=equipment, attribute=attribute, value=value)
+        for attribute, value in attributes.items()
+    ])
+
+
+@transaction.atomic
+def rebuild_equipment_specs(batch_size=500):
+    """Заново разбирает характеристики всей техники. Возвращает число атрибутов."""
+    EquipmentSpec.objects.all().delete()
+    specs = []
+    for equipment_id, text in Equipment.objects.values_list('id', 'specifications').iterator(chunk_size=batch_size):
+        specs.extend(
+            EquipmentSpec(equipment_id=equipment_id, attribute=attribute, value=value)
+            for attribute, value in parse_specifications(text).items()
+        )
+    EquipmentSpec.objects.bulk_create(specs, batch_size=batch_size)
+    return len(specs)
+
+
+@transaction.atomic
+def refresh_equipment_specs(equipment_ids):
+    """Заново разбирает характеристики указанной техники (после записи в обход сигналов)."""
+    EquipmentSpec.objects.filter(equipment_id__in=equipment_ids).delete()
+    EquipmentSpec.objects.bulk_create([
+        EquipmentSpec(equipment_id=equipment_id, attribute=attribute, value=value)
+        for equipment_id, text in Equipment.objects.filter(pk__in=equipment_ids).values_list('id', 'specifications')
+        for attribute, value in parse_specifications(text).items()
+    ])
+
+
+def _parse_number(raw):
+    if raw in (None, ''):
+        return None
+    try:
+        value = Decimal(str(raw).strip().replace(' ', '').replace(',', '.'))
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
+
+def parse_spec_filters(params):
+    """Фильтры из GET-параметров: {'power_hp': (от, до), ...}."""
+    filters = {}
+    for attribute in SPEC_PATTERNS:
+        low = _parse_number(params.get(f'spec_{attribute}_min'))
+        high = _parse_number(params.get(f'spec_{attribute}_max'))
+        if low is not None or high is not None:
+            filters[attribute] = (low, high)
+    return filters
+
+
+def spec_q(filters, field='pk'):
+    """Условие «у техники есть атрибуты в диапазонах» (по подзапросу на атрибут)."""
+    q = Q()
+    for attribute, (low, high) in filters.items():
+        specs = EquipmentSpec.objects.filter(attribute=attribute)
+        if low is not None:
+            specs = specs.filter(value__gte=low)
+        if high is not None:
+            specs = specs.filter(value__lte=high)
+        q &= Q(**{f'{field}__in': specs.values('equipment_id')})
+    return q
+
+
+def spec_filter_options(filters):
+    """Поля фильтров характеристик для шаблона."""
+    return [
+        {
+            'name': f'spec_{attribute}',
+            'label': SPEC_LABELS[attribute],
+            'min': filters.get(attribute, (None, None))[0],
+            'max': filters.get(attribute, (None, None))[1],
+        }
+        for attribute in SPEC_PATTERNS
+    ]
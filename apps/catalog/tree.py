@@ -0,0 +1,148 @@
+"""
+Дерево категорий техники: таблица замыкания equipment_category_closure.
+
+Для каждой категории хранятся пары (предок, потомок, глубина), включая саму
+категорию (глубина 0). Поддерево «Тракторы» выбирается одним индексным
+подзапросом без обхода дерева по уровням:
+    category_id IN (SELECT descendant_id FROM equipment_category_closure WHERE ancestor_id = :id)
+
+Таблицу обновляют сигналы (apps/catalog/signals.py): при сохранении категории
+пути её поддерева перестраиваются только если сменился родитель; при удалении
+подкатегории становятся корнями (parent SET NULL). Полная пересборка —
+manage.py rebuild_catalog.
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .cache import aget_catalog_version
+from .models import CategoryClosure, EquipmentCategory
+
+# Страховка от изменений в обход сигналов (SQL-скрипты)
+CATEGORY_TREE_CACHE_TTL = 300
+
+
+def closure_links(parents):
+    """Пары (предок, потомок, глубина) по словарю {категория: родитель}."""
+    links = []
+    for category_id in parents:
+        ancestor_id, depth, seen = category_id, 0, set()
+        # seen — защита от цикла в данных, записанных в обход приложения
+        while ancestor_id is not None and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            links.append((ancestor_id, category_id, depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+    return links
+
+
+@transaction.atomic
+def rebuild_category_closure():
+    """Полностью пересобирает таблицу замыкания. Возвращает число связей."""
+    parents = dict(EquipmentCategory.objects.values_list('id', 'parent_id'))
+    CategoryClosure.objects.all().delete()
+    links = [
+        CategoryClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+        for ancestor_id, descendant_id, depth in closure_links(parents)
+    ]
+    CategoryClosure.objects.bulk_create(links, batch_size=500)
+    return len(links)
+
+
+@transaction.atomic
+def attach_category(category):
+    """Пути для новой категории или категории со сменившимся родителем. Возвращает, менялись ли пути."""
+    pk = category.pk
+    CategoryClosure.objects.get_or_create(ancestor_id=pk, descendant_id=pk, defaults={'depth': 0})
+    ancestors = []
+    if category.parent_id:
+        ancestors = list(
+            CategoryClosure.objects.filter(descendant_id=category.parent_id).values_list('ancestor_id', 'depth')
+        )
+        if any(ancestor_id == pk for ancestor_id, _ in ancestors):
+            raise ValueError('Категория не может быть вложена в свою подкатегорию')
+    expected = {(ancestor_id, depth + 1) for ancestor_id, depth in ancestors}
+    current = set(
+        CategoryClosure.objects.filter(descendant_id=pk).exclude(ancestor_id=pk).values_list('ancestor_id', 'depth')
+    )
+    if current == expected:
+        return False
+    subtree = list(CategoryClosure.objects.filter(ancestor_id=pk).values_list('descendant_id', 'depth'))
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+    CategoryClosure.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+    CategoryClosure.objects.bulk_create([
+        CategoryClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+        for ancestor_id, up in ancestors
+        for descendant_id, down in subtree
+    ])
+    return True
+
+
+@transaction.atomic
+def detach_subtree(category):
+    """Перед удалением категории: отрезает её подкатегории от неё и её предков."""
+    ancestor_ids = list(CategoryClosure.objects.filter(descendant_id=category.pk).values_list('ancestor_id', flat=True))
+    descendant_ids = list(
+        CategoryClosure.objects.filter(ancestor_id=category.pk, depth__gt=0).values_list('descendant_id', flat=True)
+    )
+    if descendant_ids:
+        CategoryClosure.objects.filter(ancestor_id__in=ancestor_ids, descendant_id__in=descendant_ids).delete()
+
+
+def subtree_q(category_id, field='category_id'):
+    """Условие «категория в поддереве category_id» (одним подзапросом по индексу)."""
+    return Q(**{
+        f'{field}__in': CategoryClosure.objects.filter(ancestor_id=category_id).values('descendant_id'),
+    })
+
+
+def subtree_equipment_counts():
+    """
+    Категории с числом техники во всём поддереве (аннотация equipment_count),
+    одним запросом с JOIN по таблице замыкания.
+    """
+    return EquipmentCategory.objects.annotate(
+        equipment_count=Count('descendant_links__descendant__equipment'),
+    )
+
+
+class CategoryTree:
+    """Дерево категорий в памяти: предки, названия и уровни вложенности."""
+
+    def __init__(self, links):
+        # links — (предок, потомок, глубина, название предка)
+        ancestors = defaultdict(list)
+        self.names = {}
+        for ancestor_id, descendant_id, depth, name in links:
+            ancestors[descendant_id].append((depth, ancestor_id))
+            self.names[ancestor_id] = name
+        # Путь от корня к категории
+        self.paths = {
+            category_id: [ancestor_id for _, ancestor_id in sorted(items, reverse=True)]
+            for category_id, items in ancestors.items()
+        }
+
+    def ancestor_ids(self, category_id):
+        """Категория и все её предки (от корня)."""
+        return self.paths.get(category_id, [category_id])
+
+    def level(self, category_id):
+        return len(self.ancestor_ids(category_id)) - 1
+
+    def sort_key(self, category_id):
+        return [self.names.get(ancestor_id, '') for ancestor_id in self.ancestor_ids(category_id)]
+
+
+def category_tree_queryset():
+    return CategoryClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth', 'ancestor__name')
+
+
+async def aget_category_tree():
+    """Дерево категорий (из кэша, если каталог не менялся)."""
+    key = f'catalog:category_tree:{await aget_catalog_version()}'
+    links = await cache.aget(key)
+    if links is None:
+        links = [link async for link in category_tree_queryset()]
+        await cache.aset(key, links, CATEGORY_TREE_CACHE_TTL)
+    return CategoryTree(links)
@@ -1,10 +1,11 @@
 """Формы для панели управления."""
 import json
-import secrets
 from django import forms
-from django.contrib.auth.hashers import make_password
 
-from apps.accounts.models import Role, Account, UserProfile, AccountToken
+from apps.accounts.models import (
+    Role, Account, UserProfile, AccountToken,
+)
+from apps.accounts.passwords import make_password
 from apps.catalog.models import EquipmentCategory, Manufacturer, Equipment
 from apps.leasing.models import (
     Company, LeaseContract, LeaseRequest, PaymentSchedule,
@@ -123,12 +124,11 @@ class AccountTokenForm(forms.ModelForm):
         widgets = {'account': forms.Select(attrs={'class': 'form-select'})}
 
     def save(self, commit=True):
-        obj = super().save(commit=False)
-        if not obj.key:
-            obj.key = secrets.token_hex(32)
-        if commit:
-            obj.save()
-        return obj
+        if self.instance.pk is not None:
+            return super().save(commit)
+        # Новый токен создаёт менеджер: открытый ключ показывается один раз, в БД — только хэш
+        self.instance = AccountToken.objects.create_token(self.cleaned_data['account'])
+        return self.instance
 
 
 class EquipmentCategoryForm(forms.ModelForm):
@@ -2,6 +2,7 @@
 from django.shortcuts import redirect
 from django.contrib import messages
 
+from apps.accounts.permissions import has_perm
 from apps.accounts.views import get_current_account
 
 # Таблицы, доступные менеджеру (admin видит все)
@@ -12,40 +13,38 @@ MANAGER_ALLOWED_KEYS = frozenset([
 ])
 
 
-class AdminRequiredMixin:
-    """Требует роль администратора."""
+class PermissionRequiredMixin:
+    """Требует у текущего аккаунта право permission_required (см. apps.accounts.permissions)."""
+    permission_required = None
+    permission_denied_message = 'Доступ запрещён.'
 
     def dispatch(self, request, *args, **kwargs):
         account = get_current_account(request)
         if not account:
             messages.error(request, 'Для доступа требуется авторизация.')
             return redirect('accounts:login')
-        if not account.role or account.role.name != 'admin':
-            messages.error(
-                request, 'Доступ запрещён. Требуется роль администратора.'
-            )
+        if not has_perm(account, self.permission_required):
+            messages.error(request, self.permission_denied_message)
             return redirect('core:home')
         request.current_account = account
         return super().dispatch(request, *args, **kwargs)
 
 
-class AdminOrManagerRequiredMixin:
+class AdminRequiredMixin(PermissionRequiredMixin):
+    """Требует роль администратора."""
+    permission_required = 'statistics.system'
+    permission_denied_message = 'Доступ запрещён. Требуется роль администратора.'
+
+
+class AdminOrManagerRequiredMixin(PermissionRequiredMixin):
     """Требует роль администратора или менеджера. Ограничивает менеджера по таблицам."""
+    permission_required = 'control_panel.access'
+    permission_denied_message = 'Доступ запрещён. Требуется роль администратора или менеджера.'
 
     def dispatch(self, request, *args, **kwargs):
         account = get_current_account(request)
-        if not account:
-            messages.error(request, 'Для доступа требуется авторизация.')
-            return redirect('accounts:login')
-        if not account.role or account.role.name not in ('admin', 'manager'):
-            messages.error(
-                request, 'Доступ запрещён. Требуется роль администратора или менеджера.'
-            )
-            return redirect('core:home')
-        request.current_account = account
-
-        # Менеджеру доступны только MANAGER_ALLOWED_KEYS
-        if account.role.name == 'manager':
+        # Без доступа ко всем таблицам — только MANAGER_ALLOWED_KEYS
+        if has_perm(account, 'control_panel.access') and not has_perm(account, 'control_panel.all_tables'):
             url_name = request.resolver_match.url_name
             model_key = None
             if url_name == 'audit_list':
@@ -33,6 +33,7 @@ urlpatterns = [
     path('manufacturers/<int:pk>/delete/', views.ManufacturerDeleteView.as_view(), name='manufacturer_delete'),
     path('equipment/', views.EquipmentListView.as_view(), name='equipment_list'),
     path('equipment/create/', views.EquipmentCreateView.as_view(), name='equipment_create'),
+    path('equipment/import/', views.EquipmentImportView.as_view(), name='equipment_import'),
     path('equipment/<int:pk>/edit/', views.EquipmentUpdateView.as_view(), name='equipment_edit'),
     path('equipment/<int:pk>/delete/', views.EquipmentDeleteView.as_view(), name='equipment_delete'),
     path('companies/', views.CompanyListView.as_view(), name='company_list'),
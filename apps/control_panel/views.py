@@ -7,6 +7,8 @@ from django.contrib import messages
 from django.db.models import Q
 
 from apps.accounts.models import Role, Account, UserProfile, AccountToken
+from apps.accounts.permissions import has_perm
+from apps.catalog.importer import ImportFileError, import_equipment
 from apps.catalog.models import EquipmentCategory, Manufacturer, Equipment
 from apps.leasing.models import (
     Company, LeaseContract, LeaseRequest, PaymentSchedule,
@@ -14,6 +16,7 @@ from apps.leasing.models import (
 )
 from apps.core.models import AuditLog
 from apps.core.audit_utils import log_audit, model_instance_to_dict
+from apps.core.pagination import CURSOR_PARAM, KeysetPaginationMixin
 
 from .mixins import AdminOrManagerRequiredMixin
 from .forms import (
@@ -50,14 +53,14 @@ class DashboardView(AdminOrManagerRequiredMixin, View):
 
     def get(self, request):
         account = getattr(request, 'current_account', None)
-        if account and account.role and account.role.name == 'manager':
+        if has_perm(account, 'control_panel.all_tables'):
+            models = PANEL_MODELS
+        else:
             from .mixins import MANAGER_ALLOWED_KEYS
             models = [m for m in PANEL_MODELS if m[0] in MANAGER_ALLOWED_KEYS]
-        else:
-            models = PANEL_MODELS
         return render(request, 'control_panel/dashboard.html', {
             'models': models,
-            'show_audit': account and account.role and account.role.name == 'admin',
+            'show_audit': has_perm(account, 'audit.view'),
         })
 
 
@@ -97,7 +100,7 @@ def _build_search_filter(model, q):
 def _make_list_view(model, model_key, title, form_class=None):
     _model, _model_key, _title = model, model_key, title
 
-    class V(AdminOrManagerRequiredMixin, ListView):
+    class V(AdminOrManagerRequiredMixin, KeysetPaginationMixin, ListView):
         model = _model
         template_name = 'control_panel/list.html'
         context_object_name = 'items'
@@ -137,7 +140,7 @@ def _make_list_view(model, model_key, title, form_class=None):
             ctx['sort_by'] = self.request.GET.get('sort_by', pk_name)
             ctx['sort_dir'] = self.request.GET.get('sort_dir', 'asc')
             get_copy = self.request.GET.copy()
-            get_copy.pop('page', None)
+            get_copy.pop(CURSOR_PARAM, None)
             ctx['query_string'] = get_copy.urlencode()
             return ctx
     return V
@@ -299,7 +302,13 @@ class AccountTokenListView(_make_list_view(AccountToken, 'accounttoken', 'Ток
 
 
 class AccountTokenCreateView(_make_create_view(AccountToken, 'accounttoken', 'Токен', AccountTokenForm)):
-    pass
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        messages.info(
+            self.request,
+            f'Ключ API: {self.object.key} — сохраните его, повторно он не показывается.',
+        )
+        return response
 
 
 class AccountTokenUpdateView(_make_update_view(AccountToken, 'accounttoken', 'Токен', AccountTokenForm)):
@@ -358,6 +367,34 @@ class EquipmentUpdateView(_make_update_view(Equipment, 'equipment', 'Техни
     pass
 
 
+class EquipmentImportView(AdminOrManagerRequiredMixin, View):
+    """Загрузка прайс-листа техники из XLSX/CSV (apps/catalog/importer.py)."""
+    template_name = 'control_panel/equipment_import.html'
+
+    def get(self, request):
+        return render(request, self.template_name, {'title': 'Загрузка техники из файла'})
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, 'Выберите файл .xlsx или .csv.')
+            return redirect('control_panel:equipment_import')
+        try:
+            summary = import_equipment(upload.file, upload.name, request=request)
+        except ImportFileError as e:
+            messages.error(request, str(e))
+            return redirect('control_panel:equipment_import')
+        messages.success(
+            request,
+            f'Строк: {summary.rows}. Создано: {summary.created}, обновлено: {summary.updated}, '
+            f'пропущено с ошибками: {summary.error_count}.',
+        )
+        return render(request, self.template_name, {
+            'title': 'Загрузка техники из файла',
+            'summary': summary,
+        })
+
+
 class EquipmentDeleteView(_make_delete_view(Equipment, 'equipment', 'Техника')):
     pass
 
@@ -454,7 +491,7 @@ class MaintenanceRequestDeleteView(_make_delete_view(MaintenanceRequest, 'mainte
     pass
 
 
-class AuditLogListView(AdminOrManagerRequiredMixin, ListView):
+class AuditLogListView(AdminOrManagerRequiredMixin, KeysetPaginationMixin, ListView):
     """Журнал аудита — только чтение."""
     model = AuditLog
     template_name = 'control_panel/audit_list.html'
@@ -484,6 +521,6 @@ class AuditLogListView(AdminOrManagerRequiredMixin, ListView):
         ctx['sort_by'] = self.request.GET.get('sort_by', 'performed_at')
         ctx['sort_dir'] = self.request.GET.get('sort_dir', 'desc')
         get_copy = self.request.GET.copy()
-        get_copy.pop('page', None)
+        get_copy.pop(CURSOR_PARAM, None)
         ctx['query_string'] = get_copy.urlencode()
         return ctx
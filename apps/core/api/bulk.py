@@ -0,0 +1,177 @@
+"""
+Пакетные операции API: /api/<ресурс>/bulk/ с массивом в теле запроса.
+
+  POST   [{...}, ...]            — создать (bulk_create);
+  PATCH  [{"id": 1, ...}, ...]   — частично изменить (bulk_update);
+  DELETE [1, 2, ...] или [{"id": 1}, ...] — удалить.
+
+Строки проверяются тем же сериализатором, что и в одиночных запросах
+(many=True, BulkListSerializer сопоставляет строке PATCH её запись), и
+записываются одной транзакцией: при ошибке в любой строке не пишется ничего.
+Ответ — {"results": [...]} с результатом по каждой строке в порядке запроса.
+bulk_create/bulk_update не вызывают сигналы post_save — производные данные
+обновляет метод bulk_saved представления. Удаление вызывает post_delete на
+каждую строку; дорогие пересчёты из этих сигналов представление откладывает
+до конца пачки в контексте bulk_deleting.
+"""
+from contextlib import nullcontext
+
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError, RestrictedError
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+BULK_MAX_ITEMS = 2000
+BULK_BATCH_SIZE = 500
+
+
+def _item_id(item):
+    value = item.get('id') if isinstance(item, dict) else item
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """many=True для пакетного изменения: instance — {id: запись}."""
+
+    def run_child_validation(self, data):
+        self.child.instance = self.instance.get(_item_id(data)) if self.instance is not None else None
+        self.child.initial_data = data
+        return super().run_child_validation(data)
+
+
+class BulkModelMixin:
+    """Для ModelViewSet: действие bulk (POST, PATCH, DELETE) с массивом строк."""
+    bulk_max_items = BULK_MAX_ITEMS
+
+    def bulk_saved(self, objects):
+        """Вызывается в транзакции после записи пачки (вместо сигналов post_save)."""
+
+    def bulk_deleting(self):
+        """Контекст удаления пачки в транзакции (например, отложить пересчёты сигналов post_delete)."""
+        return nullcontext()
+
+    def _bulk_model(self):
+        return self.get_queryset().model
+
+    def _bulk_queryset(self):
+        return self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+
+    def _bulk_serializer(self, data, instances=None, partial=False):
+        return BulkListSerializer(
+            instances,
+            data=data,
+            child=self.get_serializer(partial=partial),
+            partial=partial,
+            context=self.get_serializer_context(),
+        )
+
+    def _bulk_response(self, results, status_code):
+        return Response({'results': results}, status=status_code)
+
+    def _bulk_invalid(self, count, errors):
+        return self._bulk_response([
+            {'index': index, 'status': 'error', 'errors': errors[index]} if index in errors
+            else {'index': index, 'status': 'valid'}
+            for index in range(count)
+        ], status.HTTP_400_BAD_REQUEST)
+
+    def _bulk_conflict(self, error):
+        return Response(
+            {'detail': f'Пачка не записана: конфликт с существующими данными ({error}).'},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Ожидается непустой массив.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'detail': f'Не больше {self.bulk_max_items} строк в запросе.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.method == 'POST':
+            return self._bulk_create(items)
+        if request.method == 'PATCH':
+            return self._bulk_update(items)
+        return self._bulk_delete(items)
+
+    def _bulk_create(self, items):
+        serializer = self._bulk_serializer(items)
+        if not serializer.is_valid():
+            return self._bulk_invalid(len(items), serializer.errors)
+        model = self._bulk_model()
+        objects = [model(**attrs) for attrs in serializer.validated_data]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=BULK_BATCH_SIZE)
+                self.bulk_saved(objects)
+        except IntegrityError as e:
+            return self._bulk_conflict(e)
+        return self._bulk_response(
+            [{'index': index, 'status': 'created', 'id': obj.pk} for index, obj in enumerate(objects)],
+            status.HTTP_201_CREATED,
+        )
+
+    def _bulk_update(self, items):
+        ids = [_item_id(item) for item in items]
+        instances = self._bulk_queryset().in_bulk([pk for pk in ids if pk is not None])
+        errors, seen = {}, set()
+        for index, pk in enumerate(ids):
+            if pk is None:
+                errors[index] = {'id': ['Укажите id записи.']}
+            elif pk not in instances:
+                errors[index] = {'id': [f'Запись {pk} не найдена.']}
+            elif pk in seen:
+                errors[index] = {'id': [f'Запись {pk} повторяется в запросе.']}
+            seen.add(pk)
+        serializer = self._bulk_serializer(items, instances, partial=True)
+        if not serializer.is_valid():
+            errors = {**serializer.errors, **errors}
+        if errors:
+            return self._bulk_invalid(len(items), errors)
+
+        model = self._bulk_model()
+        now = timezone.now()
+        auto_now = [field.name for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+        objects, fields = [], set(auto_now)
+        for pk, attrs in zip(ids, serializer.validated_data):
+            obj = instances[pk]
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+            for name in auto_now:
+                setattr(obj, name, now)
+            fields.update(attrs)
+            objects.append(obj)
+        try:
+            with transaction.atomic():
+                if fields:
+                    model.objects.bulk_update(objects, sorted(fields), batch_size=BULK_BATCH_SIZE)
+                self.bulk_saved(objects)
+        except IntegrityError as e:
+            return self._bulk_conflict(e)
+        return self._bulk_response(
+            [{'index': index, 'status': 'updated', 'id': pk} for index, pk in enumerate(ids)],
+            status.HTTP_200_OK,
+        )
+
+    def _bulk_delete(self, items):
+        ids = [_item_id(item) for item in items]
+        errors = {index: {'id': ['Укажите id записи.']} for index, pk in enumerate(ids) if pk is None}
+        if errors:
+            return self._bulk_invalid(len(items), errors)
+        queryset = self._bulk_queryset().filter(pk__in=ids)
+        try:
+            with transaction.atomic():
+                existing = set(queryset.select_for_update().values_list('pk', flat=True))
+                with self.bulk_deleting():
+                    queryset.delete()
+        except (ProtectedError, RestrictedError) as e:
+            return self._bulk_conflict(e.args[0])
+        return self._bulk_response([
+            {'index': index, 'status': 'deleted' if pk in existing else 'not_found', 'id': pk}
+            for index, pk in enumerate(ids)
+        ], status.HTTP_200_OK)
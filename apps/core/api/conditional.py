@@ -0,0 +1,69 @@
+"""
+Условные GET-запросы API (ETag / Last-Modified) по полю updated_at.
+
+Карточка: валидаторы — updated_at записи (один запрос values_list по pk).
+Список: MAX(updated_at) и COUNT(*) отфильтрованного queryset одним агрегатным
+запросом — удаление записи меняет число, изменение и добавление — максимум.
+В ETag входят также путь с параметрами (фильтры, ?fields=, курсор) и формат
+ответа. Если клиент прислал совпадающий If-None-Match (или для карточки —
+If-Modified-Since), ответ 304 отдаётся без выборки строк и сериализации.
+
+Список отдаётся только с ETag: одна дата MAX(updated_at) не меняется при
+удалении записи или смене фильтра, и If-Modified-Since дал бы неверный 304.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """Для ModelViewSet модели с полем last_modified_field (по умолчанию updated_at)."""
+    last_modified_field = 'updated_at'
+
+    def _validators(self, request, last_modified, *state):
+        parts = [
+            self.basename or '',
+            request.get_full_path(),
+            getattr(request, 'accepted_media_type', '') or '',
+            last_modified.isoformat() if last_modified else '',
+            *map(str, state),
+        ]
+        etag = quote_etag(hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32])
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def _conditional(self, request, etag, last_modified, handler, *args, **kwargs):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        state = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count('pk'),
+        )
+        etag, _ = self._validators(request, state['last_modified'], state['count'])
+        return self._conditional(request, etag, None, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            last_modified = (
+                self.filter_queryset(self.get_queryset())
+                .filter(**{self.lookup_field: lookup})
+                .values_list(self.last_modified_field, flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            last_modified = None
+        if last_modified is None:
+            # Нет записи (или неверный id) — обычный ответ с 404
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = self._validators(request, last_modified)
+        return self._conditional(request, etag, last_modified, super().retrieve, *args, **kwargs)
@@ -0,0 +1,123 @@
+"""
+Выборочные поля ответа API (sparse fieldsets): ?fields=id,name,price.
+
+Сериализатор с SparseFieldsSerializerMixin оставляет в ответе на GET только
+перечисленные поля (неизвестные имена пропускаются; если известных нет — все
+поля). Представление с SparseFieldsViewSetMixin сужает под них queryset:
+only() по колонкам этих полей и колонкам сортировки, select_related — только
+для полей через связь (source='company.name'), prefetch_related — только для
+связей «многие» и для Meta.field_prefetch сериализатора. Без ?fields= так же
+планируется запрос под все поля сериализатора. Лишние колонки и связанные
+таблицы из БД не читаются.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """Имена из ?fields= (только для чтения) или None — все поля."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    raw = request.query_params.get(FIELDS_PARAM, '')
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    return names or None
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Для ModelSerializer: поля ответа по ?fields=. Вычисляемым полям
+    (source='*', SerializerMethodField) нужные связи указываются в
+    Meta.field_prefetch = {'поле': ('связь', ...)}; колонки модели им
+    не выбираются.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = requested_fields(self.context.get('request'))
+        if names and names & set(self.fields):
+            for name in set(self.fields) - names:
+                self.fields.pop(name)
+
+
+def _field_lookups(model, source_attrs):
+    """
+    (колонки, select_related, prefetch_related) для source поля сериализатора;
+    None — источник не колонка модели (свойство, обратная связь), колонки
+    сузить нельзя.
+    """
+    opts = model._meta
+    path = []
+    columns, select = [], []
+    for attr in source_attrs:
+        try:
+            field = opts.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if field.many_to_many or field.one_to_many:
+            return columns, select, ['__'.join(path + [field.name])]
+        if not field.concrete:
+            return None
+        path.append(field.name)
+        columns.append('__'.join(path))
+        if not field.is_relation or attr == source_attrs[-1]:
+            break
+        select.append('__'.join(path))
+        opts = field.related_model._meta
+    return columns, select, []
+
+
+def narrow_queryset(queryset, serializer_class, names=None):
+    """queryset, читающий только то, что нужно полям names сериализатора (None — всем)."""
+    serializer_fields = serializer_class().fields
+    if names and not names & set(serializer_fields):
+        names = None
+    fields = [
+        field for name, field in serializer_fields.items()
+        if (names is None or name in names) and not field.write_only
+    ]
+    if not fields:
+        return queryset
+    field_prefetch = getattr(getattr(serializer_class, 'Meta', None), 'field_prefetch', {})
+    columns, select, prefetch = set(), set(), set()
+    for field in fields:
+        prefetch.update(field_prefetch.get(field.field_name, ()))
+        if field.source == '*':
+            continue
+        lookups = _field_lookups(queryset.model, field.source_attrs)
+        if lookups is None:
+            columns = None
+            continue
+        if columns is not None:
+            columns.update(lookups[0])
+        select.update(lookups[1])
+        prefetch.update(lookups[2])
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*sorted(prefetch))
+    if columns is not None:
+        # Колонки сортировки нужны пагинации по ключу (курсор следующей страницы)
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        columns.update(
+            name.lstrip('-') for name in ordering
+            if isinstance(name, str) and name.lstrip('-') not in ('?', 'pk') and '__' not in name
+        )
+        queryset = queryset.only(*sorted(columns | select))
+    return queryset
+
+
+class SparseFieldsViewSetMixin:
+    """
+    Для ViewSet: при чтении queryset сужается под поля ответа — из ?fields=,
+    иначе под все поля сериализатора (см. narrow_queryset).
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            queryset = narrow_queryset(queryset, self.get_serializer_class(), requested_fields(self.request))
+        return queryset
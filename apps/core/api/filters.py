@@ -0,0 +1,125 @@
+"""
+Объявленные фильтры и сортировка списков API.
+
+Представление перечисляет фильтры в filter_fields и допустимую сортировку в
+ordering_fields; остальные параметры запроса не влияют на запрос к БД.
+Каждое поле фильтра и сортировки — первая колонка индекса модели (Meta.indexes,
+уникальные ограничения, ForeignKey), поэтому любой поддерживаемый запрос идёт
+по индексу; tests/test_api.py проверяет это для всех представлений API.
+
+  ?status=active,draft          — ExactFilter (несколько значений через запятую);
+  ?company=3                    — ExactFilter(cast=int) по внешнему ключу;
+  ?due_date_from=2026-01-01&due_date_to=2026-03-31 — RangeFilter, границы включительно;
+  ?ordering=-due_date           — одно поле из ordering_fields, затем pk.
+Неверные значения пропускаются, как в фильтрах каталога (apps/catalog/ranges.py).
+"""
+from datetime import datetime, time
+
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.filters import BaseFilterBackend
+
+ORDERING_PARAM = 'ordering'
+
+
+class ExactFilter:
+    """Совпадение с одним из значений через запятую; choices — допустимые значения."""
+
+    def __init__(self, field, cast=str, choices=None):
+        self.field = field
+        self.cast = cast
+        self.choices = {value for value, _ in choices} if choices else None
+
+    def _values(self, raw):
+        values = []
+        for item in raw.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                value = self.cast(item)
+            except (TypeError, ValueError):
+                continue
+            if self.choices is None or value in self.choices:
+                values.append(value)
+        return values
+
+    def filter(self, queryset, params, name):
+        values = self._values(params.get(name, ''))
+        if len(values) == 1:
+            return queryset.filter(**{self.field: values[0]})
+        if values:
+            return queryset.filter(**{f'{self.field}__in': values})
+        return queryset
+
+
+class RangeFilter:
+    """Диапазон дат или даты-времени: <name>_from и <name>_to включительно."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def _parse(self, raw, model_field, end):
+        if not raw:
+            return None
+        try:
+            moment = parse_datetime(raw)
+            day = parse_date(raw) if moment is None else None
+        except ValueError:
+            return None
+        if not isinstance(model_field, models.DateTimeField):
+            return moment.date() if moment else day
+        if moment is None:
+            if day is None:
+                return None
+            moment = datetime.combine(day, time.max if end else time.min)
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+    def filter(self, queryset, params, name):
+        model_field = queryset.model._meta.get_field(self.field)
+        start = self._parse(params.get(f'{name}_from'), model_field, end=False)
+        end = self._parse(params.get(f'{name}_to'), model_field, end=True)
+        if start is not None:
+            queryset = queryset.filter(**{f'{self.field}__gte': start})
+        if end is not None:
+            queryset = queryset.filter(**{f'{self.field}__lte': end})
+        return queryset
+
+
+class DeclaredFilterBackend(BaseFilterBackend):
+    """Фильтры из view.filter_fields: {параметр: ExactFilter/RangeFilter}."""
+
+    def filter_queryset(self, request, queryset, view):
+        for name, declared in getattr(view, 'filter_fields', {}).items():
+            queryset = declared.filter(queryset, request.query_params, name)
+        return queryset
+
+
+class IndexedOrderingBackend(BaseFilterBackend):
+    """?ordering=поле или -поле из view.ordering_fields; pk — последним ключом."""
+
+    def filter_queryset(self, request, queryset, view):
+        raw = request.query_params.get(ORDERING_PARAM, '').strip()
+        name = raw.lstrip('-')
+        if name and name in getattr(view, 'ordering_fields', ()):
+            desc = raw.startswith('-')
+            queryset = queryset.order_by(raw, '-pk' if desc else 'pk')
+            # Колонка сортировки нужна курсору, даже если only() её не выбрал
+            columns, defer = queryset.query.deferred_loading
+            if not defer and name not in columns:
+                queryset = queryset.only(*columns, name)
+        return queryset
+
+
+def indexed_fields(model):
+    """Поля модели, которые стоят первой колонкой какого-либо индекса."""
+    opts = model._meta
+    names = {field.name for field in opts.concrete_fields if field.primary_key or field.unique or field.db_index}
+    names.update(index.fields[0].lstrip('-') for index in opts.indexes if index.fields)
+    names.update(
+        constraint.fields[0] for constraint in opts.constraints
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields
+    )
+    names.update(fields[0] for fields in opts.unique_together)
+    return names
@@ -0,0 +1,65 @@
+"""Пагинация API по ключу (см. apps/core/pagination.py)."""
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from apps.core.pagination import CURSOR_PARAM, KeysetPaginator
+
+
+class KeysetPagination(BasePagination):
+    """
+    Ответ: {"next": url, "previous": url, "results": [...]}.
+    Сортировка — из queryset представления (или Meta.ordering), иначе ordering.
+    Размер страницы — PAGE_SIZE, клиент может уменьшить или увеличить его
+    параметром ?page_size= до max_page_size.
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = CURSOR_PARAM
+    ordering = ('-pk',)
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param, '')
+        if raw.isdigit() and int(raw) > 0:
+            return min(int(raw), self.max_page_size)
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not queryset.ordered:
+            queryset = queryset.order_by(*self.ordering)
+        self.request = request
+        self.page = KeysetPaginator(queryset, self.get_page_size(request)).get_page(
+            request.query_params.get(self.cursor_query_param))
+        return list(self.page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
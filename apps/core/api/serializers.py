@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from apps.core.models import AuditLog
+from apps.core.api.fields import SparseFieldsSerializerMixin
 
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AuditLog
         fields = '__all__'
@@ -2,10 +2,20 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
 from apps.core.models import AuditLog
+from .export import StreamingExportMixin
+from .fields import SparseFieldsViewSetMixin
+from .filters import ExactFilter, RangeFilter
+from .pagination import KeysetPagination
 from .serializers import AuditLogSerializer
 
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(StreamingExportMixin, SparseFieldsViewSetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = AuditLog.objects.all().order_by('-performed_at')
     serializer_class = AuditLogSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_fields = {
+        'table_name': ExactFilter('table_name'),
+        'performed_at': RangeFilter('performed_at'),
+    }
+    ordering_fields = ('performed_at',)
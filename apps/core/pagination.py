@@ -0,0 +1,228 @@
+"""
+Постраничный вывод по ключу (keyset, seek-пагинация).
+
+Вместо OFFSET и COUNT(*) следующая страница выбирается условием «строки после
+последней показанной» по колонкам сортировки и pk:
+    WHERE (sort, pk) > (:sort, :pk) ORDER BY sort, pk LIMIT n + 1
+Запрос идёт по индексу сортировки и одинаково быстр для первой и тысячной
+страницы. Позиция передаётся непрозрачным курсором (?cursor=...).
+NULL в колонках сортировки всегда идут после остальных значений.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from collections.abc import Sequence
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+
+CURSOR_PARAM = 'cursor'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _json_default(value):
+    # Не DjangoJSONEncoder: он обрезает микросекунды, а курсору нужно точное значение
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f'Значение {value!r} нельзя сохранить в курсоре')
+
+
+def encode_cursor(values, backward=False):
+    payload = json.dumps([int(backward), values], default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает (значения ключа, назад ли)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        backward, values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise InvalidCursor(cursor) from None
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values, bool(backward)
+
+
+def _is_nullable(model, path):
+    """Может ли колонка сортировки быть NULL (аннотации считаются NOT NULL)."""
+    opts = model._meta
+    for part in path.split('__'):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        if field.null:
+            return True
+        if field.is_relation and field.related_model is not None:
+            opts = field.related_model._meta
+    return False
+
+
+def _get_value(obj, path):
+    if isinstance(obj, dict):
+        return obj[path]
+    for part in path.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, part)
+    return getattr(obj, 'pk', obj)
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по ключу. Сортировка берётся из order_by queryset (только имена
+    полей, можно через '__' и аннотации); pk добавляется последним ключом.
+
+    Значения ключей проходят через курсор и сравниваются на равенство, поэтому
+    аннотации с плавающей точкой должны быть double precision (FloatField):
+    real (ts_rank, similarity) при чтении округляется, и строки с равным
+    значением пропадают на границе страниц — такие аннотации приводите Cast.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        model = queryset.model
+        pk = model._meta.pk
+        # attname: для pk-связи (OneToOne) ключ — сам id, без загрузки объекта
+        pk_name = pk.attname
+        ordering = list(queryset.query.order_by or model._meta.ordering or [])
+        self.keys = []
+        pk_desc = None
+        for name in ordering:
+            if not isinstance(name, str) or name == '?':
+                raise ValueError(f'Keyset-пагинация не поддерживает сортировку {name!r}')
+            desc = name.startswith('-')
+            name = name.lstrip('-')
+            if name in ('pk', pk.name, pk_name):
+                pk_desc = desc
+                break
+            self.keys.append((name, desc, _is_nullable(model, name)))
+        if pk_desc is None:
+            pk_desc = self.keys[0][1] if self.keys else False
+        self.keys.append((pk_name, pk_desc, False))
+
+    def _ordering(self, backward):
+        ordering = []
+        for name, desc, nullable in self.keys:
+            nulls = {}
+            if nullable:
+                nulls = {'nulls_first': True} if backward else {'nulls_last': True}
+            expr = F(name)
+            ordering.append(expr.desc(**nulls) if desc != backward else expr.asc(**nulls))
+        return ordering
+
+    def _seek(self, values, backward):
+        """Условие «строки после (или до) позиции курсора»."""
+        branches = []
+        prefix = Q()
+        for (name, desc, nullable), value in zip(self.keys, values):
+            greater = desc == backward
+            if value is None:
+                branch = Q(**{f'{name}__isnull': False}) if backward else None
+            else:
+                branch = Q(**{f'{name}__{"gt" if greater else "lt"}': value})
+                if nullable and not backward:
+                    branch |= Q(**{f'{name}__isnull': True})
+            if branch is not None:
+                branches.append(prefix & branch)
+            prefix &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        if not branches:
+            return None
+        condition = reduce(or_, branches)
+        # Граница по первому ключу — чтобы запрос шёл диапазоном по индексу
+        name, desc, nullable = self.keys[0]
+        if values[0] is not None and not nullable:
+            condition &= Q(**{f'{name}__{"gte" if desc == backward else "lte"}': values[0]})
+        return condition
+
+    def _prepare(self, cursor):
+        values, backward = None, False
+        if cursor:
+            try:
+                values, backward = decode_cursor(cursor)
+            except InvalidCursor:
+                pass
+            if values is None or len(values) != len(self.keys):
+                values, backward = None, False
+        qs = self.queryset.order_by(*self._ordering(backward))
+        if values is not None:
+            condition = self._seek(values, backward)
+            qs = qs.filter(condition) if condition is not None else qs.none()
+        return qs[:self.per_page + 1], values, backward
+
+    def _key(self, obj):
+        return [_get_value(obj, name) for name, _, _ in self.keys]
+
+    def _build_page(self, rows, values, backward):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backward:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        if not rows:
+            return KeysetPage(rows)
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(self._key(rows[-1])) if has_next else None,
+            previous_cursor=encode_cursor(self._key(rows[0]), backward=True) if has_previous else None,
+        )
+
+    def get_page(self, cursor=None):
+        """Страница по курсору; неверный курсор — первая страница."""
+        qs, values, backward = self._prepare(cursor)
+        page = self._build_page(list(qs), values, backward)
+        if backward and not page:
+            # Перед курсором ничего не осталось (записи удалены) — первая страница
+            return self.get_page()
+        return page
+
+    async def aget_page(self, cursor=None):
+        qs, values, backward = self._prepare(cursor)
+        page = self._build_page([obj async for obj in qs], values, backward)
+        if backward and not page:
+            return await self.aget_page()
+        return page
+
+
+class KeysetPaginationMixin:
+    """Для ListView: пагинация по ключу вместо Paginator (page_obj — KeysetPage)."""
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.get_page(self.request.GET.get(CURSOR_PARAM))
+        return paginator, page, page.object_list, page.has_other_pages()
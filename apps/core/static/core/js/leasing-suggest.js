@@ -0,0 +1,50 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const input = document.querySelector('input[data-suggest-url]');
+    const list = document.getElementById('leasing-suggestions');
+    if (!input || !list) {
+        return;
+    }
+
+    const minLength = 2;
+    let timer = null;
+    let controller = null;
+    const urls = new Map();
+
+    const render = (results) => {
+        list.innerHTML = '';
+        urls.clear();
+        results.forEach((item) => {
+            const option = document.createElement('option');
+            option.value = item.label;
+            list.appendChild(option);
+            urls.set(item.label, item.url);
+        });
+    };
+
+    const fetchSuggestions = (query) => {
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        const url = `${input.dataset.suggestUrl}?q=${encodeURIComponent(query)}`;
+        fetch(url, { signal: controller.signal, headers: { Accept: 'application/json' } })
+            .then((response) => (response.ok ? response.json() : { results: [] }))
+            .then((data) => render(data.results || []))
+            .catch(() => {});
+    };
+
+    input.addEventListener('input', () => {
+        const query = input.value.trim();
+        // Выбрана подсказка — сразу открываем карточку техники
+        if (urls.has(input.value)) {
+            window.location.href = urls.get(input.value);
+            return;
+        }
+        clearTimeout(timer);
+        if (query.length < minLength) {
+            render([]);
+            return;
+        }
+        timer = setTimeout(() => fetchSuggestions(query), 200);
+    });
+});
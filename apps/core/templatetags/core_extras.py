@@ -19,3 +19,9 @@ def first_image_url(value):
     if isinstance(value, (list, tuple)):
         return value[0] if value else ''
     return value
+
+
+@register.filter
+def tree_indent(level):
+    """Отступ пункта дерева в <option> (неразрывные пробелы по уровню)."""
+    return '\u00a0\u00a0' * (level or 0)
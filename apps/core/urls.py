@@ -8,6 +8,7 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('404-preview/', views.page_404_preview, name='404_preview'),
     path('leasing/', views.leasing, name='leasing'),
+    path('leasing/suggest/', views.leasing_suggest, name='leasing_suggest'),
     path('leasing/<int:equipment_id>/', views.leasing_detail, name='leasing_detail'),
     path('my-equipment/', views.my_equipment, name='my_equipment'),
     path('my-maintenance/', views.my_maintenance_requests, name='my_maintenance_requests'),
@@ -17,4 +18,5 @@ urlpatterns = [
     path('contract/<int:pk>/maintenance/', views.maintenance_request_create, name='maintenance_request_create'),
     path('privacy/', views.privacy, name='privacy'),
     path('about/', views.about, name='about'),
+    path('catalog-snapshot/<str:name>', views.catalog_snapshot_file, name='catalog_snapshot_file'),
 ]
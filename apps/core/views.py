@@ -1,66 +1,75 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import asyncio
+import os
+
+from django.conf import settings
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.urls import reverse
 from django.contrib import messages
-from django.core.paginator import Paginator
+from django.http import FileResponse, Http404, JsonResponse
 from django.db.models import Q
 
 from django.utils import timezone
-
-from apps.catalog.models import Equipment, EquipmentCategory, Manufacturer
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from apps.catalog.cache import aget_references_version
+from apps.catalog.facets import PRICE_BUCKET_KEYS, aget_facet_rows, build_facets, price_bucket_q
+from apps.catalog.models import CatalogEntry, Equipment
+from apps.catalog.ranges import aget_histograms, parse_ranges, range_filter_options, range_q
+from apps.catalog.similar import similar_equipment
+from apps.catalog.snapshot import HASHED_FILE_NAME, MANIFEST_MAX_AGE, snapshot_file
+from apps.catalog.specs import parse_spec_filters, spec_filter_options, spec_q
+from apps.catalog.search import search_equipment, suggest_equipment, SUGGEST_MIN_LENGTH
+from apps.catalog.tree import aget_category_tree, subtree_q
+from apps.leasing.cache import CANCELLABLE_STATUSES, aget_account_requests
 from apps.leasing.models import (
     LeaseRequest, LeaseContract, Company,
     PaymentSchedule, MaintenanceRequest,
 )
+from apps.core.pagination import CURSOR_PARAM, KeysetPaginator
+from apps.accounts.permissions import has_perm
 from apps.accounts.views import get_current_account
 
 
-def _get_leasing_request_context(account):
-    my_requests = []
-    pending_equipment_ids = set()
+async def _alist(qs):
+    # async for, а не aiterator(): у values_list() aiterator выполняет запрос в цикле событий
+    return [obj async for obj in qs]
+
+
+async def _get_leasing_request_context(account):
+    """Заявки пользователя для каталога: один компактный запрос, кэш по аккаунту."""
+    my_requests = await aget_account_requests(account.id) if account else []
     pending_lease_requests = {}
     can_cancel_ids = set()
-
-    if not account:
-        return {
-            'my_requests': my_requests,
-            'can_cancel_ids': can_cancel_ids,
-            'pending_equipment_ids': pending_equipment_ids,
-            'pending_lease_requests': pending_lease_requests,
-        }
-
-    my_requests = list(
-        LeaseRequest.objects.filter(account=account)
-        .select_related('equipment', 'lease_contract')
-        .order_by('-created_at')
-    )
-    for req in my_requests:
-        if req.status in ('pending', 'confirmed'):
-            c = getattr(req, 'lease_contract', None)
-            if not c or not c.signed_at:
-                can_cancel_ids.add(req.id)
-
-    pending_lease_requests = dict(
-        LeaseRequest.objects.filter(
-            account=account, status='pending'
-        ).values_list('equipment_id', 'id')
-    )
-    pending_equipment_ids = set(pending_lease_requests.keys())
+    # Новые заявки первыми: на технику ссылается самая свежая ожидающая
+    for req in reversed(my_requests):
+        if req.status == 'pending':
+            pending_lease_requests[req.equipment_id] = req.id
+        if req.status in CANCELLABLE_STATUSES and not req.signed:
+            can_cancel_ids.add(req.id)
 
     return {
         'my_requests': my_requests,
         'can_cancel_ids': can_cancel_ids,
-        'pending_equipment_ids': pending_equipment_ids,
+        'pending_equipment_ids': set(pending_lease_requests),
         'pending_lease_requests': pending_lease_requests,
     }
 
 
-def home(request):
+async def home(request):
     return render(request, 'core/home.html')
 
 
-def leasing(request):
-    """Страница лизинга — каталог доступной техники с поиском и фильтрами."""
-    qs = Equipment.objects.filter(status='available').select_related('category', 'manufacturer')
+async def leasing(request):
+    """
+    Страница лизинга — каталог доступной техники с поиском и фильтрами.
+    Асинхронная: пока идут запросы к БД, поток воркера не занят. Страница
+    каталога, списки фильтров и заявки пользователя собираются через
+    asyncio.gather, но запросы асинхронного ORM Django выполняются по очереди
+    в одном потоке (thread_sensitive), а не параллельно. Каталог читается из
+    одной таблицы catalog_entry.
+    """
+    qs = CatalogEntry.objects.all()
 
     q = (request.GET.get('q') or '').strip()
     category_id = None
@@ -77,16 +86,31 @@ def leasing(request):
             manufacturer_id = int(mid)
     except (ValueError, TypeError):
         pass
-    sort = request.GET.get('sort', 'name')
+    condition = request.GET.get('condition') or None
+    if condition not in dict(Equipment.CONDITION_CHOICES):
+        condition = None
+    price_bucket = request.GET.get('price') or None
+    if price_bucket not in PRICE_BUCKET_KEYS:
+        price_bucket = None
+    ranges = parse_ranges(request.GET)
+    spec_filters = parse_spec_filters(request.GET)
+    sort = request.GET.get('sort') or ('relevance' if q else 'name')
 
     if q:
-        qs = qs.filter(
-            Q(name__icontains=q) | Q(model__icontains=q) | Q(category__name__icontains=q)
-        )
+        qs = search_equipment(qs, q)
     if category_id:
-        qs = qs.filter(category_id=category_id)
+        # Вместе с подкатегориями
+        qs = qs.filter(subtree_q(category_id))
     if manufacturer_id:
         qs = qs.filter(manufacturer_id=manufacturer_id)
+    if condition:
+        qs = qs.filter(condition=condition)
+    if price_bucket:
+        qs = qs.filter(price_bucket_q(price_bucket))
+    if ranges:
+        qs = qs.filter(range_q(ranges))
+    if spec_filters:
+        qs = qs.filter(spec_q(spec_filters, field='equipment_id'))
 
     if sort == 'price':
         qs = qs.order_by('price')
@@ -94,26 +118,34 @@ def leasing(request):
         qs = qs.order_by('-price')
     elif sort == 'rate':
         qs = qs.order_by('monthly_lease_rate')
+    elif sort == 'relevance' and q:
+        qs = qs.order_by('-search_rank', 'category_name', 'name')
     else:
-        qs = qs.order_by('category__name', 'name')
+        qs = qs.order_by('category_name', 'name')
 
-    paginator = Paginator(qs, 12)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
-    equipment_list = page_obj.object_list
-
-    categories = EquipmentCategory.objects.filter(
-        equipment__status='available'
-    ).distinct().order_by('name')
-    manufacturers = Manufacturer.objects.filter(
-        equipment__status='available'
-    ).distinct().order_by('name')
+    paginator = KeysetPaginator(qs, 12)
 
     account = get_current_account(request)
-    request_context = _get_leasing_request_context(account)
+    (
+        page_obj, facet_rows, category_tree, histograms, references_version, request_context,
+    ) = await asyncio.gather(
+        paginator.aget_page(request.GET.get(CURSOR_PARAM)),
+        aget_facet_rows(q, ranges, spec_filters),
+        aget_category_tree(),
+        aget_histograms(),
+        aget_references_version(),
+        _get_leasing_request_context(account),
+    )
+    equipment_list = page_obj.object_list
+    facets = build_facets(facet_rows, {
+        'category': category_id,
+        'manufacturer': manufacturer_id,
+        'condition': condition,
+        'price': price_bucket,
+    }, tree=category_tree)
 
     get_copy = request.GET.copy()
-    get_copy.pop('page', None)
+    get_copy.pop(CURSOR_PARAM, None)
     query_string = get_copy.urlencode()
 
     return render(request, 'core/leasing.html', {
@@ -121,32 +153,66 @@ def leasing(request):
         'page_obj': page_obj,
         'query_string': query_string,
         'current_account': account,
-        'categories': categories,
-        'manufacturers': manufacturers,
+        'categories': facets['category'],
+        'manufacturers': facets['manufacturer'],
+        'conditions': facets['condition'],
+        'price_buckets': facets['price'],
         'search_q': q,
         'filter_category_id': category_id,
         'filter_manufacturer_id': manufacturer_id,
+        'filter_condition': condition,
+        'filter_price': price_bucket,
+        'range_filters': range_filter_options(ranges, histograms),
+        'spec_filters': spec_filter_options(spec_filters),
+        'filter_ranges': bool(ranges or spec_filters),
         'sort': sort,
+        'references_version': references_version,
+        'fragment_cache_ttl': settings.CATALOG_FRAGMENT_CACHE_TTL,
         **request_context,
     })
 
 
-def leasing_detail(request, equipment_id):
-    equipment = get_object_or_404(
-        Equipment.objects.select_related('category', 'manufacturer'),
-        pk=equipment_id,
-        status='available',
-    )
+async def leasing_detail(request, equipment_id):
     account = get_current_account(request)
-    request_context = _get_leasing_request_context(account)
+    equipment, similar, references_version, request_context = await asyncio.gather(
+        aget_object_or_404(
+            Equipment.objects.select_related('category', 'manufacturer'),
+            pk=equipment_id,
+            status='available',
+        ),
+        # Готовый список соседей (apps/catalog/similar.py), один запрос
+        _alist(similar_equipment(equipment_id)),
+        aget_references_version(),
+        _get_leasing_request_context(account),
+    )
 
     return render(request, 'core/leasing_detail.html', {
         'equipment': equipment,
+        'similar_equipment': similar,
         'current_account': account,
+        'references_version': references_version,
+        'fragment_cache_ttl': settings.CATALOG_FRAGMENT_CACHE_TTL,
         **request_context,
     })
 
 
+async def leasing_suggest(request):
+    """Подсказки для строки поиска каталога (JSON), по триграммному индексу."""
+    q = (request.GET.get('q') or '').strip()
+    results = []
+    if len(q) >= SUGGEST_MIN_LENGTH:
+        async for row in suggest_equipment(q):
+            label = f"{row['name']} {row['model']}"
+            if row['manufacturer_name']:
+                label = f"{label} · {row['manufacturer_name']}"
+            results.append({
+                'id': row['equipment_id'],
+                'label': label,
+                'url': reverse('core:leasing_detail', args=[row['equipment_id']]),
+            })
+    return JsonResponse({'results': results})
+
+
 def leasing_request_create(request, equipment_id):
     """Создание заявки на лизинг пользователем."""
     account = get_current_account(request)
@@ -155,7 +221,7 @@ def leasing_request_create(request, equipment_id):
         return redirect('accounts:login')
 
     # Клиент должен быть связан с компанией
-    if account.role and account.role.name not in ('admin', 'manager'):
+    if has_perm(account, 'contracts.sign'):
         has_company = Company.objects.filter(account=account).exists()
         if not has_company:
             messages.warning(
@@ -197,7 +263,7 @@ def my_equipment(request):
     if not account:
         messages.error(request, 'Войдите в систему.')
         return redirect('accounts:login')
-    if account.role and account.role.name in ('admin', 'manager'):
+    if not has_perm(account, 'equipment.own'):
         messages.error(request, 'Эта страница доступна только клиентам.')
         return redirect('core:home')
 
@@ -265,7 +331,7 @@ def contract_sign(request, pk):
     if not account:
         messages.error(request, 'Войдите в систему.')
         return redirect('accounts:login')
-    if account.role and account.role.name in ('admin', 'manager'):
+    if not has_perm(account, 'contracts.sign'):
         messages.error(request, 'Договор подписывает клиент.')
         return redirect('core:my_equipment')
 
@@ -297,7 +363,7 @@ def contract_pay(request, pk):
     if not account:
         messages.error(request, 'Войдите в систему.')
         return redirect('accounts:login')
-    if account.role and account.role.name in ('admin', 'manager'):
+    if not has_perm(account, 'contracts.pay'):
         return redirect('core:my_equipment')
 
     contract = get_object_or_404(LeaseContract, pk=pk)
@@ -356,7 +422,7 @@ def my_maintenance_requests(request):
     if not account:
         messages.error(request, 'Войдите в систему.')
         return redirect('accounts:login')
-    if account.role and account.role.name in ('admin', 'manager'):
+    if not has_perm(account, 'maintenance.request'):
         return redirect('core:my_equipment')
 
     requests_list = MaintenanceRequest.objects.filter(
@@ -375,7 +441,7 @@ def maintenance_request_create(request, pk):
     if not account:
         messages.error(request, 'Войдите в систему.')
         return redirect('accounts:login')
-    if account.role and account.role.name in ('admin', 'manager'):
+    if not has_perm(account, 'maintenance.request'):
         return redirect('core:my_equipment')
 
     contract = get_object_or_404(LeaseContract, pk=pk)
@@ -407,6 +473,40 @@ def maintenance_request_create(request, pk):
     })
 
 
+def catalog_snapshot_file(request, name):
+    """
+    Файл статического снимка каталога (apps/catalog/snapshot.py). Файл
+    открывается при каждом запросе, поэтому после выгрузки сразу отдаются новые
+    manifest.json и шарды с верной длиной; .gz — клиентам с Accept-Encoding: gzip.
+    """
+    found = snapshot_file(name, accept_gzip='gzip' in request.headers.get('Accept-Encoding', ''))
+    if found is None:
+        raise Http404
+    path, gzipped = found
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        # Удалён выгрузкой между проверкой и открытием
+        raise Http404 from None
+    stat = os.fstat(f.fileno())
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}' + ('-gz' if gzipped else ''))
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = FileResponse(f, content_type='application/json; charset=utf-8', filename=name)
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+    else:
+        f.close()
+    response['ETag'] = etag
+    if HASHED_FILE_NAME.match(name):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = f'public, max-age={MANIFEST_MAX_AGE}'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
 def privacy(request):
     return render(request, 'core/privacy.html')
 
@@ -3,27 +3,28 @@ from apps.leasing.models import (
     Company, LeaseContract,
     PaymentSchedule, MaintenanceRequest,
 )
+from apps.core.api.fields import SparseFieldsSerializerMixin
 
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = '__all__'
 
 
-class LeaseContractSerializer(serializers.ModelSerializer):
+class LeaseContractSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = LeaseContract
         fields = '__all__'
 
 
-class PaymentScheduleSerializer(serializers.ModelSerializer):
+class PaymentScheduleSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = PaymentSchedule
         fields = '__all__'
 
 
-class MaintenanceRequestSerializer(serializers.ModelSerializer):
+class MaintenanceRequestSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = MaintenanceRequest
         fields = '__all__'
@@ -5,6 +5,10 @@ from apps.leasing.models import (
     Company, LeaseContract,
     PaymentSchedule, MaintenanceRequest,
 )
+from apps.core.api.bulk import BulkModelMixin
+from apps.core.api.export import StreamingExportMixin
+from apps.core.api.fields import SparseFieldsViewSetMixin
+from apps.core.api.filters import ExactFilter, RangeFilter
 from .serializers import (
     CompanySerializer,
     LeaseContractSerializer,
@@ -13,13 +17,18 @@ from .serializers import (
 )
 
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(BulkModelMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_fields = {
+        'status': ExactFilter('status', choices=Company.STATUS_CHOICES),
+        'created_at': RangeFilter('created_at'),
+    }
+    ordering_fields = ('created_at',)
 
 
-class LeaseContractViewSet(viewsets.ModelViewSet):
+class LeaseContractViewSet(StreamingExportMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = (
         LeaseContract.objects
         .select_related('company', 'equipment')
@@ -28,17 +37,36 @@ class LeaseContractViewSet(viewsets.ModelViewSet):
     )
     serializer_class = LeaseContractSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_fields = {
+        'status': ExactFilter('status', choices=LeaseContract.STATUS_CHOICES),
+        'company': ExactFilter('company', cast=int),
+        'created_at': RangeFilter('created_at'),
+    }
+    ordering_fields = ('created_at',)
 
 
-class PaymentScheduleViewSet(viewsets.ModelViewSet):
+class PaymentScheduleViewSet(BulkModelMixin, StreamingExportMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = PaymentSchedule.objects.select_related('contract').all()
     serializer_class = PaymentScheduleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_fields = {
+        'status': ExactFilter('status', choices=PaymentSchedule.STATUS_CHOICES),
+        'contract': ExactFilter('contract', cast=int),
+        'due_date': RangeFilter('due_date'),
+    }
+    ordering_fields = ('due_date',)
 
 
-class MaintenanceRequestViewSet(viewsets.ModelViewSet):
+class MaintenanceRequestViewSet(SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     queryset = MaintenanceRequest.objects.select_related(
         'equipment', 'company'
     ).all()
     serializer_class = MaintenanceRequestSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_fields = {
+        'status': ExactFilter('status', choices=MaintenanceRequest.STATUS_CHOICES),
+        'urgency': ExactFilter('urgency', choices=MaintenanceRequest.URGENCY_CHOICES),
+        'company': ExactFilter('company', cast=int),
+        'created_at': RangeFilter('created_at'),
+    }
+    ordering_fields = ('created_at',)
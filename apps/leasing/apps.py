@@ -5,3 +5,6 @@ class LeasingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.leasing'
     verbose_name = 'Лизинг'
+
+    def ready(self):
+        from . import signals  # noqa: F401
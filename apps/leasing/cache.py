@@ -0,0 +1,61 @@
+"""
+Кэш заявок аккаунта для страниц каталога.
+
+Каталог и карточка техники показывают, на что пользователь уже подал заявку
+и какие заявки можно отменить. Для этого хватает одного компактного запроса
+(заявка, техника, статус, подписан ли договор) без загрузки объектов; результат
+хранится в кэше Django по аккаунту. Сигналы (apps/leasing/signals.py)
+сбрасывают его при изменении заявок и договоров аккаунта, а вместе с записью
+хранится версия каталога — после правки техники названия перечитываются.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.catalog.cache import aget_catalog_version
+from .models import LeaseRequest
+
+# Заявки, которые ещё можно отменить (если договор не подписан)
+CANCELLABLE_STATUSES = ('pending', 'confirmed')
+
+AccountLeaseRequest = namedtuple('AccountLeaseRequest', [
+    'id', 'equipment_id', 'status', 'signed', 'equipment_name', 'equipment_model', 'created_at',
+])
+
+
+def _key(account_id):
+    return f'leasing:account_requests:{account_id}'
+
+
+def account_requests_queryset(account_id):
+    return (
+        LeaseRequest.objects.filter(account_id=account_id)
+        .order_by('-created_at', '-id')
+        .values_list(
+            'id', 'equipment_id', 'status', 'lease_contract__signed_at',
+            'equipment__name', 'equipment__model', 'created_at',
+        )
+    )
+
+
+async def aget_account_requests(account_id):
+    """Заявки аккаунта (новые первыми) из кэша или одним запросом."""
+    key = _key(account_id)
+    version = await aget_catalog_version()
+    cached = await cache.aget(key)
+    if cached is not None and cached[0] == version:
+        rows = cached[1]
+    else:
+        rows = [
+            (request_id, equipment_id, status, signed_at is not None, name, model, created_at)
+            async for request_id, equipment_id, status, signed_at, name, model, created_at
+            in account_requests_queryset(account_id)
+        ]
+        await cache.aset(key, (version, rows), settings.LEASE_REQUESTS_CACHE_TTL)
+    return [AccountLeaseRequest(*row) for row in rows]
+
+
+def invalidate_account_requests(account_id):
+    if account_id:
+        cache.delete(_key(account_id))
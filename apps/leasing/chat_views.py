@@ -5,6 +5,7 @@ from django.http import JsonResponse
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+from apps.accounts.permissions import has_perm
 from apps.accounts.views import get_current_account
 from .models import LeaseRequest, ChatMessage, LeaseContract
 
@@ -15,7 +16,7 @@ def chat_list(request):
     if not account:
         messages.error(request, 'Войдите в систему.')
         return redirect('accounts:login')
-    if account.role and account.role.name in ('manager', 'admin'):
+    if has_perm(account, 'chat.manage'):
         return redirect('manager:chat')
     lease_requests = LeaseRequest.objects.filter(
         account=account
@@ -31,11 +32,7 @@ def _can_access_chat(account, lease_request):
         return False
     if lease_request.account_id == account.id:
         return True
-    if account.role and account.role.name == 'manager':
-        return True
-    if account.role and account.role.name == 'admin':
-        return True
-    return False
+    return has_perm(account, 'chat.manage')
 
 
 def chat_thread(request, request_id):
@@ -53,14 +50,14 @@ def chat_thread(request, request_id):
     if request.method == 'POST':
         action = request.POST.get('action')
         if action == 'confirm' and _can_access_chat(account, lease_req):
-            if account.role and account.role.name in ('manager', 'admin') and lease_req.status == 'pending':
+            if has_perm(account, 'lease_requests.review') and lease_req.status == 'pending':
                 lease_req.status = 'confirmed'
                 lease_req.confirmed_by = account
                 lease_req.save()
                 messages.success(request, 'Заявка подтверждена.')
                 return redirect('chat:thread', request_id=lease_req.id)
         elif action == 'reject' and _can_access_chat(account, lease_req):
-            if account.role and account.role.name in ('manager', 'admin') and lease_req.status == 'pending':
+            if has_perm(account, 'lease_requests.review') and lease_req.status == 'pending':
                 notes = (request.POST.get('manager_notes', '') or '').strip()
                 lease_req.status = 'rejected'
                 lease_req.manager_notes = notes
@@ -121,7 +118,7 @@ def chat_thread(request, request_id):
 
     messages_list = lease_req.messages.select_related(
         'sender', 'sender__profile').all()
-    is_manager = account.role and account.role.name in ('manager', 'admin')
+    is_manager = has_perm(account, 'chat.manage')
     related_contract = LeaseContract.objects.filter(
         lease_request=lease_req).first()
     can_cancel = (
@@ -27,20 +27,21 @@ class MaintenanceChatConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def _can_access(self):
-        from apps.accounts.models import Account
+        from apps.accounts.cache import get_cached_account
+        from apps.accounts.permissions import has_perm
         from .models import MaintenanceRequest
         session = self.scope.get('session') or {}
         account_id = session.get('account_id')
         if not account_id:
             return False
         try:
-            account = Account.objects.filter(id=account_id, is_active=True).select_related('role').first()
+            account = get_cached_account(account_id)
             if not account:
                 return False
             maint = MaintenanceRequest.objects.get(pk=self.maint_id)
             if maint.company.account_id == account.id:
                 return True
-            if account.role and account.role.name in ('manager', 'admin'):
+            if has_perm(account, 'chat.manage'):
                 return True
         except (MaintenanceRequest.DoesNotExist, ValueError):
             pass
@@ -69,20 +70,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def _can_access(self):
-        from apps.accounts.models import Account
+        from apps.accounts.cache import get_cached_account
+        from apps.accounts.permissions import has_perm
         from .models import LeaseRequest
         session = self.scope.get('session') or {}
         account_id = session.get('account_id')
         if not account_id:
             return False
         try:
-            account = Account.objects.filter(id=account_id, is_active=True).select_related('role').first()
+            account = get_cached_account(account_id)
             if not account:
                 return False
             lease_req = LeaseRequest.objects.get(pk=self.request_id)
             if lease_req.account_id == account.id:
                 return True
-            if account.role and account.role.name in ('manager', 'admin'):
+            if has_perm(account, 'chat.manage'):
                 return True
         except (LeaseRequest.DoesNotExist, ValueError):
             pass
@@ -6,6 +6,7 @@ from django.utils import timezone
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+from apps.accounts.permissions import has_perm
 from apps.accounts.views import get_current_account
 from .models import MaintenanceRequest, MaintenanceChatMessage
 
@@ -16,9 +17,7 @@ def _can_access_maintenance_chat(account, maint_req):
         return False
     if maint_req.company.account_id == account.id:
         return True
-    if account.role and account.role.name in ('manager', 'admin'):
-        return True
-    return False
+    return has_perm(account, 'chat.manage')
 
 
 def maintenance_chat_thread(request, pk):
@@ -35,7 +34,7 @@ def maintenance_chat_thread(request, pk):
 
     if request.method == 'POST':
         action = request.POST.get('action')
-        if action and account.role and account.role.name in ('manager', 'admin'):
+        if action and has_perm(account, 'maintenance.manage'):
             if action in ('in_progress', 'completed', 'cancelled'):
                 maint_req.status = action
                 if action == 'in_progress':
@@ -91,7 +90,7 @@ def maintenance_chat_thread(request, pk):
 
     messages_list = maint_req.messages.select_related(
         'sender', 'sender__profile').all()
-    is_manager = account.role and account.role.name in ('manager', 'admin')
+    is_manager = has_perm(account, 'chat.manage')
 
     return render(request, 'leasing/maintenance_chat_thread.html', {
         'maintenance_request': maint_req,
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leasing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['status', 'created_at'], name='idx_company_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['created_at'], name='idx_company_created_at'),
+        ),
+        migrations.AddIndex(
+            model_name='leasecontract',
+            index=models.Index(fields=['status', 'created_at'], name='idx_contract_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='leasecontract',
+            index=models.Index(fields=['created_at'], name='idx_contract_created_at'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['status', 'created_at'], name='idx_maintenance_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['urgency', 'created_at'], name='idx_maintenance_urgency'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['created_at'], name='idx_maintenance_created_at'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentschedule',
+            index=models.Index(fields=['status', 'due_date'], name='idx_payment_status_due'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentschedule',
+            index=models.Index(fields=['due_date'], name='idx_payment_due_date'),
+        ),
+    ]
@@ -33,6 +33,11 @@ class Company(models.Model):
         db_table = 'company'
         verbose_name = 'компания'
         verbose_name_plural = 'компании'
+        # Фильтры и сортировка API (apps/leasing/api/viewsets.py)
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='idx_company_status_created'),
+            models.Index(fields=['created_at'], name='idx_company_created_at'),
+        ]
 
     def __str__(self):
         return self.name
@@ -95,6 +100,10 @@ class LeaseContract(models.Model):
         db_table = 'lease_contract'
         verbose_name = 'договор лизинга'
         verbose_name_plural = 'договоры лизинга'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='idx_contract_status_created'),
+            models.Index(fields=['created_at'], name='idx_contract_created_at'),
+        ]
 
     def __str__(self):
         return self.contract_number
@@ -126,6 +135,10 @@ class PaymentSchedule(models.Model):
         db_table = 'payment_schedule'
         verbose_name = 'платёж по графику'
         verbose_name_plural = 'графики платежей'
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='idx_payment_status_due'),
+            models.Index(fields=['due_date'], name='idx_payment_due_date'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['contract', 'payment_number'],
@@ -179,6 +192,11 @@ class MaintenanceRequest(models.Model):
         db_table = 'maintenance_request'
         verbose_name = 'заявка на обслуживание'
         verbose_name_plural = 'заявки на обслуживание'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='idx_maintenance_status_created'),
+            models.Index(fields=['urgency', 'created_at'], name='idx_maintenance_urgency'),
+            models.Index(fields=['created_at'], name='idx_maintenance_created_at'),
+        ]
 
     def __str__(self):
         return f'Заявка #{self.id} — {self.equipment}'
@@ -0,0 +1,24 @@
+"""Сигналы приложения leasing: сброс кэша заявок аккаунта (apps/leasing/cache.py)."""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_account_requests
+from .models import LeaseContract, LeaseRequest
+
+
+@receiver(post_save, sender=LeaseRequest)
+@receiver(post_delete, sender=LeaseRequest)
+def lease_request_changed(sender, instance, **kwargs):
+    invalidate_account_requests(instance.account_id)
+
+
+@receiver(post_save, sender=LeaseContract)
+@receiver(post_delete, sender=LeaseContract)
+def lease_contract_changed(sender, instance, **kwargs):
+    if instance.lease_request_id:
+        account_id = (
+            LeaseRequest.objects.filter(pk=instance.lease_request_id)
+            .values_list('account_id', flat=True)
+            .first()
+        )
+        invalidate_account_requests(account_id)
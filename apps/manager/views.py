@@ -11,7 +11,9 @@ from django.views import View
 
 from apps.leasing.models import Company, LeaseContract, PaymentSchedule, MaintenanceRequest
 from apps.catalog.models import Equipment, EquipmentCategory
+from apps.catalog.tree import subtree_equipment_counts
 from apps.control_panel.mixins import AdminRequiredMixin, AdminOrManagerRequiredMixin
+from apps.core.pagination import CURSOR_PARAM, KeysetPaginator
 from .mixins import ManagerRequiredMixin
 
 
@@ -28,14 +30,16 @@ def _get_statistics_data():
         'data': [c['count'] for c in contracts_by_status],
     }
 
+    # Верхние категории с техникой всех подкатегорий (таблица замыкания)
     equipment_by_category = (
-        Equipment.objects.values('category__name')
-        .annotate(count=Count('id'))
-        .order_by('-count')[:10]
+        subtree_equipment_counts()
+        .filter(parent__isnull=True, equipment_count__gt=0)
+        .values('name', 'equipment_count')
+        .order_by('-equipment_count', 'name')[:10]
     )
     bar_equipment = {
-        'labels': [e['category__name'] or 'Без категории' for e in equipment_by_category],
-        'data': [e['count'] for e in equipment_by_category],
+        'labels': [e['name'] for e in equipment_by_category],
+        'data': [e['equipment_count'] for e in equipment_by_category],
     }
 
     payments_by_status = (
@@ -454,14 +458,11 @@ class ChatView(ManagerRequiredMixin, View):
     """Чат с клиентами — список заявок с переходом в чат."""
 
     def get(self, request):
-        from django.core.paginator import Paginator
         from apps.leasing.models import LeaseRequest
         qs = LeaseRequest.objects.select_related(
             'equipment', 'account', 'account__profile'
         ).order_by('-created_at')
-        paginator = Paginator(qs, 5)
-        page_number = request.GET.get('page', 1)
-        page_obj = paginator.get_page(page_number)
+        page_obj = KeysetPaginator(qs, 5).get_page(request.GET.get(CURSOR_PARAM))
         return render(request, 'manager/chat.html', {
             'page_obj': page_obj,
             'lease_requests': page_obj.object_list,
@@ -472,14 +473,11 @@ class MaintenanceChatView(ManagerRequiredMixin, View):
     """Заявки на ТО — список с переходом в чат."""
 
     def get(self, request):
-        from django.core.paginator import Paginator
         qs = MaintenanceRequest.objects.select_related(
             'equipment', 'equipment__category', 'company', 'company__account',
             'company__account__profile'
         ).order_by('-created_at')
-        paginator = Paginator(qs, 5)
-        page_number = request.GET.get('page', 1)
-        page_obj = paginator.get_page(page_number)
+        page_obj = KeysetPaginator(qs, 5).get_page(request.GET.get(CURSOR_PARAM))
         return render(request, 'manager/maintenance_chat.html', {
             'page_obj': page_obj,
             'maintenance_requests': page_obj.object_list,
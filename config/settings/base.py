@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     # Project apps
     'apps.accounts',
@@ -47,6 +48,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.accounts.middleware.CurrentAccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -88,6 +90,27 @@ DATABASES = {
     }
 }
 
+# Кэш Django (по умолчанию — в памяти процесса; для нескольких процессов укажите CACHE_URL,
+# например rediscache://127.0.0.1:6379/1)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Сессии: кэш + БД; вместе со снимком аккаунта (apps/accounts/snapshot.py) горячие страницы
+# не читают таблицу сессий. Допустимо signed_cookies.
+SESSION_ENGINE = env('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+
+# Кэш текущего аккаунта в памяти процесса (apps/accounts/cache.py)
+ACCOUNT_CACHE_TTL = env.int('ACCOUNT_CACHE_TTL', default=30)
+ACCOUNT_CACHE_SIZE = env.int('ACCOUNT_CACHE_SIZE', default=2048)
+# Кэш проверенных токенов API (хэш ключа -> аккаунт)
+API_TOKEN_CACHE_TTL = env.int('API_TOKEN_CACHE_TTL', default=60)
+API_TOKEN_CACHE_SIZE = env.int('API_TOKEN_CACHE_SIZE', default=4096)
+# Кэш фрагментов карточек техники в каталоге (ключ — pk, updated_at и версия справочников)
+CATALOG_FRAGMENT_CACHE_TTL = env.int('CATALOG_FRAGMENT_CACHE_TTL', default=86400)
+# Кэш заявок аккаунта для каталога (apps/leasing/cache.py), сбрасывается сигналами
+LEASE_REQUESTS_CACHE_TTL = env.int('LEASE_REQUESTS_CACHE_TTL', default=600)
+
 # Путь к bin PostgreSQL (pg_dump, psql) — для Windows, если не в PATH
 PG_BIN_PATH = env('PG_BIN_PATH', default='')
 
@@ -101,6 +124,17 @@ EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = env(
     'DEFAULT_FROM_EMAIL', default='') or EMAIL_HOST_USER or 'noreply@leasegrow.ru'
 
+# Первый алгоритм — основной; хэши по остальным пересчитываются при входе
+PASSWORD_HASHERS = env.list('PASSWORD_HASHERS', default=[
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+])
+# Потоков для хэширования паролей (apps/accounts/passwords.py)
+PASSWORD_HASHING_WORKERS = env.int('PASSWORD_HASHING_WORKERS', default=2)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -117,6 +151,10 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = []  # Добавляются в local/production при необходимости
 
+# Статический снимок каталога (manage.py export_catalog_snapshot); по адресу /catalog-snapshot/
+# его отдаёт apps/core/views.py:catalog_snapshot_file, читая файлы при каждом запросе.
+CATALOG_SNAPSHOT_DIR = env('CATALOG_SNAPSHOT_DIR', default=str(BASE_DIR / 'public' / 'catalog-snapshot'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Кастомный тест-раннер с подробным выводом на русском
@@ -134,4 +172,12 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # Списки — страницами по ключу с курсором (apps/core/api/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.api.pagination.KeysetPagination',
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=20),
+    # Фильтры и сортировка, объявленные в представлениях (apps/core/api/filters.py)
+    'DEFAULT_FILTER_BACKENDS': [
+        'apps.core.api.filters.DeclaredFilterBackend',
+        'apps.core.api.filters.IndexedOrderingBackend',
+    ],
 }
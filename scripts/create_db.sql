@@ -50,13 +50,12 @@ CREATE TABLE IF NOT EXISTS user_profile (
 -- API токены
 CREATE TABLE IF NOT EXISTS account_token (
     id BIGSERIAL PRIMARY KEY,
-    key VARCHAR(64) NOT NULL UNIQUE,
+    key_prefix VARCHAR(8) NOT NULL,
+    key_hash VARCHAR(64) NOT NULL UNIQUE,
     account_id BIGINT NOT NULL REFERENCES account(id) ON DELETE CASCADE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX IF NOT EXISTS idx_account_token_key ON account_token(key);
-
 -- Компании
 CREATE TABLE IF NOT EXISTS company (
     id BIGSERIAL PRIMARY KEY,
@@ -82,6 +81,17 @@ CREATE TABLE IF NOT EXISTS equipment_category (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Дерево категорий: таблица замыкания (apps/catalog/tree.py)
+CREATE TABLE IF NOT EXISTS equipment_category_closure (
+    id BIGSERIAL PRIMARY KEY,
+    ancestor_id BIGINT NOT NULL REFERENCES equipment_category(id) ON DELETE CASCADE,
+    descendant_id BIGINT NOT NULL REFERENCES equipment_category(id) ON DELETE CASCADE,
+    depth SMALLINT NOT NULL CHECK (depth >= 0),
+    CONSTRAINT uq_category_closure UNIQUE (ancestor_id, descendant_id)
+);
+
+CREATE INDEX IF NOT EXISTS equipment_category_closure_descendant_id ON equipment_category_closure(descendant_id);
+
 -- Производители
 CREATE TABLE IF NOT EXISTS manufacturer (
     id BIGSERIAL PRIMARY KEY,
@@ -109,10 +119,131 @@ CREATE TABLE IF NOT EXISTS equipment (
     status VARCHAR(50) DEFAULT 'available' CHECK (status IN ('available', 'leased', 'maintenance', 'sold')),
     location VARCHAR(500) DEFAULT '',
     images_urls JSONB DEFAULT '[]',
+    search_vector TSVECTOR,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Характеристики техники, разобранные из specifications (apps/catalog/specs.py)
+CREATE TABLE IF NOT EXISTS equipment_spec (
+    id BIGSERIAL PRIMARY KEY,
+    equipment_id BIGINT NOT NULL REFERENCES equipment(id) ON DELETE CASCADE,
+    attribute VARCHAR(50) NOT NULL,
+    value DECIMAL(12, 3) NOT NULL,
+    CONSTRAINT uq_equipment_spec UNIQUE (equipment_id, attribute)
+);
+
+CREATE INDEX IF NOT EXISTS idx_equipment_spec_value ON equipment_spec(attribute, value, equipment_id);
+
+-- Похожая техника (apps/catalog/similar.py), заполняется manage.py rebuild_similar_equipment
+CREATE TABLE IF NOT EXISTS equipment_neighbor (
+    id BIGSERIAL PRIMARY KEY,
+    equipment_id BIGINT NOT NULL REFERENCES equipment(id) ON DELETE CASCADE,
+    neighbor_id BIGINT NOT NULL REFERENCES equipment(id) ON DELETE CASCADE,
+    rank SMALLINT NOT NULL CHECK (rank >= 0),
+    distance DOUBLE PRECISION NOT NULL,
+    CONSTRAINT uq_equipment_neighbor_rank UNIQUE (equipment_id, rank)
+);
+
+CREATE INDEX IF NOT EXISTS idx_equipment_neighbor_neighbor ON equipment_neighbor(neighbor_id);
+
+-- История цен техники, только добавление (apps/catalog/price_history.py)
+CREATE TABLE IF NOT EXISTS equipment_price_history (
+    id BIGSERIAL PRIMARY KEY,
+    equipment_id BIGINT NOT NULL REFERENCES equipment(id) ON DELETE CASCADE,
+    effective_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    price NUMERIC(12, 2) NOT NULL,
+    monthly_lease_rate NUMERIC(8, 2)
+);
+
+CREATE INDEX IF NOT EXISTS idx_equipment_price_history ON equipment_price_history(equipment_id, effective_at);
+
+-- Фильтры по статусу с диапазоном цены/платежа и по категории (apps/catalog/ranges.py)
+CREATE INDEX IF NOT EXISTS idx_equipment_status_price ON equipment(status, price);
+CREATE INDEX IF NOT EXISTS idx_equipment_status_rate ON equipment(status, monthly_lease_rate);
+CREATE INDEX IF NOT EXISTS idx_equipment_status_category ON equipment(status, category_id);
+
+-- Полнотекстовый поиск по технике (apps/catalog/search.py)
+CREATE OR REPLACE FUNCTION equipment_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.model, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(
+            (SELECT name FROM manufacturer WHERE id = NEW.manufacturer_id), '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(
+            (SELECT name FROM equipment_category WHERE id = NEW.category_id), '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(NEW.specifications, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_search_vector_trigger ON equipment;
+CREATE TRIGGER equipment_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, model, manufacturer_id, category_id, specifications
+    ON equipment FOR EACH ROW EXECUTE FUNCTION equipment_search_vector_update();
+
+CREATE OR REPLACE FUNCTION equipment_search_vector_refresh_related() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'manufacturer' THEN
+        UPDATE equipment SET name = name WHERE manufacturer_id = NEW.id;
+    ELSE
+        UPDATE equipment SET name = name WHERE category_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS manufacturer_search_vector_trigger ON manufacturer;
+CREATE TRIGGER manufacturer_search_vector_trigger
+    AFTER UPDATE OF name ON manufacturer FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION equipment_search_vector_refresh_related();
+
+DROP TRIGGER IF EXISTS equipment_category_search_vector_trigger ON equipment_category;
+CREATE TRIGGER equipment_category_search_vector_trigger
+    AFTER UPDATE OF name ON equipment_category FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION equipment_search_vector_refresh_related();
+
+CREATE INDEX IF NOT EXISTS idx_equipment_search_vector ON equipment USING gin (search_vector);
+
+-- Триграммный поиск и подсказки (опечатки в названиях, моделях и производителях)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_equipment_name_trgm ON equipment USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_equipment_model_trgm ON equipment USING gin (model gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_manufacturer_name_trgm ON manufacturer USING gin (name gin_trgm_ops);
+
+-- Каталог (read model, apps/catalog/read_model.py): доступная техника без JOIN
+CREATE TABLE IF NOT EXISTS catalog_entry (
+    equipment_id BIGINT PRIMARY KEY REFERENCES equipment(id) ON DELETE CASCADE,
+    name VARCHAR(255) NOT NULL,
+    model VARCHAR(150) NOT NULL,
+    category_id BIGINT NOT NULL,
+    category_name VARCHAR(150) NOT NULL,
+    manufacturer_id BIGINT,
+    manufacturer_name VARCHAR(255) NOT NULL DEFAULT '',
+    specifications TEXT NOT NULL DEFAULT '',
+    condition VARCHAR(50) NOT NULL,
+    price DECIMAL(12, 2) NOT NULL,
+    monthly_lease_rate DECIMAL(8, 2),
+    year INTEGER,
+    image_url VARCHAR(500) NOT NULL DEFAULT '',
+    search_vector TSVECTOR,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS catalog_entry_category_id ON catalog_entry(category_id);
+CREATE INDEX IF NOT EXISTS catalog_entry_manufacturer_id ON catalog_entry(manufacturer_id);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_name ON catalog_entry(category_name, name, equipment_id);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_price ON catalog_entry(price, equipment_id);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_rate ON catalog_entry(monthly_lease_rate, equipment_id);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_year ON catalog_entry(year);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_search_vector ON catalog_entry USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_name_trgm ON catalog_entry USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_model_trgm ON catalog_entry USING gin (model gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_catalog_entry_manufacturer_trgm ON catalog_entry USING gin (manufacturer_name gin_trgm_ops);
+
 -- Заявки на лизинг
 CREATE TABLE IF NOT EXISTS lease_request (
     id BIGSERIAL PRIMARY KEY,
@@ -173,6 +304,19 @@ CREATE TABLE IF NOT EXISTS maintenance_request (
     completed_at TIMESTAMP WITH TIME ZONE
 );
 
+-- Фильтры и сортировка API (apps/core/api/filters.py)
+CREATE INDEX IF NOT EXISTS idx_company_status_created ON company(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_company_created_at ON company(created_at);
+CREATE INDEX IF NOT EXISTS lease_contract_company_id ON lease_contract(company_id);
+CREATE INDEX IF NOT EXISTS idx_contract_status_created ON lease_contract(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_contract_created_at ON lease_contract(created_at);
+CREATE INDEX IF NOT EXISTS idx_payment_status_due ON payment_schedule(status, due_date);
+CREATE INDEX IF NOT EXISTS idx_payment_due_date ON payment_schedule(due_date);
+CREATE INDEX IF NOT EXISTS maintenance_request_company_id ON maintenance_request(company_id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_status_created ON maintenance_request(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_maintenance_urgency ON maintenance_request(urgency, created_at);
+CREATE INDEX IF NOT EXISTS idx_maintenance_created_at ON maintenance_request(created_at);
+
 -- Сообщения чата по заявкам на лизинг
 CREATE TABLE IF NOT EXISTS chat_message (
     id BIGSERIAL PRIMARY KEY,
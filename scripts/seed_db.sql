@@ -30,9 +30,10 @@ INSERT INTO user_profile (account_id, first_name, last_name, phone, avatar_url,
 (6, 'Елена', 'Волкова', '+7 (916) 555-66-66', '', NULL, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
 (7, 'Дмитрий', 'Соколов', '+7 (916) 666-77-77', '', NULL, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
 
--- API токен для админа (64 hex символа)
-INSERT INTO account_token (key, account_id, created_at) VALUES
-('a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4e5f6a1b2', 1, CURRENT_TIMESTAMP);
+-- API токен для админа: ключ a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4e5f6a1b2
+-- (в БД хранятся только префикс и SHA-256 ключа)
+INSERT INTO account_token (key_prefix, key_hash, account_id, created_at) VALUES
+('a1b2c3d4', 'fa0cacfe1122ac62b0f70e4db95790326bae5a5c38924f315282cc4fd55b4986', 1, CURRENT_TIMESTAMP);
 
 -- Компании
 INSERT INTO company (name, inn, ogrn, address, phone, email, bank_details, status, account_id, created_at) VALUES
@@ -181,3 +182,53 @@ INSERT INTO audit_log (action, table_name, record_id, old_values, new_values, ch
 ('UPDATE', 'lease_contract', 1, NULL, '{"status": "active"}', '["status"]'::jsonb, 2, CURRENT_TIMESTAMP),
 ('UPDATE', 'payment_schedule', 1, NULL, '{"status": "paid"}', '["status"]'::jsonb, 3, CURRENT_TIMESTAMP),
 ('UPDATE', 'maintenance_request', 1, NULL, '{"status": "completed"}', '["status"]'::jsonb, 2, CURRENT_TIMESTAMP);
+
+-- Каталог (read model): строки доступной техники, как после manage.py rebuild_catalog
+INSERT INTO catalog_entry (equipment_id, name, model, category_id, category_name, manufacturer_id, manufacturer_name, specifications, condition, price, monthly_lease_rate, year, image_url, search_vector, updated_at)
+SELECT e.id, e.name, e.model, e.category_id, c.name, e.manufacturer_id, COALESCE(m.name, ''), COALESCE(e.specifications, ''), e.condition, e.price, e.monthly_lease_rate, e.year,
+    LEFT(CASE jsonb_typeof(e.images_urls)
+        WHEN 'array' THEN COALESCE(e.images_urls->>0, '')
+        WHEN 'string' THEN e.images_urls #>> '{}'
+        ELSE ''
+    END, 500),
+    e.search_vector, e.updated_at
+FROM equipment e
+JOIN equipment_category c ON c.id = e.category_id
+LEFT JOIN manufacturer m ON m.id = e.manufacturer_id
+WHERE e.status = 'available'
+ON CONFLICT (equipment_id) DO NOTHING;
+
+-- Дерево категорий (таблица замыкания), как после manage.py rebuild_catalog
+INSERT INTO equipment_category_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM equipment_category
+    UNION ALL
+    SELECT c.parent_id, t.descendant_id, t.depth + 1
+    FROM tree t
+    JOIN equipment_category c ON c.id = t.ancestor_id
+    WHERE c.parent_id IS NOT NULL
+)
+SELECT ancestor_id, descendant_id, depth FROM tree
+ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+
+-- Характеристики техники (шаблоны — как SPEC_PATTERNS в apps/catalog/specs.py)
+INSERT INTO equipment_spec (equipment_id, attribute, value)
+SELECT e.id, p.attribute, replace((regexp_match(lower(e.specifications), p.pattern))[1], ',', '.')::numeric
+FROM equipment e
+CROSS JOIN (VALUES
+    ('power_hp', 'мощность\s+(\d+(?:[.,]\d+)?)\s*л\.\s*с'),
+    ('throughput_tph', 'производительность\s+(\d+(?:[.,]\d+)?)\s*т/ч'),
+    ('tank_l', 'бак\s+(\d+(?:[.,]\d+)?)\s*л'),
+    ('working_width_m', 'ширина\s+захвата\s+(\d+(?:[.,]\d+)?)\s*м'),
+    ('cut_length_mm', 'длина\s+резки\s+(\d+(?:[.,]\d+)?)\s*мм'),
+    ('hoppers', '(\d+)\s+бункер'),
+    ('plough_bodies', '(\d+)\s+корпус')
+) AS p(attribute, pattern)
+WHERE lower(e.specifications) ~ p.pattern
+ON CONFLICT (equipment_id, attribute) DO NOTHING;
+
+-- Начало истории цен: текущие цена и платёж техники без истории
+INSERT INTO equipment_price_history (equipment_id, effective_at, price, monthly_lease_rate)
+SELECT e.id, e.updated_at, e.price, e.monthly_lease_rate
+FROM equipment e
+WHERE NOT EXISTS (SELECT 1 FROM equipment_price_history h WHERE h.equipment_id = e.id);
@@ -0,0 +1,222 @@
+"""
+Интеграционные тесты: аккаунты LeaseGrow (текущий аккаунт, кэш, сессии, права).
+Запуск: из папки LeaseGrow выполнить
+  python manage.py test tests.test_accounts
+"""
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password, check_password, MD5PasswordHasher
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from apps.accounts.cache import get_cached_account, clear_account_cache
+from apps.accounts.models import Account, Role, UserProfile
+from apps.accounts.passwords import averify_password
+from apps.accounts import permissions
+from apps.accounts.permissions import has_perm
+from apps.accounts.snapshot import read_account_snapshot
+
+
+def _create_account(role_name='client', username='testclient', password='testpass123'):
+    """Создаёт роль и аккаунт с профилем."""
+    role, _ = Role.objects.get_or_create(name=role_name)
+    account = Account.objects.create(
+        email=f'{username}@test.ru',
+        username=username,
+        password_hash=make_password(password),
+        role=role,
+    )
+    UserProfile.objects.create(account=account, first_name='Тест', last_name='Клиент')
+    return account
+
+
+class CurrentAccountCacheTest(TestCase):
+    """Интеграционный тест: текущий аккаунт определяется один раз и кэшируется."""
+
+    def setUp(self):
+        clear_account_cache()
+        self.account = _create_account()
+
+    def test_account_cache_hit_without_queries(self):
+        """Повторное получение аккаунта из кэша не обращается к БД."""
+        with self.assertNumQueries(1):
+            get_cached_account(self.account.id)
+        with self.assertNumQueries(0):
+            account = get_cached_account(self.account.id)
+        self.assertEqual(account.role.name, 'client')
+
+    def test_account_cache_invalidated_on_save(self):
+        """Изменение аккаунта или роли сбрасывает кэш."""
+        get_cached_account(self.account.id)
+        self.account.is_active = False
+        self.account.save()
+        self.assertIsNone(get_cached_account(self.account.id))
+
+        self.account.is_active = True
+        self.account.save()
+        get_cached_account(self.account.id)
+        self.account.role.name = 'manager'
+        self.account.role.save()
+        self.assertEqual(get_cached_account(self.account.id).role.name, 'manager')
+
+    def test_middleware_sets_current_account(self):
+        """Middleware кладёт аккаунт в request.current_account."""
+        client = Client()
+        session = client.session
+        session['account_id'] = self.account.id
+        session.save()
+        response = client.get(reverse('accounts:profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.current_account.id, self.account.id)
+
+
+class AccountSnapshotSessionTest(TestCase):
+    """Интеграционный тест: снимок аккаунта в сессии."""
+
+    def setUp(self):
+        clear_account_cache()
+        self.account = _create_account()
+        self.client = Client()
+        self.client.post(reverse('accounts:login'), {
+            'username': self.account.username,
+            'password': 'testpass123',
+        })
+
+    def test_login_stores_snapshot(self):
+        """Вход сохраняет в сессию снимок аккаунта с ролью."""
+        snapshot = read_account_snapshot(self.client.session)
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(snapshot.id, self.account.id)
+        self.assertEqual(snapshot.role, 'client')
+
+    def test_password_change_ends_other_sessions(self):
+        """Смена пароля вне текущей сессии завершает её."""
+        self.account.password_hash = make_password('another-pass-456')
+        self.account.save()
+        response = self.client.get(reverse('accounts:profile'))
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('account_id', self.client.session)
+
+    def test_password_change_bypassing_signals_ends_session(self):
+        """Смена пароля в обход сигналов или после вытеснения счётчиков из кэша тоже завершает сессию."""
+        Account.objects.filter(pk=self.account.pk).update(password_hash=make_password('another-pass-456'))
+        clear_account_cache()
+        response = self.client.get(reverse('accounts:profile'))
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('account_id', self.client.session)
+
+        self.client.post(reverse('accounts:login'), {'username': self.account.username, 'password': 'another-pass-456'})
+        generations = read_account_snapshot(self.client.session)[-2:]
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('accounts:profile')).status_code, 200)
+        self.assertNotEqual(read_account_snapshot(self.client.session)[-2:], generations)
+
+
+class RolePermissionsTest(TestCase):
+    """Функциональный тест: права ролей (apps.accounts.permissions)."""
+
+    def test_role_defaults_and_json_permissions(self):
+        """Базовые права по имени роли дополняются правами из Role.permissions."""
+        manager = get_cached_account(_create_account('manager', username='manager').id)
+        client = get_cached_account(_create_account('client', username='client').id)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_perm(manager, 'chat.manage'))
+            self.assertFalse(has_perm(manager, 'audit.view'))
+            self.assertTrue(has_perm(client, 'contracts.sign'))
+            self.assertFalse(has_perm(client, 'control_panel.access'))
+            self.assertFalse(has_perm(None, 'contracts.sign'))
+
+        role = Role.objects.get(name='manager')
+        role.permissions = ['audit.view']
+        role.save()
+        manager = get_cached_account(manager.id)
+        self.assertTrue(has_perm(manager, 'audit.view'))
+
+    def test_role_change_from_other_process_applies(self):
+        """Роль, изменённая в обход сигналов этого процесса, пересобирается по данным из БД."""
+        manager = _create_account('manager', username='manager')
+        self.assertFalse(has_perm(manager, 'audit.view'))
+        Role.objects.filter(name='manager').update(permissions=['audit.view'])
+        manager = Account.objects.select_related('role').get(pk=manager.pk)
+        self.assertTrue(has_perm(manager, 'audit.view'))
+
+    def test_role_mask_memoised_on_instance(self):
+        """Маска прав запоминается на объекте роли и пересобирается при изменении прав."""
+        manager = get_cached_account(_create_account('manager', username='manager').id)
+        self.assertFalse(has_perm(manager, 'audit.view'))
+        with mock.patch.object(permissions, 'compile_role', wraps=permissions.compile_role) as compile_role:
+            for _ in range(3):
+                self.assertTrue(has_perm(manager, 'chat.manage'))
+            self.assertEqual(compile_role.call_count, 0)
+            manager.role.permissions.append('audit.view')
+            self.assertTrue(has_perm(manager, 'audit.view'))
+            self.assertEqual(compile_role.call_count, 1)
+
+    def test_unknown_permission_rejected(self):
+        """Неизвестный код права — ошибка, а не молчаливый отказ."""
+        with self.assertRaises(ValueError):
+            has_perm(None, 'contracts.sing')
+
+    def test_manager_denied_admin_statistics(self):
+        """Менеджер не получает доступ к статистике системы."""
+        account = _create_account('manager', username='manager')
+        client = Client()
+        session = client.session
+        session['account_id'] = account.id
+        session.save()
+        response = client.get(reverse('manager:admin_statistics'))
+        self.assertEqual(response.status_code, 302)
+        response = client.get(reverse('manager:statistics'))
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+])
+class PasswordHashingTest(TestCase):
+    """Интеграционный тест: хэширование паролей в пуле и пересчёт устаревших хэшей."""
+
+    def setUp(self):
+        clear_account_cache()
+        self.account = _create_account()
+
+    def test_login_upgrades_legacy_hash(self):
+        """Вход с хэшем по устаревшему алгоритму пересчитывает его по основному."""
+        self.account.password_hash = MD5PasswordHasher().encode('testpass123', 'legacysalt')
+        self.account.save()
+        response = Client().post(reverse('accounts:login'), {
+            'username': self.account.username,
+            'password': 'testpass123',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.account.refresh_from_db()
+        self.assertTrue(self.account.password_hash.startswith('pbkdf2_sha256$'))
+        self.assertTrue(check_password('testpass123', self.account.password_hash))
+
+    def test_wrong_password_keeps_hash(self):
+        """Неверный пароль не меняет хэш."""
+        old_hash = self.account.password_hash
+        self.assertFalse(async_to_sync(averify_password)(self.account, 'wrong-pass'))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.password_hash, old_hash)
+
+    def test_register_creates_account(self):
+        """Асинхронная регистрация создаёт аккаунт клиента и входит в него."""
+        client = Client()
+        response = client.post(reverse('accounts:register'), {
+            'username': 'newclient',
+            'email': 'newclient@test.ru',
+            'first_name': 'Новый',
+            'last_name': 'Клиент',
+            'password1': 'Strong-pass-789',
+            'password2': 'Strong-pass-789',
+            'privacy_agree': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+        account = Account.objects.get(username='newclient')
+        self.assertEqual(account.role.name, 'client')
+        self.assertTrue(check_password('Strong-pass-789', account.password_hash))
+        self.assertEqual(client.session['account_id'], account.id)
@@ -3,16 +3,32 @@
 Запуск: из папки LeaseGrow выполнить
   python manage.py test tests.test_api
 """
+import json
+import time
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from unittest import mock
 from django.contrib.auth.hashers import make_password
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from apps.accounts.models import Account, Role, UserProfile, AccountToken
-from apps.catalog.models import EquipmentCategory, Manufacturer, Equipment
-from apps.leasing.models import Company
+from apps.accounts.cache import get_cached_token, clear_account_cache
+from apps.accounts.models import Account, Role, UserProfile, AccountToken, hash_token_key
+from apps.catalog import similar
+from apps.catalog.models import (
+    CatalogEntry, EquipmentCategory, EquipmentNeighbor, Manufacturer, Equipment, EquipmentPrice,
+)
+from apps.control_panel.forms import AccountTokenForm
+from apps.core.models import AuditLog
+from apps.core.api.filters import indexed_fields
+from apps.leasing.models import Company, LeaseContract, MaintenanceRequest, PaymentSchedule
+from config.api_urls import router
 
 
 def _login_as_admin(client):
@@ -35,11 +51,17 @@ def _login_as_admin(client):
     return account
 
 
+def _results(response):
+    """Записи списка: с пагинацией ({'results': [...]}) и без неё."""
+    data = response.json()
+    return data['results'] if isinstance(data, dict) and 'results' in data else data
+
+
 def _create_api_token(account):
-    """Создаёт токен API для аккаунта."""
-    return AccountToken.objects.create(
+    """Создаёт токен API для аккаунта (ключ доступен в token.key)."""
+    return AccountToken.objects.create_token(
+        account,
         key='test-token-12345678901234567890123456789012',
-        account=account,
     )
 
 
@@ -99,6 +121,192 @@ class EquipmentAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.json()['model'], '8R')
 
+    def test_equipment_spec_filters(self):
+        """API техники: характеристики разбираются из текста и фильтруются."""
+        equipment = Equipment.objects.get(vin='TEST123')
+        equipment.specifications = 'Мощность 370 л.с., дизель'
+        equipment.save()
+        url_list = reverse('equipment-list')
+        results = _results(self.client.get(url_list, {'spec_power_hp_min': '300'}))
+        self.assertEqual([e['spec_attributes'] for e in results], [{'power_hp': 370.0}])
+        self.assertEqual(_results(self.client.get(url_list, {'spec_power_hp_max': '300'})), [])
+
+    def test_equipment_range_filters(self):
+        """API техники: фильтры по статусу и диапазонам цены, платежа и года."""
+        url_list = reverse('equipment-list')
+        response = self.client.get(url_list, {'status': 'available', 'price_min': '5000000', 'rate_max': '150000'})
+        self.assertEqual([e['vin'] for e in _results(response)], ['TEST123'])
+        response = self.client.get(url_list, {'price_max': '1 000 000'})
+        self.assertEqual(_results(response), [])
+        response = self.client.get(url_list, {'year_min': 'abc'})
+        self.assertEqual(len(_results(response)), 1)
+
+    def test_category_cycle_rejected(self):
+        """API категорий: перенос категории в свою подкатегорию — 400, дерево не меняется."""
+        child = EquipmentCategory.objects.create(name='Колёсные', parent=self.category)
+        url = reverse('equipmentcategory-detail', kwargs={'pk': self.category.pk})
+        for parent in (child, self.category):
+            response = self.client.patch(url, {'parent': parent.pk}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('parent', response.json())
+        self.category.refresh_from_db()
+        self.assertIsNone(self.category.parent_id)
+        url = reverse('equipmentcategory-detail', kwargs={'pk': child.pk})
+        response = self.client.patch(url, {'parent': None}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_equipment_sparse_fields_and_cursor(self):
+        """API техники: страницы по курсору и ?fields= — только нужные поля и колонки."""
+        equipment = Equipment.objects.get(vin='TEST123')
+        equipment.specifications = 'Мощность 370 л.с.'
+        equipment.save()
+        Equipment.objects.create(
+            name='Second Tractor', model='9R', category=self.category, price=Decimal('5000000'),
+        )
+        url_list = reverse('equipment-list')
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(url_list, {'fields': 'id,name,price', 'page_size': '1'}).json()
+        self.assertEqual(
+            data['results'],
+            [{'id': data['results'][0]['id'], 'name': 'Second Tractor', 'price': '5000000.00'}],
+        )
+        sql = [
+            q['sql'] for q in queries.captured_queries
+            if 'FROM "equipment"' in q['sql'] and 'MAX(' not in q['sql']
+        ]
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('specifications', sql[0])
+        self.assertNotIn('JOIN', sql[0])
+
+        data = self.client.get(data['next']).json()
+        self.assertEqual([e['name'] for e in data['results']], ['Test Tractor'])
+        self.assertIsNone(data['next'])
+        results = _results(self.client.get(url_list, {'fields': 'vin,spec_attributes,unknown'}))
+        self.assertEqual(results, [
+            {'vin': None, 'spec_attributes': {}},
+            {'vin': 'TEST123', 'spec_attributes': {'power_hp': 370.0}},
+        ])
+
+    def test_equipment_conditional_get(self):
+        """API техники: ETag и Last-Modified, 304 без выборки строк."""
+        url_list = reverse('equipment-list')
+        response = self.client.get(url_list)
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url_list, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        equipment_sql = [q['sql'] for q in queries.captured_queries if 'FROM "equipment"' in q['sql']]
+        self.assertEqual(len(equipment_sql), 1)
+        self.assertIn('MAX(', equipment_sql[0])
+        # Другие параметры — другой ответ и другой ETag
+        self.assertEqual(self.client.get(url_list, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        # Список — только ETag: If-Modified-Since не даёт 304 после удаления или смены фильтра
+        self.assertNotIn('Last-Modified', self.client.get(url_list))
+        since = http_date(time.time() + 60)
+        self.assertEqual(self.client.get(url_list, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+        equipment = Equipment.objects.get(vin='TEST123')
+        url_detail = reverse('equipment-detail', kwargs={'pk': equipment.pk})
+        response = self.client.get(url_detail)
+        last_modified = response['Last-Modified']
+        response = self.client.get(url_detail, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Equipment.objects.filter(pk=equipment.pk).update(updated_at=equipment.updated_at + timedelta(seconds=5))
+        self.assertEqual(self.client.get(url_detail, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+        self.assertEqual(self.client.get(url_list, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        equipment.delete()
+        self.assertEqual(self.client.get(url_detail).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_equipment_bulk_endpoints(self):
+        """API техники: пакетные создание, изменение и удаление одной транзакцией."""
+        url = reverse('equipment-bulk')
+        rows = [
+            {'name': f'Seeder {i}', 'model': 'S', 'category': self.category.pk, 'price': '100000', 'vin': f'BULK{i}'}
+            for i in range(3)
+        ]
+        invalid = {'name': 'No price', 'model': 'X', 'category': self.category.pk}
+        response = self.client.post(url, rows + [invalid], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['valid', 'valid', 'valid', 'error'])
+        self.assertIn('price', response.json()['results'][3]['errors'])
+        self.assertFalse(Equipment.objects.filter(vin__startswith='BULK').exists())
+
+        # Соседи — инкрементально для созданных id после фиксации, без полного пересчёта
+        with mock.patch.object(similar, 'rebuild_equipment_neighbors') as rebuild, \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        rebuild.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        ids = [r['id'] for r in response.json()['results']]
+        self.assertEqual(
+            EquipmentNeighbor.objects.filter(equipment_id__in=ids).values('equipment').distinct().count(), 3,
+        )
+        self.assertEqual(
+            sorted(ids), sorted(Equipment.objects.filter(vin__startswith='BULK').values_list('id', flat=True)),
+        )
+        # Производные данные обновлены без сигналов post_save
+        self.assertEqual(CatalogEntry.objects.filter(equipment_id__in=ids).count(), 3)
+        self.assertEqual(EquipmentPrice.objects.filter(equipment_id__in=ids).count(), 3)
+
+        changes = [{'id': ids[0], 'price': '90000'}, {'id': ids[1], 'status': 'maintenance'}]
+        with mock.patch.object(similar, 'rebuild_equipment_neighbors') as rebuild, \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.patch(url, changes, format='json')
+        rebuild.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Equipment.objects.get(pk=ids[0]).price, Decimal('90000'))
+        self.assertEqual(Equipment.objects.get(pk=ids[1]).price, Decimal('100000'))
+        self.assertFalse(CatalogEntry.objects.filter(equipment_id=ids[1]).exists())
+        self.assertEqual(EquipmentPrice.objects.filter(equipment_id=ids[0]).count(), 2)
+        response = self.client.patch(url, [{'id': ids[0], 'vin': 'BULK1'}, {'id': 0, 'price': '1'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([list(r['errors']) for r in response.json()['results']], [['vin'], ['id']])
+
+        # Соседи пересчитываются один раз на пачку, а не на каждую удалённую строку
+        with mock.patch('apps.catalog.similar.load_feature_index', wraps=similar.load_feature_index) as load:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.client.delete(url, [ids[1], ids[2], 0], format='json')
+        self.assertEqual((len(callbacks), load.call_count), (1, 1))
+        self.assertEqual([r['status'] for r in response.json()['results']], ['deleted', 'deleted', 'not_found'])
+        self.assertFalse(Equipment.objects.filter(pk__in=ids[1:]).exists())
+        self.assertFalse(EquipmentNeighbor.objects.filter(neighbor_id__in=ids[1:]).exists())
+        self.assertTrue(EquipmentNeighbor.objects.filter(equipment_id=ids[0]).exists())
+
+    def test_equipment_price_history(self):
+        """API техники: история цены пишется при изменении и отдаётся прореженной."""
+        equipment = Equipment.objects.get(vin='TEST123')
+        self.assertEqual(equipment.price_history.count(), 1)
+        equipment.location = 'Краснодар'
+        equipment.save()
+        self.assertEqual(equipment.price_history.count(), 1)
+        equipment.price = Decimal('9000000')
+        equipment.save()
+        self.assertEqual(
+            list(equipment.price_history.order_by('id').values_list('price', flat=True)),
+            [Decimal('10000000'), Decimal('9000000')],
+        )
+
+        equipment.price_history.all().delete()
+        day = timezone.make_aware(datetime(2026, 1, 1))
+        EquipmentPrice.objects.bulk_create(
+            EquipmentPrice(equipment=equipment, effective_at=day + timedelta(days=i), price=100 + i)
+            for i in range(10)
+        )
+        url = reverse('equipment-price-history', kwargs={'pk': equipment.pk})
+        response = self.client.get(url, {'from': '2026-01-01', 'to': '2026-01-10', 'points': '5'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = response.json()['points']
+        self.assertEqual([p['price'] for p in points], ['101.00', '103.00', '105.00', '107.00', '109.00'])
+        self.assertEqual((points[0]['price_min'], points[0]['price_max']), ('100.00', '101.00'))
+        # Цена, действовавшая до начала периода, входит в первую точку
+        points = self.client.get(url, {'from': '2026-01-05T12:00:00', 'to': '2026-01-10'}).json()['points']
+        self.assertEqual([p['price'] for p in points], ['104.00', '105.00', '106.00', '107.00', '108.00', '109.00'])
+        self.assertEqual(self.client.get(reverse('equipment-price-history', kwargs={'pk': 0})).status_code, 404)
+
 
 class CompaniesAPITest(TestCase):
     """Интеграционный тест: API компаний (список)."""
@@ -126,6 +334,16 @@ class CompaniesAPITest(TestCase):
         self.assertGreaterEqual(len(results), 1)
         self.assertEqual(results[0]['name'], 'Тестовая компания')
 
+    def test_companies_bulk_conflict(self):
+        """API компаний: конфликт внутри пачки — ничего не записано, 409."""
+        url = reverse('company-bulk')
+        rows = [{'name': 'Агро', 'inn': '7700000001'}, {'name': 'Агро-2', 'inn': '7700000001'}]
+        response = self.client.post(url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Company.objects.filter(inn='7700000001').exists())
+        response = self.client.post(url, rows[:1], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
 
 class ApiAuthTest(TestCase):
     """Интеграционный тест: API аутентификация по токену."""
@@ -155,3 +373,139 @@ class ApiAuthTest(TestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
         response = self.client.get(reverse('equipment-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_token_stored_hashed(self):
+        """В БД хранится только хэш и префикс ключа."""
+        token = _create_api_token(self.account)
+        stored = AccountToken.objects.get(pk=token.pk)
+        self.assertEqual(stored.key_hash, hash_token_key(token.key))
+        self.assertEqual(stored.key_prefix, token.key[:8])
+        self.assertFalse(AccountToken.objects.filter(key_prefix=token.key).exists())
+
+        # Панель управления создаёт токен тем же менеджером
+        form = AccountTokenForm({'account': self.account.pk})
+        self.assertTrue(form.is_valid())
+        token = form.save()
+        stored = AccountToken.objects.get(pk=token.pk)
+        self.assertEqual((stored.key_hash, stored.key_prefix), (hash_token_key(token.key), token.key[:8]))
+
+    def test_token_lookup_cached_and_invalidated(self):
+        """Проверка токена кэшируется и сбрасывается при удалении и деактивации."""
+        clear_account_cache()
+        token = _create_api_token(self.account)
+        key_hash = hash_token_key(token.key)
+        with self.assertNumQueries(1):
+            get_cached_token(key_hash)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_token(key_hash)[1], self.account.id)
+
+        # Токен передан другому аккаунту — запись кэша сброшена
+        other = Account.objects.create(email='other@test.ru', username='other', password_hash='x')
+        token.account = other
+        token.save()
+        self.assertEqual(get_cached_token(key_hash)[1], other.id)
+        token.account = self.account
+        token.save()
+
+        self.account.is_active = False
+        self.account.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.get(reverse('equipment-list'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        AccountToken.objects.get(pk=token.pk).delete()
+        self.assertIsNone(get_cached_token(key_hash))
+
+    def test_token_create_returns_key_once(self):
+        """Создание токена по логину и паролю возвращает ключ только один раз."""
+        response = self.client.post(reverse('accounttoken-list'), {
+            'username': 'admin',
+            'password': 'pass',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        key = response.json()['key']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        response = self.client.get(reverse('accounttoken-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('key', _results(response)[0])
+
+
+class ExportAPITest(TestCase):
+    """Интеграционный тест: потоковая выгрузка списков API (NDJSON, CSV)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(5):
+            AuditLog.objects.create(action='UPDATE', table_name='equipment', record_id=i, new_values={'price': i})
+
+    def test_audit_log_export_streams(self):
+        """Журнал аудита выгружается потоком целиком, с ?fields= и в CSV."""
+        url = reverse('auditlog-export', kwargs={'export_format': 'ndjson'})
+        response = self.client.get(url, {'fields': 'record_id,new_values'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows[0], {'record_id': 4, 'new_values': {'price': 4}})
+        self.assertEqual([row['record_id'] for row in rows], [4, 3, 2, 1, 0])
+
+        url = reverse('auditlog-export', kwargs={'export_format': 'csv'})
+        content = b''.join(self.client.get(url, {'fields': 'action,record_id'}).streaming_content).decode('utf-8')
+        self.assertEqual(content.splitlines()[:2], ['\ufeffaction;record_id', 'UPDATE;4'])
+        self.assertEqual(len(content.splitlines()), 6)
+
+
+class LeasingFiltersAPITest(TestCase):
+    """Интеграционный тест: объявленные фильтры и сортировка списков API по индексам."""
+
+    def setUp(self):
+        self.client = APIClient()
+        category = EquipmentCategory.objects.create(name='Комбайны')
+        equipment = Equipment.objects.create(name='Combine', model='S7', category=category, price=Decimal('1000'))
+        self.companies = [Company.objects.create(name=f'Агро {i}', inn=f'77000000{i:02d}') for i in range(2)]
+        self.contracts = [
+            LeaseContract.objects.create(
+                contract_number=f'Д-{i}', company=company, equipment=equipment,
+                start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), lease_term_months=12,
+                total_amount=Decimal('1200'), monthly_payment=Decimal('100'),
+            )
+            for i, company in enumerate(self.companies)
+        ]
+        for month in range(1, 7):
+            PaymentSchedule.objects.create(
+                contract=self.contracts[0], payment_number=month, due_date=date(2026, month, 10),
+                amount=Decimal('100'), status='paid' if month <= 2 else 'pending',
+            )
+        for urgency in ('low', 'high', 'critical'):
+            MaintenanceRequest.objects.create(
+                equipment=equipment, company=self.companies[1], description='ТО', urgency=urgency,
+            )
+
+    def test_leasing_filters_and_ordering(self):
+        """Графики платежей, договоры и заявки на ТО фильтруются и сортируются по объявленным полям."""
+        url = reverse('paymentschedule-list')
+        params = {
+            'status': 'pending', 'due_date_from': '2026-03-01', 'due_date_to': '2026-05-10', 'ordering': '-due_date',
+        }
+        results = _results(self.client.get(url, params))
+        self.assertEqual([r['payment_number'] for r in results], [5, 4, 3])
+        results = _results(self.client.get(url, {'contract': self.contracts[0].pk, 'ordering': 'due_date'}))
+        self.assertEqual([r['payment_number'] for r in results], [1, 2, 3, 4, 5, 6])
+        # Неизвестное значение и сортировка по полю без индекса не применяются
+        self.assertEqual(len(_results(self.client.get(url, {'status': 'lost', 'ordering': 'amount'}))), 6)
+
+        results = _results(self.client.get(reverse('leasecontract-list'), {'company': self.companies[1].pk}))
+        self.assertEqual([r['contract_number'] for r in results], ['Д-1'])
+        results = _results(self.client.get(reverse('maintenancerequest-list'), {'urgency': 'high,critical'}))
+        self.assertEqual(sorted(r['urgency'] for r in results), ['critical', 'high'])
+        response = self.client.get(reverse('maintenancerequest-list'), {'created_at_to': '2000-01-01'})
+        self.assertEqual(_results(response), [])
+
+    def test_filters_and_ordering_are_indexed(self):
+        """Каждый объявленный фильтр и поле сортировки — первая колонка индекса."""
+        for prefix, viewset, _ in router.registry:
+            model = viewset.queryset.model
+            fields = [f.field for f in getattr(viewset, 'filter_fields', {}).values()]
+            fields += list(getattr(viewset, 'ordering_fields', ()))
+            for field in fields:
+                self.assertIn(field, indexed_fields(model), f'{prefix}: {field}')
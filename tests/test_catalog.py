@@ -0,0 +1,622 @@
+"""
+Функциональные тесты: каталог техники LeaseGrow (поиск, автодополнение, фасеты,
+диапазоны, характеристики, похожая техника, статический снимок, загрузка
+прайс-листов, read model, дерево категорий).
+Запуск: из папки LeaseGrow выполнить
+  python manage.py test tests.test_catalog
+"""
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.core.exceptions import ValidationError
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import Account, Role
+from apps.catalog.importer import import_equipment
+from apps.catalog.models import (
+    CatalogEntry, CategoryClosure, EquipmentCategory, EquipmentNeighbor, EquipmentSpec, Manufacturer, Equipment,
+)
+from apps.catalog.facets import aget_facet_rows, build_facets
+from apps.catalog.ranges import aget_histograms
+from apps.core.models import AuditLog
+from apps.core.pagination import KeysetPaginator
+from apps.catalog.search import search_equipment, suggest_equipment
+from apps.catalog import similar
+from apps.catalog.similar import NEIGHBORS_COUNT, rebuild_equipment_neighbors
+from apps.catalog.snapshot import export_catalog_snapshot, read_manifest
+from apps.catalog.specs import parse_specifications
+from apps.catalog.tree import subtree_equipment_counts, subtree_q
+
+
+class EquipmentSearchTest(TestCase):
+    """Функциональный тест: поиск техники в каталоге."""
+
+    def setUp(self):
+        self.category = EquipmentCategory.objects.create(name='Тракторы')
+        self.manufacturer = Manufacturer.objects.create(name='John Deere')
+        self.tractor = Equipment.objects.create(
+            name='Трактор', model='8R', category=self.category,
+            manufacturer=self.manufacturer, price=Decimal('10000000'), vin='VIN-S1',
+        )
+        self.combine = Equipment.objects.create(
+            name='Комбайн', model='S790', category=EquipmentCategory.objects.create(name='Комбайны'),
+            specifications='Прицепное устройство для трактора', price=Decimal('20000000'), vin='VIN-S2',
+        )
+
+    def test_search_by_manufacturer_and_specifications(self):
+        """Поиск учитывает производителя и характеристики."""
+        self.assertEqual(list(search_equipment(Equipment.objects.all(), 'Deere')), [self.tractor])
+        self.assertIn(self.combine, search_equipment(Equipment.objects.all(), 'Прицепное'))
+
+    def test_leasing_page_sorts_by_relevance(self):
+        """При поиске каталог по умолчанию сортируется по релевантности."""
+        response = self.client.get(reverse('core:leasing'), {'q': 'Deere'})
+        self.assertEqual(response.context['sort'], 'relevance')
+        self.assertEqual([e.equipment_id for e in response.context['equipment_list']], [self.tractor.id])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Полнотекстовый поиск — только PostgreSQL')
+    def test_fulltext_ranking_postgres(self):
+        """PostgreSQL: словоформы находятся, совпадение в названии выше, чем в характеристиках."""
+        results = list(search_equipment(Equipment.objects.all(), 'трактора').order_by('-search_rank'))
+        self.assertEqual(results, [self.tractor, self.combine])
+
+        self.manufacturer.name = 'Claas'
+        self.manufacturer.save()
+        self.assertEqual(list(search_equipment(Equipment.objects.all(), 'Claas')), [self.tractor])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Ранжирование поиска — только PostgreSQL')
+    def test_keyset_pages_across_equal_ranks_postgres(self):
+        """PostgreSQL: курсор по search_rank обходит все строки с равным рангом без пропусков."""
+        for i in range(5):
+            Equipment.objects.create(
+                name='Трактор', model='8R', category=self.category,
+                manufacturer=self.manufacturer, price=Decimal('10000000'), vin=f'VIN-R{i}',
+            )
+        qs = search_equipment(Equipment.objects.all(), 'трактор 8R').order_by('-search_rank')
+        paginator = KeysetPaginator(qs, 2)
+        seen, cursor = [], None
+        while True:
+            page = paginator.get_page(cursor)
+            seen.extend(e.pk for e in page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sorted(seen), sorted(qs.values_list('pk', flat=True)))
+        self.assertEqual(len(seen), 6)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Триграммный поиск — только PostgreSQL')
+    def test_trigram_search_tolerates_typos_postgres(self):
+        """PostgreSQL: поиск и подсказки находят технику при опечатке в производителе."""
+        self.assertIn(self.tractor, search_equipment(Equipment.objects.all(), 'Jon Dere'))
+        self.assertEqual(suggest_equipment('Deer')[0]['equipment_id'], self.tractor.id)
+
+    def test_suggest_endpoint(self):
+        """Автодополнение возвращает подсказки со ссылкой на карточку; короткий запрос — пусто."""
+        response = self.client.get(reverse('core:leasing_suggest'), {'q': 'Трак'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['id'] for r in results], [self.tractor.id])
+        self.assertEqual(results[0]['url'], reverse('core:leasing_detail', args=[self.tractor.id]))
+        self.assertIn('John Deere', results[0]['label'])
+        response = self.client.get(reverse('core:leasing_suggest'), {'q': 'Т'})
+        self.assertEqual(response.json()['results'], [])
+
+
+class CatalogFacetsTest(TestCase):
+    """Функциональный тест: счётчики фильтров каталога."""
+
+    def setUp(self):
+        self.tractors = EquipmentCategory.objects.create(name='Тракторы')
+        self.combines = EquipmentCategory.objects.create(name='Комбайны')
+        deere = Manufacturer.objects.create(name='John Deere')
+        Equipment.objects.create(
+            name='Трактор', model='8R', category=self.tractors, manufacturer=deere,
+            price=Decimal('12000000'), vin='VIN-F1',
+        )
+        Equipment.objects.create(
+            name='Мини-трактор', model='1025R', category=self.tractors, manufacturer=deere,
+            condition='used', price=Decimal('800000'), vin='VIN-F2',
+        )
+        Equipment.objects.create(
+            name='Комбайн', model='S790', category=self.combines,
+            price=Decimal('20000000'), vin='VIN-F3',
+        )
+
+    def test_facet_counts_exclude_own_filter(self):
+        """Счётчик фильтра учитывает остальные выбранные фильтры, но не свой."""
+        response = self.client.get(reverse('core:leasing'), {'category': self.tractors.id})
+        counts = {c['name']: c['count'] for c in response.context['categories']}
+        self.assertEqual(counts, {'Комбайны': 1, 'Тракторы': 2})
+        conditions = {c['id']: c['count'] for c in response.context['conditions']}
+        self.assertEqual(conditions, {'new': 1, 'used': 1})
+        self.assertContains(response, 'Тракторы (2)')
+
+        facets = build_facets(async_to_sync(aget_facet_rows)(), {'price': 'gte10m'})
+        self.assertEqual({c['name']: c['count'] for c in facets['category']}, {'Комбайны': 1, 'Тракторы': 1})
+        self.assertEqual({b['id']: b['count'] for b in facets['price']}, {'lt1m': 1, 'gte10m': 2})
+
+    def test_facets_follow_range_filters(self):
+        """Диапазоны цены, платежа и года сужают и список, и счётчики фильтров."""
+        params = {'price_min': '10000000', 'price_max': '15000000'}
+        response = self.client.get(reverse('core:leasing'), params)
+        self.assertEqual([e.model for e in response.context['equipment_list']], ['8R'])
+        counts = {c['name']: c['count'] for c in response.context['categories']}
+        self.assertEqual(counts, {'Тракторы': 1})
+        response = self.client.get(reverse('core:leasing'), {'price_max': '1000000'})
+        self.assertEqual({c['id']: c['count'] for c in response.context['conditions']}, {'used': 1})
+
+    def test_facets_cached_and_invalidated(self):
+        """Фасеты считаются одним запросом, кэшируются и пересчитываются после изменения техники."""
+        with self.assertNumQueries(1):
+            async_to_sync(aget_facet_rows)()
+        with self.assertNumQueries(0):
+            async_to_sync(aget_facet_rows)()
+        Equipment.objects.create(
+            name='Комбайн', model='T670', category=self.combines,
+            price=Decimal('18000000'), vin='VIN-F4',
+        )
+        with self.assertNumQueries(1):
+            rows = async_to_sync(aget_facet_rows)()
+        facets = build_facets(rows, {})
+        self.assertEqual({c['name']: c['count'] for c in facets['category']}, {'Комбайны': 2, 'Тракторы': 2})
+
+
+class CatalogReadModelTest(TestCase):
+    """Функциональный тест: таблица каталога catalog_entry следует за изменениями техники."""
+
+    def setUp(self):
+        self.category = EquipmentCategory.objects.create(name='Тракторы')
+        self.manufacturer = Manufacturer.objects.create(name='John Deere')
+        self.tractor = Equipment.objects.create(
+            name='Трактор', model='8R', category=self.category, manufacturer=self.manufacturer,
+            price=Decimal('10000000'), vin='VIN-R1', images_urls=['/static/8r.jpg', '/static/8r-2.jpg'],
+        )
+
+    def test_entry_follows_equipment_and_references(self):
+        """Переименование справочников обновляет строку; недоступная техника из каталога уходит."""
+        entry = CatalogEntry.objects.get(pk=self.tractor.pk)
+        self.assertEqual(
+            (entry.category_name, entry.manufacturer_name, entry.image_url),
+            ('Тракторы', 'John Deere', '/static/8r.jpg'),
+        )
+
+        self.category.name = 'Колёсные тракторы'
+        self.category.save()
+        self.manufacturer.name = 'Deere & Company'
+        self.manufacturer.save()
+        entry.refresh_from_db()
+        self.assertEqual((entry.category_name, entry.manufacturer_name), ('Колёсные тракторы', 'Deere & Company'))
+
+        self.manufacturer.delete()
+        entry.refresh_from_db()
+        self.assertEqual((entry.manufacturer_id, entry.manufacturer_name), (None, ''))
+
+        self.tractor.refresh_from_db()
+        self.tractor.status = 'leased'
+        self.tractor.save()
+        self.assertFalse(CatalogEntry.objects.filter(pk=self.tractor.pk).exists())
+        response = self.client.get(reverse('core:leasing'))
+        self.assertEqual(list(response.context['equipment_list']), [])
+
+    def test_rebuild_command(self):
+        """rebuild_catalog восстанавливает строки, записанные в обход сигналов."""
+        CatalogEntry.objects.all().delete()
+        call_command('rebuild_catalog', stdout=StringIO())
+        self.assertEqual(list(CatalogEntry.objects.values_list('pk', flat=True)), [self.tractor.pk])
+        response = self.client.get(reverse('core:leasing'))
+        self.assertContains(response, 'Тракторы · John Deere')
+
+
+class CategoryTreeTest(TestCase):
+    """Функциональный тест: дерево категорий (таблица замыкания)."""
+
+    def setUp(self):
+        self.tractors = EquipmentCategory.objects.create(name='Тракторы')
+        self.wheeled = EquipmentCategory.objects.create(name='Колёсные', parent=self.tractors)
+        self.tracked = EquipmentCategory.objects.create(name='Гусеничные', parent=self.tractors)
+        self.combines = EquipmentCategory.objects.create(name='Комбайны')
+        for vin, category in (('VIN-T1', self.wheeled), ('VIN-T2', self.wheeled),
+                              ('VIN-T3', self.tracked), ('VIN-T4', self.combines)):
+            Equipment.objects.create(
+                name='Техника', model=vin, category=category, price=Decimal('1000000'), vin=vin,
+            )
+
+    def _links(self):
+        return set(CategoryClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+
+    def test_subtree_filter_and_counts(self):
+        """Фильтр по категории включает подкатегории; счётчики — по всему поддереву."""
+        response = self.client.get(reverse('core:leasing'), {'category': self.tractors.id})
+        self.assertEqual(len(response.context['equipment_list']), 3)
+        categories = [(c['name'], c['level'], c['count']) for c in response.context['categories']]
+        self.assertEqual(categories, [
+            ('Комбайны', 0, 1), ('Тракторы', 0, 3), ('Гусеничные', 1, 1), ('Колёсные', 1, 2),
+        ])
+        counts = {c.name: c.equipment_count for c in subtree_equipment_counts()}
+        self.assertEqual(counts['Тракторы'], 3)
+        self.assertEqual(counts['Колёсные'], 2)
+
+    def test_closure_follows_moves_and_deletes(self):
+        """Перенос ветки и удаление категории обновляют таблицу замыкания."""
+        self.tractors.parent = self.combines
+        self.tractors.save()
+        self.assertIn((self.combines.id, self.wheeled.id, 2), self._links())
+        self.assertEqual(Equipment.objects.filter(subtree_q(self.combines.id)).count(), 4)
+
+        self.combines.parent = self.wheeled
+        with self.assertRaises(ValidationError):
+            self.combines.full_clean()
+
+        self.tractors.parent = None
+        self.tractors.save()
+        Equipment.objects.filter(category=self.tracked).delete()
+        self.tracked.delete()
+        expected = {
+            (self.tractors.id, self.tractors.id, 0), (self.wheeled.id, self.wheeled.id, 0),
+            (self.tractors.id, self.wheeled.id, 1), (self.combines.id, self.combines.id, 0),
+        }
+        self.assertEqual(self._links(), expected)
+        CategoryClosure.objects.all().delete()
+        call_command('rebuild_catalog', stdout=StringIO())
+        self.assertEqual(self._links(), expected)
+
+
+class CatalogRangeFiltersTest(TestCase):
+    """Функциональный тест: диапазоны цены, платежа и года и гистограммы к ним."""
+
+    def setUp(self):
+        category = EquipmentCategory.objects.create(name='Тракторы')
+        for index, (price, year) in enumerate(((800000, 2015), (5000000, 2020), (12000000, 2024))):
+            Equipment.objects.create(
+                name='Трактор', model=f'T{index}', category=category, price=Decimal(price),
+                monthly_lease_rate=Decimal(price) / 100, year=year, vin=f'VIN-RG{index}',
+            )
+
+    def test_range_filters(self):
+        """Границы включительно; перепутанные границы меняются местами."""
+        response = self.client.get(reverse('core:leasing'), {'price_min': '800000', 'year_max': '2020'})
+        self.assertEqual(sorted(e.model for e in response.context['equipment_list']), ['T0', 'T1'])
+        response = self.client.get(reverse('core:leasing'), {'rate_min': '100000', 'rate_max': '50000'})
+        self.assertEqual([e.model for e in response.context['equipment_list']], ['T1'])
+        self.assertContains(response, 'Сбросить фильтры')
+
+    def test_histograms_cached(self):
+        """Гистограммы: границы по каталогу, сумма по корзинам — вся техника; пересчёт раз на версию."""
+        histograms = async_to_sync(aget_histograms)()
+        self.assertEqual((histograms['year']['min'], histograms['year']['max']), (2015, 2024))
+        self.assertEqual(sum(b['count'] for b in histograms['price']['bins']), 3)
+        self.assertEqual(histograms['price']['bins'][-1]['count'], 1)
+        with self.assertNumQueries(0):
+            async_to_sync(aget_histograms)()
+
+
+class EquipmentSpecsTest(TestCase):
+    """Функциональный тест: структурированные характеристики техники."""
+
+    def setUp(self):
+        category = EquipmentCategory.objects.create(name='Техника')
+        self.tractor = Equipment.objects.create(
+            name='Трактор', model='8R', category=category, price=Decimal('1000000'),
+            specifications='Мощность 370 л.с., дизель', vin='VIN-SP1',
+        )
+        self.seeder = Equipment.objects.create(
+            name='Сеялка', model='1890', category=category, price=Decimal('1000000'),
+            specifications='Ширина захвата 9 м, 2 бункера', vin='VIN-SP2',
+        )
+
+    def test_parse_specifications(self):
+        """Из текста разбираются числовые атрибуты, десятичная запятая допускается."""
+        self.assertEqual(
+            parse_specifications('Производительность 12,5 т/ч, бак 9000 л'),
+            {'throughput_tph': Decimal('12.5'), 'tank_l': Decimal('9000')},
+        )
+        self.assertEqual(parse_specifications(''), {})
+
+    def test_specs_follow_text_and_filter_catalog(self):
+        """Изменение текста пересобирает атрибуты; каталог и счётчики фильтров учитывают диапазон атрибута."""
+        response = self.client.get(reverse('core:leasing'), {'spec_power_hp_min': '300'})
+        self.assertEqual([e.model for e in response.context['equipment_list']], ['8R'])
+        self.assertEqual([(c['name'], c['count']) for c in response.context['categories']], [('Техника', 1)])
+        response = self.client.get(reverse('core:leasing'), {'spec_working_width_m_min': '6', 'spec_hoppers_max': '2'})
+        self.assertEqual([e.model for e in response.context['equipment_list']], ['1890'])
+
+        self.tractor.specifications = 'Мощность 280 л.с.'
+        self.tractor.save()
+        self.assertEqual(
+            list(EquipmentSpec.objects.filter(equipment=self.tractor).values_list('attribute', 'value')),
+            [('power_hp', Decimal('280'))],
+        )
+        response = self.client.get(reverse('core:leasing'), {'spec_power_hp_min': '300'})
+        self.assertEqual(list(response.context['equipment_list']), [])
+        self.assertEqual(response.context['categories'], [])
+
+
+class SimilarEquipmentTest(TestCase):
+    """Функциональный тест: похожая техника (kNN по признакам)."""
+
+    def setUp(self):
+        tractors = EquipmentCategory.objects.create(name='Тракторы')
+        wheeled = EquipmentCategory.objects.create(name='Колёсные', parent=tractors)
+        combines = EquipmentCategory.objects.create(name='Комбайны')
+        deere = Manufacturer.objects.create(name='John Deere')
+        claas = Manufacturer.objects.create(name='Claas')
+        self.equipment = []
+        # Соседи пересчитываются после фиксации транзакции (transaction.on_commit)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                self.equipment.append(Equipment.objects.create(
+                    name='Трактор', model=f'T{i}', category=wheeled, manufacturer=deere,
+                    price=Decimal(1000000 * (i + 1)), year=2015 + i, vin=f'VIN-NB{i}',
+                ))
+            for i in range(5):
+                self.equipment.append(Equipment.objects.create(
+                    name='Комбайн', model=f'C{i}', category=combines, manufacturer=claas,
+                    price=Decimal(9000000 + 700000 * i), year=2018 + i, condition='used', vin=f'VIN-NC{i}',
+                ))
+
+    def _neighbors(self):
+        return sorted(EquipmentNeighbor.objects.values_list('equipment_id', 'neighbor_id', 'rank'))
+
+    def test_incremental_updates_match_rebuild(self):
+        """Обновления по сигналам дают те же списки, что и полный пересчёт."""
+        tractor, combine = self.equipment[0], self.equipment[5]
+        self.assertEqual(EquipmentNeighbor.objects.filter(equipment=tractor).count(), NEIGHBORS_COUNT)
+        # Сначала — вся техника своей категории
+        self.assertEqual(
+            set(
+                EquipmentNeighbor.objects.filter(equipment=tractor, rank__lte=4)
+                .values_list('neighbor__model', flat=True)
+            ),
+            {'T1', 'T2', 'T3', 'T4'},
+        )
+        incremental = self._neighbors()
+        rebuild_equipment_neighbors()
+        self.assertEqual(self._neighbors(), incremental)
+
+        load = mock.patch('apps.catalog.similar.load_feature_index', wraps=similar.load_feature_index).start()
+        self.addCleanup(mock.patch.stopall)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            combine.price = Decimal('1500000')
+            combine.save()
+            # Пересчёт не выполняется в самом сохранении
+            self.assertEqual(self._neighbors(), incremental)
+            self.equipment[2].status = 'sold'
+            self.equipment[2].save()
+            self.equipment[3].delete()
+        # Три пересчёта после фиксации — одна загрузка матрицы признаков (та же версия каталога)
+        self.assertEqual((len(callbacks), load.call_count), (3, 1))
+        incremental = self._neighbors()
+        self.assertFalse(EquipmentNeighbor.objects.filter(equipment=self.equipment[2]).exists())
+        rebuild_equipment_neighbors()
+        self.assertEqual(self._neighbors(), incremental)
+
+    def test_detail_shows_similar(self):
+        """Страница техники показывает похожую доступную технику в порядке близости."""
+        response = self.client.get(reverse('core:leasing_detail', args=[self.equipment[0].id]))
+        models = [entry.model for entry in response.context['similar_equipment']]
+        self.assertEqual(models[:2], ['T1', 'T2'])
+        self.assertEqual(len(models), NEIGHBORS_COUNT)
+        self.assertContains(response, 'Похожая доступная техника')
+
+
+class CatalogSnapshotTest(TestCase):
+    """Функциональный тест: статический снимок каталога (JSON-шарды и поисковый индекс)."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.directory = os.path.join(self.root.name, 'catalog-snapshot')
+        category = EquipmentCategory.objects.create(name='Тракторы')
+        manufacturer = Manufacturer.objects.create(name='John Deere')
+        self.equipment = [
+            Equipment.objects.create(
+                name='Трактор', model=f'8R-{i}', category=category, manufacturer=manufacturer,
+                price=Decimal('1000000'), specifications='Мощность 370 л.с.', vin=f'VIN-SN{i}',
+            )
+            for i in range(4)
+        ]
+
+    def _read(self, name):
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            content = f.read()
+        with open(os.path.join(self.directory, name + '.gz'), 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), content)
+        return json.loads(content)
+
+    def test_export_writes_shards_and_index_incrementally(self):
+        """Выгрузка пишет шарды и индекс; повторная — только шард с изменённой техникой."""
+        ids = [equipment.id for equipment in self.equipment]
+        shard_size = max(ids) - min(ids) + 1
+        manifest, written = export_catalog_snapshot(self.directory, shard_size=shard_size)
+        self.assertEqual(manifest['total'], 4)
+        self.assertEqual(written, len(manifest['shards']))
+        items = [item for shard in manifest['shards'] for item in self._read(shard['file'])['equipment']]
+        self.assertEqual(sorted(item['id'] for item in items), sorted(ids))
+        self.assertEqual(items[0]['specs'], {'power_hp': '370.000'})
+        tokens = self._read(manifest['search_index'])['tokens']
+        self.assertEqual(sorted(tokens['deere']), sorted(ids))
+        self.assertEqual(tokens['8r'], sorted(ids))
+        self.assertEqual(self._read(manifest['references'])['manufacturers'][0]['name'], 'John Deere')
+
+        self.assertEqual(export_catalog_snapshot(self.directory, shard_size=shard_size)[1], 0)
+
+        self.equipment[0].name = 'Погрузчик'
+        self.equipment[0].save()
+        updated, written = export_catalog_snapshot(self.directory, shard_size=shard_size)
+        self.assertEqual(written, 1)
+        self.assertNotEqual(updated['version'], manifest['version'])
+        self.assertEqual(
+            sum(old['file'] != new['file'] for old, new in zip(manifest['shards'], updated['shards'])), 1,
+        )
+        self.assertEqual(self._read(updated['search_index'])['tokens']['погрузчик'], [self.equipment[0].id])
+        self.assertEqual(read_manifest(self.directory)['version'], updated['version'])
+
+    def _get(self, name, **headers):
+        response = self.client.get(f'/catalog-snapshot/{name}', **headers)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, content
+
+    def test_snapshot_served_with_immutable_headers(self):
+        """Файлы снимка отдаются с .gz; файлы с хэшем в имени — с Cache-Control: immutable."""
+        manifest, _ = export_catalog_snapshot(self.directory)
+        with override_settings(CATALOG_SNAPSHOT_DIR=self.directory):
+            response, content = self._get(manifest['shards'][0]['file'], HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(json.loads(gzip.decompress(content))['shard'], manifest['shards'][0]['shard'])
+            response, _ = self._get('manifest.json')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('immutable', response['Cache-Control'])
+            response, _ = self._get('manifest.json', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(self._get('..%2Fsettings.json')[0].status_code, 404)
+
+    def test_reexport_served_by_running_app(self):
+        """После повторной выгрузки тот же работающий клиент получает новый manifest и шард, старый шард остаётся."""
+        ids = [equipment.id for equipment in self.equipment]
+        shard_size = max(ids) - min(ids) + 1
+        with override_settings(CATALOG_SNAPSHOT_DIR=self.directory):
+            manifest, _ = export_catalog_snapshot(shard_size=shard_size)
+            response, content = self._get('manifest.json')
+            self.assertEqual(json.loads(content)['version'], manifest['version'])
+
+            self.equipment[0].name = 'Погрузчик'
+            self.equipment[0].save()
+            updated, written = export_catalog_snapshot(shard_size=shard_size)
+            self.assertEqual(written, 1)
+            response, content = self._get('manifest.json')
+            self.assertEqual(int(response['Content-Length']), len(content))
+            self.assertEqual(json.loads(content)['version'], updated['version'])
+            new_files = {shard['file'] for shard in updated['shards']}
+            old_files = {shard['file'] for shard in manifest['shards']}
+            for name in new_files | old_files:
+                self.assertEqual(self._get(name)[0].status_code, 200, name)
+
+
+class EquipmentImportTest(TestCase):
+    """Функциональный тест: загрузка техники из прайс-листа (CSV/XLSX) с обновлением существующей."""
+
+    def setUp(self):
+        self.category = EquipmentCategory.objects.create(name='Тракторы')
+        Manufacturer.objects.create(name='John Deere')
+        self.existing = Equipment.objects.create(
+            name='Трактор', model='8R', category=self.category, price=Decimal('1000000'), vin='VIN-IM1',
+        )
+
+    def test_csv_upserts_and_reports_errors(self):
+        """CSV: обновление по VIN и по названию с моделью, ошибки строк, каталог и аудит."""
+        content = (
+            'Название;Модель;Категория;Производитель;VIN;Цена;Состояние;Характеристики\n'
+            'Трактор;8R;тракторы;John Deere;VIN-IM1;1 250 000,50;Б/У;Мощность 410 л.с.\n'
+            'Трактор;9R;Тракторы;John Deere;VIN-IM2;2000000;new;\n'
+            'Погрузчик;L1;Тракторы;;;500000;;\n'
+            'Комбайн;S790;Комбайны;;VIN-IM3;100;;\n'
+            'Трактор;6M;Тракторы;;VIN-IM4;дорого;;\n'
+        ).encode('utf-8')
+        summary = import_equipment(BytesIO(content), 'price.csv')
+        self.assertEqual((summary.rows, summary.created, summary.updated, summary.error_count), (5, 2, 1, 2))
+        self.assertEqual([error['row'] for error in summary.errors], [5, 6])
+
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.price, self.existing.condition), (Decimal('1250000.50'), 'used'))
+        self.assertEqual(self.existing.manufacturer.name, 'John Deere')
+        self.assertEqual(EquipmentSpec.objects.get(equipment=self.existing).value, Decimal('410'))
+        self.assertEqual(
+            sorted(CatalogEntry.objects.values_list('model', flat=True)), ['8R', '9R', 'L1'],
+        )
+        audit = AuditLog.objects.get(action='IMPORT')
+        self.assertEqual((audit.table_name, audit.new_values['created']), ('equipment', 2))
+
+        summary = import_equipment(BytesIO(content), 'price.csv')
+        self.assertEqual((summary.created, summary.updated), (0, 3))
+        self.assertEqual(Equipment.objects.count(), 3)
+
+    def test_reimport_keeps_columns_missing_from_file(self):
+        """Повторная загрузка прайса меняет только столбцы файла и не сбрасывает статус."""
+        Equipment.objects.filter(pk=self.existing.pk).update(
+            status='leased', location='Краснодар', specifications='Мощность 410 л.с.',
+            year=2020, monthly_lease_rate=Decimal('50000'),
+        )
+        content = 'name;model;category;price;vin\nТрактор;8R;Тракторы;1100000;VIN-IM1\n'.encode('utf-8')
+        summary = import_equipment(BytesIO(content), 'price.csv')
+        self.assertEqual((summary.created, summary.updated), (0, 1))
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.price, Decimal('1100000'))
+        self.assertEqual(
+            (self.existing.status, self.existing.location, self.existing.specifications, self.existing.year),
+            ('leased', 'Краснодар', 'Мощность 410 л.с.', 2020),
+        )
+        self.assertEqual(self.existing.monthly_lease_rate, Decimal('50000'))
+
+        # Пустая ячейка статуса не сбрасывает его; новой технике — умолчания
+        content = (
+            'name;model;category;price;status;condition\n'
+            'Сеялка;1890;Тракторы;300000;;\n'
+        ).encode('utf-8')
+        import_equipment(BytesIO(content), 'price.csv')
+        Equipment.objects.filter(model='1890').update(status='leased', condition='used')
+        import_equipment(BytesIO(content), 'price.csv')
+        self.assertEqual(
+            Equipment.objects.values_list('status', 'condition').get(model='1890'), ('leased', 'used'),
+        )
+        content = 'name;model;category;price\nКомбайн;T1;Тракторы;900000\n'.encode('utf-8')
+        import_equipment(BytesIO(content), 'price.csv')
+        self.assertEqual(
+            Equipment.objects.values_list('status', 'condition').get(model='T1'), ('available', 'new'),
+        )
+
+    def test_import_updates_similar_after_commit(self):
+        """Похожая техника пересчитывается после фиксации загрузки только для затронутых id."""
+        content = (
+            'name;model;category;price\n'
+            'Трактор;9R;Тракторы;1100000\n'
+            'Трактор;7R;Тракторы;900000\n'
+        ).encode('utf-8')
+        with mock.patch.object(similar, 'rebuild_equipment_neighbors') as rebuild, \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            import_equipment(BytesIO(content), 'price.csv')
+            self.assertFalse(EquipmentNeighbor.objects.filter(equipment__model='9R').exists())
+        rebuild.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            sorted(EquipmentNeighbor.objects.filter(equipment=self.existing).values_list('neighbor__model', flat=True)),
+            ['7R', '9R'],
+        )
+
+    def test_xlsx_upload_in_control_panel(self):
+        """XLSX загружается через панель управления менеджером."""
+        import openpyxl
+
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['name', 'model', 'category', 'price', 'year'])
+        sheet.append(['Сеялка', '1890', 'Тракторы', 3500000, 2021])
+        buffer = BytesIO()
+        workbook.save(buffer)
+
+        role = Role.objects.create(name='manager')
+        account = Account.objects.create(
+            email='manager@test.ru', username='manager', password_hash=make_password('pass'), role=role,
+        )
+        session = self.client.session
+        session['account_id'] = account.id
+        session.save()
+        upload = SimpleUploadedFile('price.xlsx', buffer.getvalue())
+        response = self.client.post(reverse('control_panel:equipment_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['summary'].created, 1)
+        self.assertEqual(Equipment.objects.get(model='1890').year, 2021)
+        self.assertEqual(AuditLog.objects.get(action='IMPORT').performed_by, account)
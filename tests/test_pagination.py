@@ -0,0 +1,80 @@
+"""
+Функциональные тесты: пагинация по ключу (apps.core.pagination).
+Запуск: из папки LeaseGrow выполнить
+  python manage.py test tests.test_pagination
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.catalog.models import EquipmentCategory, Equipment
+from apps.core.models import AuditLog
+from apps.core.pagination import KeysetPaginator
+
+
+class KeysetPaginatorTest(TestCase):
+    """Функциональный тест: проход по страницам курсорами вперёд и назад."""
+
+    def setUp(self):
+        category = EquipmentCategory.objects.create(name='Тракторы')
+        rates = [None, '100', '100', '200', None, '50', '100']
+        for i, rate in enumerate(rates):
+            Equipment.objects.create(
+                name=f'Трактор {i}', model='8R', category=category, price=Decimal('1000000'),
+                monthly_lease_rate=Decimal(rate) if rate else None, vin=f'VIN-P{i}',
+            )
+
+    def _walk(self, qs, per_page=2):
+        """Проходит все страницы вперёд, затем назад; возвращает оба порядка."""
+        paginator = KeysetPaginator(qs, per_page)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        forward = [obj.pk for page in pages for obj in page]
+        backward_pages = [pages[-1]]
+        while backward_pages[-1].has_previous():
+            backward_pages.append(paginator.get_page(backward_pages[-1].previous_cursor))
+        backward = [obj.pk for page in reversed(backward_pages) for obj in page]
+        return forward, backward
+
+    def test_nullable_column_with_ties(self):
+        """Повторы и NULL в колонке сортировки: все записи ровно по одному разу, NULL в конце."""
+        for ordering in ('monthly_lease_rate', '-monthly_lease_rate'):
+            qs = Equipment.objects.order_by(ordering)
+            desc = ordering.startswith('-')
+            items = sorted(
+                Equipment.objects.all(),
+                key=lambda e: (e.monthly_lease_rate is None,
+                               -(e.monthly_lease_rate or 0) if desc else (e.monthly_lease_rate or 0),
+                               -e.pk if desc else e.pk),
+            )
+            forward, backward = self._walk(qs)
+            self.assertEqual(forward, [e.pk for e in items], ordering)
+            self.assertEqual(backward, forward, ordering)
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Повреждённый курсор — первая страница."""
+        paginator = KeysetPaginator(Equipment.objects.order_by('pk'), 3)
+        self.assertEqual(list(paginator.get_page('not-a-cursor')), list(paginator.get_page()))
+
+    def test_catalog_and_audit_api_cursors(self):
+        """Каталог и API журнала аудита отдают курсоры следующей и предыдущей страницы."""
+        response = self.client.get(reverse('core:leasing'), {'sort': 'rate'})
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 7)
+        self.assertFalse(page.has_other_pages())
+
+        for i in range(25):
+            AuditLog.objects.create(action='INSERT', table_name='equipment', record_id=i)
+        client = APIClient()
+        data = client.get('/api/audit-logs/').json()
+        self.assertEqual(len(data['results']), 20)
+        self.assertIsNone(data['previous'])
+        data = client.get(data['next']).json()
+        self.assertEqual([r['record_id'] for r in data['results']], [4, 3, 2, 1, 0])
+        self.assertIsNone(data['next'])
+        data = client.get(data['previous']).json()
+        self.assertEqual(len(data['results']), 20)
+        self.assertEqual(data['results'][0]['record_id'], 24)
@@ -16,9 +16,54 @@ from django.test.runner import DiscoverRunner
     # test_api
     'test_api_root_ok': 'Корень API (/api/)',
     'test_equipment_list_and_detail': 'API техники: список и чтение по id',
+    'test_equipment_range_filters': 'API техники: фильтры по статусу и диапазонам',
+    'test_equipment_spec_filters': 'API техники: фильтры по характеристикам',
+    'test_equipment_price_history': 'API техники: история цены',
+    'test_equipment_bulk_endpoints': 'API техники: пакетные операции',
+    'test_equipment_conditional_get': 'API техники: ETag, Last-Modified карточки и 304',
+    'test_category_cycle_rejected': 'API: цикл в дереве категорий отклоняется (400)',
+    'test_equipment_sparse_fields_and_cursor': 'API техники: курсор и выборочные поля',
     'test_companies_list': 'API компаний: список',
+    'test_companies_bulk_conflict': 'API компаний: конфликт в пакетной записи',
     'test_invalid_token_rejected': 'API: неверный токен отклонён',
     'test_valid_token_accepted': 'API: верный токен принят',
+    'test_token_stored_hashed': 'API: токен хранится в виде хэша (и из панели управления)',
+    'test_token_lookup_cached_and_invalidated': 'API: кэш токенов и его сброс при изменении и удалении',
+    'test_token_create_returns_key_once': 'API: ключ токена возвращается один раз',
+    'test_audit_log_export_streams': 'API: потоковая выгрузка NDJSON и CSV',
+    'test_leasing_filters_and_ordering': 'API: фильтры и сортировка списков лизинга',
+    'test_filters_and_ordering_are_indexed': 'API: фильтры и сортировка только по индексам',
+    # test_catalog
+    'test_search_by_manufacturer_and_specifications': 'Поиск техники: производитель и характеристики',
+    'test_leasing_page_sorts_by_relevance': 'Каталог: сортировка по релевантности при поиске',
+    'test_fulltext_ranking_postgres': 'Полнотекстовый поиск PostgreSQL: словоформы и ранжирование',
+    'test_keyset_pages_across_equal_ranks_postgres': 'Поиск: курсор по рангу не теряет строки с равным рангом (PostgreSQL)',
+    'test_trigram_search_tolerates_typos_postgres': 'Триграммный поиск PostgreSQL: опечатки',
+    'test_suggest_endpoint': 'Автодополнение поиска каталога (JSON)',
+    'test_facet_counts_exclude_own_filter': 'Фасеты: счётчики с учётом других фильтров',
+    'test_facets_follow_range_filters': 'Фасеты: счётчики учитывают диапазоны цены, платежа и года',
+    'test_facets_cached_and_invalidated': 'Фасеты: один запрос, кэш и сброс',
+    'test_entry_follows_equipment_and_references': 'Таблица каталога: обновление по сигналам',
+    'test_rebuild_command': 'Таблица каталога: команда rebuild_catalog',
+    'test_subtree_filter_and_counts': 'Дерево категорий: фильтр и счётчики по поддереву',
+    'test_closure_follows_moves_and_deletes': 'Дерево категорий: перенос и удаление ветки',
+    'test_range_filters': 'Каталог: диапазоны цены, платежа и года',
+    'test_histograms_cached': 'Каталог: гистограммы диапазонов и их кэш',
+    'test_parse_specifications': 'Характеристики: разбор текста',
+    'test_specs_follow_text_and_filter_catalog': 'Характеристики: обновление, фильтр каталога и фасеты',
+    'test_incremental_updates_match_rebuild': 'Похожая техника: обновление по сигналам и полный пересчёт',
+    'test_detail_shows_similar': 'Похожая техника на странице техники',
+    'test_export_writes_shards_and_index_incrementally': 'Снимок каталога: шарды, индекс и инкрементальная выгрузка',
+    'test_snapshot_served_with_immutable_headers': 'Снимок каталога: раздача с .gz и immutable-заголовками',
+    'test_reexport_served_by_running_app': 'Снимок каталога: повторная выгрузка видна без перезапуска',
+    'test_csv_upserts_and_reports_errors': 'Загрузка прайс-листа CSV: обновление, ошибки, аудит',
+    'test_reimport_keeps_columns_missing_from_file': 'Загрузка: повторный импорт не затирает поля вне файла',
+    'test_import_updates_similar_after_commit': 'Загрузка: похожая техника пересчитывается после фиксации',
+    'test_xlsx_upload_in_control_panel': 'Загрузка прайс-листа XLSX в панели управления',
+    # test_pagination
+    'test_nullable_column_with_ties': 'Пагинация по ключу: повторы и NULL',
+    'test_invalid_cursor_returns_first_page': 'Пагинация по ключу: неверный курсор',
+    'test_catalog_and_audit_api_cursors': 'Пагинация по ключу: каталог и API аудита',
     # test_export
     'test_export_without_login_redirects': 'Экспорт без логина: редирект',
     'test_export_excel_as_manager': 'Экспорт Excel для менеджера',
@@ -31,12 +76,31 @@ from django.test.runner import DiscoverRunner
     'test_logout_clears_session': 'Выход очищает сессию',
     'test_leasing_page_ok': 'Страница лизинга доступна',
     'test_leasing_shows_equipment': 'Лизинг отображает технику',
+    'test_leasing_page_cursor': 'Каталог: листание курсорами',
+    'test_leasing_detail_shows_pending_request': 'Карточка техники: заявка пользователя и 404',
+    'test_cards_cached_until_equipment_or_references_change': 'Кэш карточек техники: версия и заявки вне кэша',
     'test_profile_redirects_if_not_logged_in': 'Профиль без логина: редирект',
     'test_profile_ok_when_logged_in': 'Профиль доступен после входа',
     'test_lease_request_requires_login': 'Заявка на лизинг требует логин',
     'test_lease_request_creates_record': 'Заявка на лизинг создаёт запись',
+    'test_request_context_cached_and_invalidated': 'Заявки пользователя в каталоге: кэш и сброс',
     'test_chat_requires_login': 'Чат без логина: редирект',
     'test_chat_accessible_by_request_owner': 'Чат доступен владельцу заявки',
+    # test_accounts
+    'test_account_cache_hit_without_queries': 'Кэш аккаунта: повторное чтение без запросов',
+    'test_account_cache_invalidated_on_save': 'Кэш аккаунта сбрасывается при изменении',
+    'test_middleware_sets_current_account': 'Middleware определяет текущий аккаунт',
+    'test_login_stores_snapshot': 'Вход сохраняет снимок аккаунта в сессии',
+    'test_password_change_ends_other_sessions': 'Смена пароля завершает другие сессии',
+    'test_password_change_bypassing_signals_ends_session': 'Смена пароля в обход сигналов завершает сессию',
+    'test_role_defaults_and_json_permissions': 'Права роли: базовые и из Role.permissions',
+    'test_role_change_from_other_process_applies': 'Права: изменение роли в другом процессе применяется',
+    'test_role_mask_memoised_on_instance': 'Права: маска запоминается на объекте роли',
+    'test_unknown_permission_rejected': 'Права: неизвестный код отклоняется',
+    'test_manager_denied_admin_statistics': 'Права: менеджеру закрыта статистика системы',
+    'test_login_upgrades_legacy_hash': 'Вход пересчитывает устаревший хэш пароля',
+    'test_wrong_password_keeps_hash': 'Неверный пароль не меняет хэш',
+    'test_register_creates_account': 'Асинхронная регистрация создаёт аккаунт',
 }
 
 
@@ -3,14 +3,19 @@
 Запуск: из папки LeaseGrow выполнить
   python manage.py test tests.test_views
 """
+import datetime
 from decimal import Decimal
+
+from asgiref.sync import async_to_sync
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 
 from apps.accounts.models import Account, Role, UserProfile
-from apps.catalog.models import EquipmentCategory, Manufacturer, Equipment
-from apps.leasing.models import Company, LeaseRequest
+from apps.catalog.models import CatalogEntry, EquipmentCategory, Manufacturer, Equipment
+from apps.leasing.cache import aget_account_requests
+from apps.leasing.models import Company, LeaseContract, LeaseRequest
 
 
 def _login_as_client(client):
@@ -115,6 +120,66 @@ class LeasingPageTest(TestCase):
         content = response.content.decode()
         self.assertIn('Test Tractor', content)
 
+    def test_leasing_page_cursor(self):
+        """Каталог листается курсорами: вперёд и обратно на первую страницу."""
+        for i in range(12):
+            Equipment.objects.create(
+                name=f'Tractor {i}', model='8R', category=self.category, price=Decimal('1000000'),
+                status='available', vin=f'VIN1{i:02d}',
+            )
+        first = self.client.get(reverse('core:leasing')).context['page_obj']
+        self.assertEqual(len(first), 12)
+        self.assertFalse(first.has_previous())
+        second = self.client.get(reverse('core:leasing'), {'cursor': first.next_cursor}).context['page_obj']
+        self.assertEqual(len(second), 1)
+        self.assertFalse(second.has_next())
+        back = self.client.get(reverse('core:leasing'), {'cursor': second.previous_cursor}).context['page_obj']
+        self.assertEqual(list(back), list(first))
+
+    def test_leasing_detail_shows_pending_request(self):
+        """Карточка техники учитывает заявку пользователя; несуществующая — 404."""
+        account = _login_as_client(self.client)
+        lease_request = LeaseRequest.objects.create(equipment=self.equipment, account=account)
+        response = self.client.get(reverse('core:leasing_detail', args=[self.equipment.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['pending_lease_requests'], {self.equipment.id: lease_request.id})
+        self.assertContains(response, 'Заявка отправлена')
+        response = self.client.get(reverse('core:leasing_detail', args=[self.equipment.id + 100]))
+        self.assertEqual(response.status_code, 404)
+
+
+class LeasingFragmentCacheTest(TestCase):
+    """Функциональный тест: кэш фрагментов карточек техники."""
+
+    def setUp(self):
+        self.client = Client()
+        self.manufacturer = Manufacturer.objects.create(name='John Deere')
+        self.equipment = Equipment.objects.create(
+            name='Трактор', model='8R', category=EquipmentCategory.objects.create(name='Тракторы'),
+            manufacturer=self.manufacturer, price=Decimal('1000000'), vin='VIN-FC1',
+        )
+
+    def test_cards_cached_until_equipment_or_references_change(self):
+        """Карточка берётся из кэша, пока не изменились техника или справочники; заявка — вне кэша."""
+        detail_url = reverse('core:leasing_detail', args=[self.equipment.id])
+        self.client.get(reverse('core:leasing'))
+        self.client.get(detail_url)
+        # Запись в обход сигналов: updated_at тот же, фрагменты не пересобираются
+        Equipment.objects.filter(pk=self.equipment.pk).update(specifications='Новое описание')
+        CatalogEntry.objects.filter(pk=self.equipment.pk).update(name='Переименован')
+        self.assertContains(self.client.get(reverse('core:leasing')), 'Трактор — 8R')
+        self.assertNotContains(self.client.get(detail_url), 'Новое описание')
+
+        account = _login_as_client(self.client)
+        LeaseRequest.objects.create(equipment=self.equipment, account=account)
+        self.assertContains(self.client.get(reverse('core:leasing')), 'Заявка отправлена')
+
+        self.manufacturer.name = 'Deere & Company'
+        self.manufacturer.save()
+        response = self.client.get(reverse('core:leasing'))
+        self.assertContains(response, 'Deere &amp; Company')
+        self.assertContains(self.client.get(detail_url), 'Новое описание')
+
 
 class ProfileAccessTest(TestCase):
     """Интеграционный тест: доступ к профилю."""
@@ -183,6 +248,34 @@ class LeaseRequestFlowTest(TestCase):
             ).exists(),
         )
 
+    def test_request_context_cached_and_invalidated(self):
+        """Заявки пользователя в каталоге: один запрос, кэш и сброс при изменении заявки или договора."""
+        cache.clear()
+        lease_request = LeaseRequest.objects.create(equipment=self.equipment, account=self.account)
+        with self.assertNumQueries(1):
+            requests = async_to_sync(aget_account_requests)(self.account.id)
+        with self.assertNumQueries(0):
+            async_to_sync(aget_account_requests)(self.account.id)
+        self.assertEqual([(r.id, r.equipment_name, r.signed) for r in requests], [(lease_request.id, 'Трактор', False)])
+
+        response = self.client.get(reverse('core:leasing'))
+        self.assertEqual(response.context['pending_lease_requests'], {self.equipment.id: lease_request.id})
+        self.assertEqual(response.context['can_cancel_ids'], {lease_request.id})
+        self.assertContains(response, reverse('chat:thread', args=[lease_request.id]))
+
+        lease_request.status = 'confirmed'
+        lease_request.save()
+        LeaseContract.objects.create(
+            contract_number='LG-1', company=self.account.companies.get(), equipment=self.equipment,
+            start_date=datetime.date(2026, 1, 1), end_date=datetime.date(2027, 1, 1), lease_term_months=12,
+            total_amount=Decimal('1200000'), monthly_payment=Decimal('100000'),
+            signed_at=datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc), lease_request=lease_request,
+        )
+        response = self.client.get(reverse('core:leasing'))
+        self.assertEqual(response.context['pending_lease_requests'], {})
+        self.assertEqual(response.context['can_cancel_ids'], set())
+        self.assertTrue(response.context['my_requests'][0].signed)
+
 
 class ChatAccessTest(TestCase):
     """Интеграционный тест: доступ к чату."""